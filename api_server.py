@@ -3,20 +3,54 @@ Local API Server for YouTube Scam Ad Scanner
 Enables the browser extension to automatically scan URLs in real-time
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from src import config
+from src.analysis import ProcessAnalyzer
+from src.cache import ScanCache
+from src.fingerprint import ContentIndex
+from src.jsonio import json_backend
 from src.scanner import ScamScanner
+from src.logstore import LogStore, tail
+from src.logwriter import LogWriter
+from src.reputation import ReputationIndex
+from src.result import ScanResult
+from src.scheduler import HostScheduler
+from src.stats import ScanStats
+from src.store import ScanStore
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import atexit
+import itertools
 import logging
-import json
 import os
+import threading
+import time
 from datetime import datetime
 
+# JSON encoding of responses, request bodies and scan log lines
+serializer = json_backend(config.JSON_BACKEND)
+
+
+class SerializerJSONProvider(JSONProvider):
+    """Flask JSON provider backed by the configured JSON backend"""
+    
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Serialized straight to the response body bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serializer.dumps(obj) + b'\n', mimetype='application/json')
+
+
 app = Flask(__name__)
+app.json = SerializerJSONProvider(app)
 CORS(app)  # Allow requests from browser extension
 
-# Initialize scanner
-scanner = ScamScanner(timeout=10)
-
 # Setup logging directory
 LOG_DIR = 'scan_logs'
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -32,6 +66,76 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Initialize scanner (repeat scans of the same landing page hit the cache;
+# the persistent store keeps results across restarts)
+scan_cache = ScanCache(
+    ttl=config.CACHE_TTL,
+    maxsize=config.CACHE_MAX_ENTRIES
+) if config.ENABLE_RESULT_CACHE else None
+scan_store = ScanStore(
+    os.path.join(LOG_DIR, config.SCAN_STORE_FILE),
+    ttl=config.SCAN_STORE_TTL,
+    max_entries=config.SCAN_STORE_MAX_ENTRIES
+) if config.ENABLE_SCAN_STORE else None
+# Content analysis on worker processes so it can use every core (worker
+# processes start on the first page)
+analysis_executor = ProcessAnalyzer(
+    workers=config.ANALYSIS_WORKERS,
+    analyzer=config.HTML_ANALYZER,
+    max_task_memory=config.ANALYSIS_MAX_TASK_MEMORY,
+    max_tasks_per_child=config.ANALYSIS_MAX_TASKS_PER_CHILD,
+    rules_file=config.RULES_FILE
+) if config.ANALYSIS_WORKERS else None
+# Known scam / known good domain lists (memory-mapped index)
+reputation_index = None
+if config.REPUTATION_FILE:
+    try:
+        reputation_index = ReputationIndex(config.REPUTATION_FILE)
+        logger.info(f"Loaded reputation index with {len(reputation_index)} hosts")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Reputation index unavailable: {e}")
+# Per-host caps and backoff shared by every scan (many ads share a redirector)
+fetch_scheduler = HostScheduler(
+    per_host=config.FETCH_PER_HOST,
+    pool_size=config.FETCH_POOL_SIZE,
+    pool_hosts=config.FETCH_POOL_HOSTS,
+    max_retries=config.FETCH_MAX_RETRIES,
+    backoff=config.FETCH_BACKOFF,
+    max_backoff=config.FETCH_MAX_BACKOFF
+)
+# Redirect answers of shared tracking redirectors, reused for a short time
+redirect_cache = ScanCache(
+    ttl=config.REDIRECT_CACHE_TTL,
+    maxsize=config.REDIRECT_CACHE_MAX_ENTRIES
+)
+# Analyses of landing page bodies seen before, and their campaign clusters
+content_index = ContentIndex(
+    maxsize=config.CONTENT_INDEX_MAX_ENTRIES,
+    distance=config.CAMPAIGN_MAX_DISTANCE
+)
+scanner = ScamScanner(timeout=10, cache=scan_cache, store=scan_store,
+                      analyzer=config.HTML_ANALYZER, max_bytes=config.MAX_RESPONSE_BYTES,
+                      analysis_executor=analysis_executor, rules_file=config.RULES_FILE,
+                      early_exit=config.EARLY_EXIT, partial_bytes=config.PARTIAL_BYTES,
+                      reputation=reputation_index, scheduler=fetch_scheduler,
+                      redirect_cache=redirect_cache, max_redirects=config.REDIRECT_MAX_HOPS,
+                      content_index=content_index)
+
+# Worker pool shared by all batch scans
+batch_executor = ThreadPoolExecutor(
+    max_workers=config.BATCH_MAX_WORKERS,
+    thread_name_prefix='batch-scan'
+)
+
+# Log writers, indexes and running stats per log directory (see
+# get_log_writer, get_log_store and get_scan_stats)
+_log_writers = {}
+_log_writers_lock = threading.Lock()
+_log_stores = {}
+_log_stores_lock = threading.Lock()
+_scan_stats = {}
+_scan_stats_lock = threading.Lock()
+
 
 @app.route('/')
 def home():
@@ -42,8 +146,9 @@ def home():
         'version': '0.1.0',
         'endpoints': {
             '/scan': 'POST - Scan a URL',
+            '/batch-scan': 'POST - Scan multiple URLs (NDJSON streaming with Accept: application/x-ndjson)',
             '/status': 'GET - Check API status',
-            '/logs': 'GET - View scan logs',
+            '/logs': 'GET - View scan logs (filters: risk_level, source, host, q)',
             '/stats': 'GET - Get scanning statistics'
         }
     })
@@ -67,7 +172,10 @@ def scan_url():
     {
         "url": "https://example.com",
         "source": "browser-extension" (optional),
-        "metadata": {} (optional)
+        "metadata": {} (optional),
+        "force_refresh": false (optional, bypass the result cache),
+        "stop_level": "HIGH" (optional, stop scanning once this risk level
+                      is reached: LOW, MEDIUM or HIGH)
     }
     """
     try:
@@ -79,22 +187,28 @@ def scan_url():
         url = data['url']
         source = data.get('source', 'api')
         metadata = data.get('metadata', {})
+        force_refresh = bool(data.get('force_refresh', False))
+        stop_level = data.get('stop_level', 'HIGH')
+        if stop_level not in ('LOW', 'MEDIUM', 'HIGH'):
+            return jsonify({'error': 'stop_level must be LOW, MEDIUM or HIGH'}), 400
         
         logger.info(f"Scanning URL from {source}: {url}")
         
         # Perform scan
-        results = scanner.scan_url(url)
+        result = scanner.scan(url, force_refresh=force_refresh, stop_level=stop_level)
+        scanned_at = datetime.now().isoformat()
+        
+        # Log the scan
+        log_scan(result, source, scanned_at, metadata)
+        
+        logger.info(f"Scan complete: {url} - Risk: {result.risk_level}")
         
         # Add metadata
+        results = result.to_dict()
         results['source'] = source
-        results['scanned_at'] = datetime.now().isoformat()
+        results['scanned_at'] = scanned_at
         results['metadata'] = metadata
         
-        # Log the scan
-        log_scan(results)
-        
-        logger.info(f"Scan complete: {url} - Risk: {results['risk_level']}")
-        
         return jsonify(results)
         
     except Exception as e:
@@ -107,10 +221,18 @@ def batch_scan():
     """
     Scan multiple URLs at once
     
+    URLs are scanned in parallel on a bounded worker pool. URLs still
+    running when the batch deadline passes are returned as timeouts.
+    Send "Accept: application/x-ndjson" to receive one JSON result per
+    line as each scan finishes (in completion order) instead of a single
+    JSON document in request order.
+    
     Request body:
     {
         "urls": ["https://url1.com", "https://url2.com", ...],
-        "source": "browser-extension" (optional)
+        "source": "browser-extension" (optional),
+        "deadline": 30 (optional, seconds),
+        "force_refresh": false (optional, bypass the result cache)
     }
     """
     try:
@@ -121,30 +243,36 @@ def batch_scan():
         
         urls = data['urls']
         source = data.get('source', 'api')
+        force_refresh = bool(data.get('force_refresh', False))
         
         if not isinstance(urls, list):
             return jsonify({'error': 'URLs must be an array'}), 400
         
+        try:
+            deadline = float(data.get('deadline', config.BATCH_DEADLINE))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'deadline must be a number of seconds'}), 400
+        deadline = max(0.0, min(deadline, config.BATCH_MAX_DEADLINE))
+        
         logger.info(f"Batch scanning {len(urls)} URLs from {source}")
         
-        results = []
-        for url in urls:
-            try:
-                result = scanner.scan_url(url)
-                result['source'] = source
-                result['scanned_at'] = datetime.now().isoformat()
-                log_scan(result)
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    'url': url,
-                    'error': str(e),
-                    'scanned_at': datetime.now().isoformat()
-                })
+        results = iter_batch_results(urls, source, deadline, force_refresh)
+        
+        best = request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson'])
+        if best == 'application/x-ndjson':
+            return Response(
+                (serializer.dumps(result) + b'\n' for _, result in results),
+                mimetype='application/x-ndjson'
+            )
+        
+        ordered = [None] * len(urls)
+        for index, result in results:
+            ordered[index] = result
         
         return jsonify({
             'total': len(urls),
-            'results': results
+            'timed_out': sum(1 for r in ordered if r.get('timed_out')),
+            'results': ordered
         })
         
     except Exception as e:
@@ -152,35 +280,114 @@ def batch_scan():
         return jsonify({'error': str(e)}), 500
 
 
+def scan_for_batch(url, source, force_refresh=False):
+    """Scan and log one batch URL, reporting errors in the result"""
+    try:
+        scan = scanner.scan(url, force_refresh=force_refresh)
+        scanned_at = datetime.now().isoformat()
+        log_scan(scan, source, scanned_at)
+        result = scan.to_dict()
+        result['source'] = source
+        result['scanned_at'] = scanned_at
+        return result
+    except Exception as e:
+        return {
+            'url': url,
+            'error': str(e),
+            'scanned_at': datetime.now().isoformat()
+        }
+
+
+def iter_batch_results(urls, source, deadline, force_refresh=False):
+    """
+    Scan URLs on the batch worker pool
+    
+    Yields (index, result) pairs in completion order. At most
+    BATCH_REQUEST_MAX_WORKERS URLs of one request are in the pool at a
+    time, so a large batch cannot queue ahead of every URL of a concurrent
+    one. Once the deadline passes, every unfinished URL is yielded as an
+    explicit timeout; scans that are already running cannot be interrupted
+    and finish in the background.
+    """
+    remaining = enumerate(urls)
+    futures = {}
+    pending = set()
+    start = time.monotonic()
+    
+    def submit(count):
+        for index, url in itertools.islice(remaining, count):
+            future = batch_executor.submit(scan_for_batch, url, source, force_refresh)
+            futures[future] = index
+            pending.add(future)
+    
+    try:
+        submit(config.BATCH_REQUEST_MAX_WORKERS)
+        while pending:
+            timeout = deadline - (time.monotonic() - start)
+            if timeout <= 0:
+                break
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            pending.difference_update(done)
+            submit(len(done))
+            for future in done:
+                yield futures[future], future.result()
+        
+        elapsed = time.monotonic() - start
+        unfinished = [(futures[future], future) for future in pending]
+        unfinished += [(index, None) for index, _ in remaining]
+        for index, future in sorted(unfinished, key=lambda item: item[0]):
+            if future is not None:
+                pending.discard(future)
+                if future.done():
+                    yield index, future.result()
+                    continue
+                future.cancel()
+            yield index, {
+                'url': urls[index],
+                'error': f'Batch deadline of {deadline:g}s exceeded',
+                'timed_out': True,
+                'elapsed': round(elapsed, 3),
+                'scanned_at': datetime.now().isoformat()
+            }
+    finally:
+        # Client went away or the generator was dropped: stop queued work
+        for future in pending:
+            future.cancel()
+
+
 @app.route('/logs', methods=['GET'])
 def get_logs():
-    """Get scan logs"""
+    """
+    Get scan logs (most recent first)
+    
+    Query parameters: limit, risk_level, source, host (exact URL host)
+    and q (URL substring).
+    """
     try:
         # Get query parameters
         limit = request.args.get('limit', 100, type=int)
         risk_level = request.args.get('risk_level', None)
+        source = request.args.get('source', None)
+        host = request.args.get('host', None)
+        url_contains = request.args.get('q', None)
         
+        flush_log_writer()
         log_file = os.path.join(LOG_DIR, 'scans.jsonl')
         
         if not os.path.exists(log_file):
             return jsonify({'logs': []})
         
-        # Read logs
-        logs = []
-        with open(log_file, 'r') as f:
-            for line in f:
-                try:
-                    log = json.loads(line)
-                    # Filter by risk level if specified
-                    if risk_level and log.get('risk_level') != risk_level:
-                        continue
-                    logs.append(log)
-                except json.JSONDecodeError:
-                    continue
-        
-        # Get most recent logs
-        logs = logs[-limit:]
-        logs.reverse()  # Most recent first
+        if source or host or url_contains:
+            logs = get_log_store().query(
+                limit=limit,
+                risk_level=risk_level,
+                source=source,
+                host=host,
+                url_contains=url_contains
+            )
+        else:
+            # Most recent N (optionally by risk level): read the log backwards
+            logs = tail(log_file, limit=limit, risk_level=risk_level, serializer=serializer)
         
         return jsonify({
             'total': len(logs),
@@ -194,46 +401,42 @@ def get_logs():
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
-    """Get scanning statistics"""
+    """
+    Get scanning statistics
+    
+    Query parameters: days (adds totals and per-day rollups for the last
+    N days, including today).
+    """
     try:
-        log_file = os.path.join(LOG_DIR, 'scans.jsonl')
+        days = request.args.get('days', None, type=int)
+        if days is not None and not 1 <= days <= config.STATS_MAX_DAYS:
+            return jsonify({'error': f'days must be between 1 and {config.STATS_MAX_DAYS}'}), 400
         
-        if not os.path.exists(log_file):
-            return jsonify({
-                'total_scans': 0,
-                'risk_levels': {},
-                'sources': {}
-            })
+        flush_log_writer()
+        scan_stats = get_scan_stats()
+        summary = scan_stats.summary()
         
         stats = {
-            'total_scans': 0,
-            'risk_levels': {'HIGH': 0, 'MEDIUM': 0, 'LOW': 0, 'MINIMAL': 0},
-            'sources': {},
-            'unique_urls': set()
+            'total_scans': summary['total_scans'],
+            'risk_levels': {
+                risk: summary['risk_levels'].get(risk, 0)
+                for risk in ('HIGH', 'MEDIUM', 'LOW', 'MINIMAL')
+            },
+            'sources': summary['sources'],
+            'unique_urls': summary['unique_urls'],
+            'unique_urls_exact': summary['unique_urls_exact']
         }
-        
-        with open(log_file, 'r') as f:
-            for line in f:
-                try:
-                    log = json.loads(line)
-                    stats['total_scans'] += 1
-                    
-                    # Count by risk level
-                    risk = log.get('risk_level', 'UNKNOWN')
-                    if risk in stats['risk_levels']:
-                        stats['risk_levels'][risk] += 1
-                    
-                    # Count by source
-                    source = log.get('source', 'unknown')
-                    stats['sources'][source] = stats['sources'].get(source, 0) + 1
-                    
-                    # Track unique URLs
-                    stats['unique_urls'].add(log.get('url', ''))
-                    
-                except json.JSONDecodeError:
-                    continue
-        
-        stats['unique_urls'] = len(stats['unique_urls'])
+        if days is not None:
+            stats['window'] = scan_stats.window(days)
+        stats['cache'] = cache_stats()
+        stats['store'] = store_stats()
+        stats['inflight'] = scanner.inflight.stats()
+        stats['log_writer'] = log_writer_stats()
+        stats['analysis'] = analysis_stats()
+        stats['rules'] = scanner.rules.stats()
+        stats['fetch'] = scanner.scheduler.stats()
+        stats['redirect_cache'] = scanner.redirect_cache.stats()
+        stats['content_index'] = scanner.content_index.stats()
         
         return jsonify(stats)
         
@@ -242,36 +445,127 @@ def get_stats():
         return jsonify({'error': str(e)}), 500
 
 
-def log_scan(results):
-    """Log scan results to JSONL file"""
+def get_log_store():
+    """Index over scans.jsonl in LOG_DIR, synced with entries logged since"""
+    with _log_stores_lock:
+        store = _log_stores.get(LOG_DIR)
+        if store is None:
+            store = LogStore(
+                os.path.join(LOG_DIR, config.LOG_INDEX_FILE),
+                log_file=os.path.join(LOG_DIR, 'scans.jsonl'),
+                serializer=serializer
+            )
+            _log_stores[LOG_DIR] = store
+    store.sync()
+    return store
+
+
+def get_scan_stats():
+    """Running aggregates for scans.jsonl in LOG_DIR, caught up with the log"""
+    with _scan_stats_lock:
+        scan_stats = _scan_stats.get(LOG_DIR)
+        if scan_stats is None:
+            scan_stats = ScanStats.load(
+                os.path.join(LOG_DIR, config.STATS_FILE),
+                exact_limit=config.STATS_EXACT_UNIQUE_LIMIT,
+                day_exact_limit=config.STATS_DAY_EXACT_UNIQUE_LIMIT,
+                save_interval=config.STATS_SAVE_INTERVAL,
+                max_days=config.STATS_MAX_DAYS,
+                serializer=serializer
+            )
+            _scan_stats[LOG_DIR] = scan_stats
+    # Cheap when up to date: only compares the log size with the saved offset
+    scan_stats.sync(os.path.join(LOG_DIR, 'scans.jsonl'))
+    return scan_stats
+
+
+@atexit.register
+def save_scan_stats():
+    """Save running stats that have not been written yet"""
+    for scan_stats in list(_scan_stats.values()):
+        scan_stats.save()
+
+
+def get_log_writer():
+    """Background writer for scans.jsonl and the daily logs in LOG_DIR"""
+    with _log_writers_lock:
+        writer = _log_writers.get(LOG_DIR)
+        if writer is None:
+            writer = LogWriter(
+                LOG_DIR,
+                max_queue=config.LOG_QUEUE_SIZE,
+                batch_size=config.LOG_BATCH_SIZE,
+                flush_interval=config.LOG_FLUSH_INTERVAL,
+                on_write=get_scan_stats().add,
+                serializer=serializer
+            )
+            _log_writers[LOG_DIR] = writer
+    return writer
+
+
+def flush_log_writer():
+    """Make queued scan log entries visible to readers of the log files"""
+    writer = _log_writers.get(LOG_DIR)
+    if writer is not None:
+        writer.flush()
+
+
+@atexit.register
+def close_log_writers():
+    """Write queued log entries and fsync the log files (runs before stats are saved)"""
+    for writer in list(_log_writers.values()):
+        writer.close()
+
+
+@atexit.register
+def close_analysis_executor():
+    """Stop the content analysis worker processes"""
+    if analysis_executor is not None:
+        analysis_executor.close()
+
+
+def analysis_stats():
+    """Analysis worker pool counters (None when analyzing in-process)"""
+    return analysis_executor.stats() if analysis_executor is not None else None
+
+
+def cache_stats():
+    """Result cache counters (None when caching is disabled)"""
+    return scanner.cache.stats() if scanner.cache is not None else None
+
+
+def log_writer_stats():
+    """Log writer queue depth and write/drop counters (None before the first scan)"""
+    writer = _log_writers.get(LOG_DIR)
+    return writer.stats() if writer is not None else None
+
+
+def store_stats():
+    """Persistent store counters (None when the store is disabled)"""
+    return scanner.store.stats() if scanner.store is not None else None
+
+
+def log_scan(result: ScanResult, source=None, scanned_at=None, metadata=None):
+    """Log a scan result to JSONL file"""
     try:
-        log_file = os.path.join(LOG_DIR, 'scans.jsonl')
-        
-        # Create a clean log entry
+        # Create a clean log entry (indicator messages are formatted once,
+        # shared with the response)
         log_entry = {
-            'timestamp': results.get('scanned_at', datetime.now().isoformat()),
-            'url': results.get('url'),
-            'risk_level': results.get('risk_level'),
-            'risk_score': results.get('risk_score'),
-            'indicator_count': len(results.get('indicators', [])),
-            'indicators': results.get('indicators', []),
-            'source': results.get('source'),
-            'valid_url': results.get('valid_url'),
-            'accessible': results.get('accessible'),
-            'metadata': results.get('metadata', {})
+            'timestamp': scanned_at or datetime.now().isoformat(),
+            'url': result.url,
+            'risk_level': result.risk_level,
+            'risk_score': result.risk_score,
+            'indicator_count': len(result.indicators),
+            'indicators': [indicator.text for indicator in result.indicators],
+            'source': source,
+            'valid_url': result.valid_url,
+            'accessible': result.accessible,
+            'metadata': metadata or {}
         }
         
-        # Append to log file (JSONL format - one JSON object per line)
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
-            
-        # Also create a daily summary log
-        daily_log = os.path.join(
-            LOG_DIR, 
-            f"scans_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
-        )
-        with open(daily_log, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        # Appended to scans.jsonl and the daily log by the background writer
+        if not get_log_writer().write(log_entry):
+            logger.warning(f"Scan log queue full, dropped entry for {log_entry['url']}")
             
     except Exception as e:
         logger.error(f"Error logging scan: {str(e)}")
@@ -283,6 +577,10 @@ if __name__ == '__main__':
     logger.info("API available at: http://localhost:5000")
     logger.info("Press Ctrl+C to stop")
     
+    if analysis_executor is not None:
+        analysis_executor.warm_up()
+        logger.info(f"Content analysis on {analysis_executor.workers} worker processes")
+    
     app.run(
         host='127.0.0.1',
         port=5000,
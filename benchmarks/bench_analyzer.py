@@ -0,0 +1,115 @@
+"""
+Benchmark page feature extraction: BeautifulSoup tree vs single-pass events
+
+Times both analyzers on generated landing pages of growing size and
+measures the peak RSS each one adds, in a fresh process per measurement.
+
+Usage:
+    python -m benchmarks.bench_analyzer [--sizes-mb 0.1,1,5] [--repeat 3]
+"""
+
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import click
+
+from src.html_features import extract_features, soup_features
+from src.scanner import ScamIndicators
+
+
+ANALYZERS = {'soup': soup_features, 'stream': extract_features}
+
+
+def make_page(size: int, seed: int = 42) -> str:
+    """Landing-page-like HTML of roughly `size` characters"""
+    rng = random.Random(seed)
+    phrases = ScamIndicators.SCAM_KEYWORDS + ScamIndicators.URGENCY_WORDS
+    words = ['offer', 'today', 'your', 'account', 'click', 'the', 'best', 'deal', 'free', 'now']
+    parts = ['<!DOCTYPE html><html><head><title>Exclusive offer</title>'
+             '<style>.x{color:red}</style></head><body>']
+    length = len(parts[0])
+    while length < size:
+        sentence = ' '.join(rng.choice(words) for _ in range(rng.randint(5, 15)))
+        if rng.random() < 0.1:
+            sentence += ' ' + rng.choice(phrases) + '!'
+        block = rng.choice([
+            f'<div class="row"><p>{sentence}</p></div>\n',
+            f'<p><a href="/p/{rng.randrange(1000)}">{sentence}</a></p>\n',
+            f'<ul><li>{sentence}</li><li><b>{sentence}</b></li></ul>\n',
+            f'<form action="/s"><input type="text" name="q"><span>{sentence}</span></form>\n',
+            f'<script>var t = "{sentence}";</script>\n',
+        ])
+        parts.append(block)
+        length += len(block)
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KB"""
+    # VmHWM belongs to this process image; ru_maxrss on Linux also carries
+    # the peak of the parent process across fork/exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure_rss(analyzer: str, size: int) -> int:
+    """Peak RSS added by one analysis, measured in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_analyzer', '--measure', analyzer,
+         '--sizes-mb', str(size / 1e6)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)['rss_kb']
+
+
+@click.command()
+@click.option('--sizes-mb', default='0.1,1,5', help='Comma-separated page sizes in MB')
+@click.option('--repeat', default=3, help='Runs per timing (best is reported)')
+@click.option('--measure', type=click.Choice(list(ANALYZERS)), default=None, hidden=True)
+def main(sizes_mb, repeat, measure):
+    sizes = [int(float(size) * 1e6) for size in sizes_mb.split(',')]
+
+    if measure:
+        # Child process: report the peak RSS one analysis adds
+        html = make_page(sizes[0])
+        before = peak_rss_kb()
+        ANALYZERS[measure](html)
+        print(json.dumps({'rss_kb': peak_rss_kb() - before}))
+        return
+
+    print(f"best of {repeat}\n")
+    print(f"{'size MB':>8} {'soup ms':>9} {'stream ms':>10} {'speedup':>8} "
+          f"{'soup RSS MB':>12} {'stream RSS MB':>14}")
+    for size in sizes:
+        html = make_page(size)
+        assert extract_features(html) == soup_features(html)
+
+        timings = {}
+        for name, analyzer in ANALYZERS.items():
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                analyzer(html)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+
+        rss = {name: measure_rss(name, size) / 1024 for name in ANALYZERS}
+        print(f"{size / 1e6:>8.1f} {timings['soup'] * 1000:>9.0f} {timings['stream'] * 1000:>10.0f} "
+              f"{timings['soup'] / timings['stream']:>7.1f}x {rss['soup']:>12.1f} {rss['stream']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
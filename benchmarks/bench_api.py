@@ -0,0 +1,115 @@
+"""
+Benchmark /scan overhead outside the network, per JSON backend
+
+Every scan served by the API pays for parsing the request, copying the
+result, building its response and log entry, serializing both and writing
+the log line. This times POST /scan through the Flask test client for
+results already in the scanner cache (a realistic landing page's domain and
+content analysis, so no fetch happens) with each installed JSON backend,
+until the scan log is flushed, the JSON share of that (one response and
+one log line serialized), and GET /logs reading the entries back. The
+'json' backend is the standard library path the API used before.
+
+Usage:
+    python -m benchmarks.bench_api [--requests 2000] [--logs 100]
+"""
+
+import logging
+import tempfile
+import time
+
+import click
+
+import api_server
+from benchmarks.bench_analyzer import make_page
+from src.cache import ScanCache, normalize_url
+from src.jsonio import available_backends, json_backend
+from src.result import ScanResult
+
+URL = 'http://win-free-money-now-123456.xyz/claim'
+
+
+def cached_result(scanner) -> ScanResult:
+    """Result of a full scan of a generated landing page, as the cache holds it"""
+    html = make_page(60_000, seed=3)
+    domain_score, domain_indicators = scanner._analyze_domain(URL)
+    content_score, content_indicators = scanner._analyze_content(html, URL)
+    score = domain_score + content_score
+    return ScanResult(URL, True, True, score, scanner._calculate_risk_level(score),
+                      domain_indicators + content_indicators, {
+                          'tiers': ['url', 'headers', 'content'],
+                          'domain_analysis': {'score': domain_score, 'indicators': domain_indicators},
+                          'status_code': 200,
+                          'final_url': URL,
+                          'content_type': 'text/html',
+                          'campaign_id': '5f1d3c9a0b7e2d41',
+                          'content_analysis': {'score': content_score, 'indicators': content_indicators},
+                      })
+
+
+def encode(backend: str, result: ScanResult, repeat: int = 2000) -> float:
+    """Seconds to serialize one response and one log line (the JSON share of /scan)"""
+    dumps = json_backend(backend).dumps
+    response = dict(result.to_dict(), source='benchmark', scanned_at='2026-03-10T12:00:00',
+                    metadata={})
+    entry = {key: response[key] for key in ('url', 'risk_level', 'risk_score', 'indicators')}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dumps(response)
+        dumps(entry)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(backend: str, requests: int, logs: int, log_dir: str):
+    """(seconds per /scan, seconds per /logs) with one backend"""
+    api_server.serializer = json_backend(backend)
+    api_server.LOG_DIR = log_dir
+    client = api_server.app.test_client()
+    body = {'url': URL, 'source': 'benchmark', 'metadata': {'ad_id': 'abc123', 'position': 2}}
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.post('/scan', json=body)
+        assert response.status_code == 200
+    api_server.flush_log_writer()
+    scan = (time.perf_counter() - start) / requests
+
+    start = time.perf_counter()
+    for _ in range(logs):
+        response = client.get('/logs', query_string={'limit': 100, 'risk_level': 'HIGH'})
+        assert len(response.get_json()['logs']) == 100
+    read = (time.perf_counter() - start) / logs
+
+    api_server.close_log_writers()
+    api_server._log_writers.clear()
+    api_server._scan_stats.clear()
+    return scan, read
+
+
+@click.command()
+@click.option('--requests', 'requests_', default=2000, help='POST /scan requests per backend')
+@click.option('--logs', default=100, help='GET /logs requests per backend')
+def main(requests_, logs):
+    # Request logging would dominate what is measured
+    logging.getLogger('api_server').setLevel(logging.WARNING)
+    scanner = api_server.scanner
+    scanner.cache = ScanCache(ttl=3600)
+    result = cached_result(scanner)
+    scanner.cache.set(normalize_url(URL), result)
+    response_bytes = len(json_backend('json').dumps(result.to_dict()))
+    print(f"{requests_} cached scans ({len(result.indicators)} indicators, "
+          f"{response_bytes:,}-byte result), /logs?limit=100 x {logs}\n")
+
+    print(f"{'backend':>8} {'/scan us':>9} {'scans/s':>8} {'JSON us':>8} {'/logs ms':>9}")
+    baseline = None
+    for backend in available_backends()[::-1]:
+        with tempfile.TemporaryDirectory() as log_dir:
+            scan, read = run(backend, requests_, logs, log_dir)
+        baseline = baseline or scan
+        print(f"{backend:>8} {scan * 1e6:>9.0f} {1 / scan:>8,.0f} "
+              f"{encode(backend, result) * 1e6:>8.1f} {read * 1000:>9.2f}"
+              f"   ({baseline / scan:.2f}x /scan)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark domain analysis: tldextract.extract vs the offline suffix trie
+
+Times ScamScanner._analyze_domain calls per second as it was before (host
+split by tldextract.extract on every call) and with the offline suffix trie
+and per-host memo, for a workload of repeated hosts and one where every
+host is new, and the first call in a fresh process (suffix list loading)
+for each.
+
+Usage:
+    python -m benchmarks.bench_domain [--calls 100000] [--hosts 1000]
+"""
+
+import contextlib
+import json
+import random
+import subprocess
+import sys
+import time
+
+import click
+
+from src import rules, suffixes
+from src.scanner import ScamScanner
+
+
+def tldextract_split(host: str):
+    """Host split as the scanner did it before (it passed the whole URL, which costs a little more)"""
+    import tldextract
+    extracted = tldextract.extract(host)
+    return extracted.domain, extracted.suffix
+
+
+@contextlib.contextmanager
+def host_split(scanner: ScamScanner, name: str):
+    """Score with the named host split ('tldextract', unmemoized, or 'trie')"""
+    plan = scanner.rules.plan
+    split, memo = rules.split_host, plan._host
+    if name == 'tldextract':
+        rules.split_host = tldextract_split
+        plan._host = plan._host_features
+    try:
+        yield
+    finally:
+        rules.split_host, plan._host = split, memo
+
+
+def make_urls(count: int, seed: int):
+    """Landing-page-like URLs on generated hosts"""
+    rng = random.Random(seed)
+    words = ['secure', 'login', 'prize', 'crypto', 'free', 'gift', 'win', 'bank', 'verify', 'promo']
+    tlds = ['com', 'xyz', 'top', 'net', 'co.uk', 'com.au', 'shop', 'click']
+    schemes = ['http', 'https']
+    return [f"{rng.choice(schemes)}://www.{rng.choice(words)}-{rng.choice(words)}{i}.{rng.choice(tlds)}/offer"
+            for i in range(count)]
+
+
+def calls_per_second(scanner: ScamScanner, urls) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        scanner._analyze_domain(url)
+    return len(urls) / (time.perf_counter() - start)
+
+
+def first_call_ms(name: str) -> float:
+    """Latency of the first call in this process"""
+    scanner = ScamScanner()
+    with host_split(scanner, name):
+        start = time.perf_counter()
+        scanner._analyze_domain('https://www.example.co.uk/')
+        return (time.perf_counter() - start) * 1000
+
+
+@click.command()
+@click.option('--calls', default=100_000, help='_analyze_domain calls per workload')
+@click.option('--hosts', default=1000, help='Distinct hosts in the repeated-hosts workload')
+@click.option('--first-call', default=None, hidden=True)
+def main(calls, hosts, first_call):
+    if first_call:
+        # Child process: nothing loaded yet
+        print(json.dumps(first_call_ms(first_call)))
+        return
+
+    scanner = ScamScanner()
+    distinct = make_urls(hosts, seed=1)
+    rng = random.Random(2)
+    workloads = {
+        'repeated hosts': [rng.choice(distinct) for _ in range(calls)],
+        'unique hosts': make_urls(calls, seed=3),
+    }
+    for urls in workloads.values():
+        with host_split(scanner, 'tldextract'):
+            expected = [scanner._analyze_domain(url) for url in urls[:1000]]
+        assert [scanner._analyze_domain(url) for url in urls[:1000]] == expected
+
+    print(f"{calls} calls per workload, {hosts} distinct hosts in the repeated workload\n")
+    print(f"{'workload':>16} {'tldextract/s':>13} {'trie/s':>10} {'speedup':>8}")
+    for name, urls in workloads.items():
+        suffixes.split_host.cache_clear()
+        scanner.rules.plan._host.cache_clear()
+        with host_split(scanner, 'tldextract'):
+            before = calls_per_second(scanner, urls)
+        after = calls_per_second(scanner, urls)
+        print(f"{name:>16} {before:>13,.0f} {after:>10,.0f} {after / before:>7.2f}x")
+
+    print()
+    for name in ('tldextract', 'trie'):
+        result = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_domain', '--first-call', name],
+            capture_output=True, text=True, check=True
+        )
+        print(f"first call ({name}): {json.loads(result.stdout):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
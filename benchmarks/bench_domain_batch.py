@@ -0,0 +1,72 @@
+"""
+Benchmark batch domain scoring of a large URL list
+
+Scores a list of ad-log-like URLs (hosts repeating, each URL with its own
+query string) with ScamScanner._analyze_domain in a Python loop, as offline
+triage had to before, and with ScamScanner.analyze_domains (feature columns
+and a weighted dot product), checks that both give the same scores and risk
+levels, and prints URLs per second for each.
+
+Usage:
+    python -m benchmarks.bench_domain_batch [--urls 1000000] [--hosts 50000]
+"""
+
+import random
+import time
+
+import click
+
+from benchmarks.bench_domain import make_urls
+from src.domain_batch import _numpy, extract_columns, score_columns
+from src.scanner import ScamScanner
+
+
+def make_log(count: int, hosts: int, seed: int = 5):
+    """URLs on `hosts` generated hosts with per-click tracking parameters"""
+    rng = random.Random(seed)
+    landing = make_urls(hosts, seed=seed)
+    extra = ['http://192.168.4.20/promo', 'https://user@203.0.113.7:8443/login',
+             'http://sub.win-big-prize-2024-now.top/claim']
+    landing.extend(extra)
+    return [f'{rng.choice(landing)}?gclid={rng.getrandbits(64):x}&ad={i}' for i in range(count)]
+
+
+@click.command()
+@click.option('--urls', 'count', default=1_000_000, help='URLs in the list')
+@click.option('--hosts', default=50_000, help='Distinct hosts among them')
+def main(count, hosts):
+    urls = make_log(count, hosts)
+    scanner = ScamScanner()
+    plan = scanner.rules.plan
+    print(f"{count:,} URLs on {hosts:,} hosts\n")
+
+    start = time.perf_counter()
+    expected = [scanner._analyze_domain(url)[0] for url in urls]
+    expected_levels = [plan.risk_level(score) for score in expected]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores, levels = scanner.analyze_domains(urls)
+    batch = time.perf_counter() - start
+    assert list(scores) == expected and levels == expected_levels
+
+    start = time.perf_counter()
+    columns = extract_columns(urls, plan)
+    extract = time.perf_counter() - start
+    rows = [('_analyze_domain loop', loop), ('analyze_domains', batch),
+            ('  feature columns', extract)]
+    for name, use_numpy in (('  dot product (array)', False), ('  dot product (numpy)', True)):
+        if use_numpy and _numpy(None) is None:
+            continue
+        start = time.perf_counter()
+        score_columns(columns, plan, use_numpy=use_numpy)
+        rows.append((name, time.perf_counter() - start))
+
+    print(f"{'':>22} {'seconds':>8} {'URLs/s':>11}")
+    for name, seconds in rows:
+        print(f"{name:>22} {seconds:>8.2f} {count / seconds:>11,.0f}")
+    print(f"\nspeedup {loop / batch:.1f}x, scores and risk levels identical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark scan log queries against the SQLite index
+
+Generates a synthetic scans.jsonl, imports it into a LogStore and compares
+the indexed queries with the original approach of reading and parsing the
+whole JSONL file on every request.
+
+Usage:
+    python -m benchmarks.bench_logstore [--entries 5000000] [--dir /tmp/bench_logs]
+"""
+
+import json
+import os
+import random
+import time
+
+import click
+
+from src.logstore import LogStore
+
+
+RISK_LEVELS = ['MINIMAL', 'LOW', 'MEDIUM', 'HIGH']
+SOURCES = ['api', 'cli', 'batch_api', 'extension']
+
+
+def write_log(path: str, entries: int, hosts: int, rng: random.Random):
+    """Write a scans.jsonl with the shape api_server.log_scan produces"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(entries):
+            host = f'site{rng.randrange(hosts)}.example.com'
+            f.write(json.dumps({
+                'timestamp': f'2026-01-01T00:00:00.{i:09d}',
+                'url': f'https://{host}/offer/{i}',
+                'risk_level': rng.choice(RISK_LEVELS),
+                'risk_score': rng.randrange(100),
+                'indicators': [],
+                'source': rng.choice(SOURCES),
+            }) + '\n')
+
+
+def full_scan(path: str, match, limit: int = 100):
+    """The original /logs approach: parse every line, filter, keep the tail"""
+    logs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            log = json.loads(line)
+            if match(log):
+                logs.append(log)
+    return logs[-limit:][::-1]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+@click.command()
+@click.option('--entries', default=5_000_000, help='Number of log entries to generate')
+@click.option('--hosts', default=50_000, help='Number of distinct URL hosts')
+@click.option('--dir', 'directory', default='bench_logs', help='Directory for the generated files')
+@click.option('--baseline/--no-baseline', default=True, help='Also time full-file scans')
+def main(entries, hosts, directory, baseline):
+    rng = random.Random(42)
+    os.makedirs(directory, exist_ok=True)
+    log_file = os.path.join(directory, 'scans.jsonl')
+    index_file = os.path.join(directory, 'scans_index.sqlite3')
+    for path in (index_file, index_file + '-wal', index_file + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+    elapsed, _ = timed(write_log, log_file, entries, hosts, rng)
+    size_mb = os.path.getsize(log_file) / 1e6
+    print(f"Generated {entries:,} entries ({size_mb:.0f} MB) in {elapsed:.1f}s")
+
+    store = LogStore(index_file, log_file)
+    elapsed, imported = timed(store.sync)
+    print(f"Imported {imported:,} entries in {elapsed:.1f}s "
+          f"({imported / elapsed:,.0f}/s, trigram URL index: {store.has_url_index})")
+
+    host = f'site{hosts // 2}.example.com'
+    needle = f'/offer/{entries // 3}'
+    queries = [
+        ('recent 100', lambda: store.recent(100), lambda log: True),
+        ('risk_level=HIGH', lambda: store.query(limit=100, risk_level='HIGH'),
+         lambda log: log['risk_level'] == 'HIGH'),
+        ('source=cli, HIGH', lambda: store.query(limit=100, risk_level='HIGH', source='cli'),
+         lambda log: log['risk_level'] == 'HIGH' and log['source'] == 'cli'),
+        (f'host={host}', lambda: store.query(limit=100, host=host),
+         lambda log: f'//{host}/' in log['url']),
+        (f'q={needle}', lambda: store.query(limit=100, url_contains=needle),
+         lambda log: needle in log['url']),
+        ('summary', store.summary, None),
+    ]
+
+    print(f"\n{'query':<32} {'indexed ms':>11} {'full scan ms':>13} {'rows':>6}")
+    for name, indexed, match in queries:
+        t_indexed, result = timed(indexed)
+        rows = len(result) if isinstance(result, list) else '-'
+        t_full = '-'
+        if baseline and match is not None:
+            t, expected = timed(full_scan, log_file, match)
+            assert expected == result, name
+            t_full = f'{t * 1000:.0f}'
+        print(f"{name:<32} {t_indexed * 1000:>11.1f} {t_full:>13} {rows:>6}")
+
+    append = 1000
+    with open(log_file, 'a', encoding='utf-8') as f:
+        for i in range(append):
+            f.write(json.dumps({'url': f'https://new.example.com/{i}', 'risk_level': 'LOW'}) + '\n')
+    elapsed, imported = timed(store.sync)
+    print(f"\nIncremental sync of {imported:,} appended entries: {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark phrase matching throughput as the phrase list grows
+
+Compares the original one-substring-search-per-phrase loop with the
+Aho-Corasick automaton and the default 'auto' strategy of PhraseMatcher.
+
+Usage:
+    python -m benchmarks.bench_matcher [--text-kb 200] [--repeat 3]
+"""
+
+import random
+import string
+import time
+
+import click
+
+from src.matcher import PhraseMatcher
+from src.scanner import ScamIndicators
+
+
+PHRASE_COUNTS = [30, 100, 300, 1000, 3000, 10000]
+
+
+def make_phrases(count: int, rng: random.Random):
+    """Real indicator phrases padded with synthetic two/three-word phrases"""
+    base = ScamIndicators.SCAM_KEYWORDS + ScamIndicators.URGENCY_WORDS + ScamIndicators.TGTBT_PHRASES
+    phrases = list(dict.fromkeys(base))[:count]
+    while len(phrases) < count:
+        words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+                 for _ in range(rng.randint(2, 3))]
+        phrases.append(' '.join(words))
+    return phrases
+
+
+def make_text(size: int, phrases, rng: random.Random):
+    """Lowercase page-like text with a sprinkling of real phrases"""
+    words = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.01:
+            word = rng.choice(phrases)
+        else:
+            word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def naive(phrases, text):
+    return [phrase for phrase in phrases if phrase in text]
+
+
+def best_of(repeat, fn, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@click.command()
+@click.option('--text-kb', default=200, help='Size of the scanned text in KB')
+@click.option('--repeat', default=3, help='Runs per measurement (best is reported)')
+def main(text_kb, repeat):
+    rng = random.Random(42)
+    size = text_kb * 1024
+
+    print(f"Text size: {text_kb} KB, best of {repeat}\n")
+    print(f"{'phrases':>8} {'states':>8} {'build ms':>9} {'naive MB/s':>11} "
+          f"{'automaton MB/s':>15} {'auto MB/s':>10} {'auto uses':>10}")
+
+    for count in PHRASE_COUNTS:
+        phrases = make_phrases(count, rng)
+        text = make_text(size, phrases, rng)
+
+        start = time.perf_counter()
+        automaton = PhraseMatcher({'phrases': phrases}, strategy='automaton')
+        build = time.perf_counter() - start
+        auto = PhraseMatcher({'phrases': phrases})
+
+        assert list(automaton.search(text)['phrases']) == naive(phrases, text)
+
+        mb = size / 1e6
+        t_naive = best_of(repeat, naive, phrases, text)
+        t_automaton = best_of(repeat, automaton.search, text)
+        t_auto = best_of(repeat, auto.search, text)
+
+        print(f"{count:>8} {automaton.state_count:>8} {build * 1000:>9.1f} {mb / t_naive:>11.1f} "
+              f"{mb / t_automaton:>15.1f} {mb / t_auto:>10.1f} {auto.strategy:>10}")
+
+
+if __name__ == '__main__':
+    main()
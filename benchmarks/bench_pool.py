@@ -0,0 +1,77 @@
+"""
+Benchmark content analysis throughput: in-process threads vs worker processes
+
+Analyzes a local corpus (the golden pages in tests/pages plus generated
+landing pages) from a pool of scan threads, like the API server does, and
+reports pages/sec for in-process analysis and for growing worker counts.
+
+Usage:
+    python -m benchmarks.bench_pool [--workers 1,2,4] [--threads 16] [--pages 400]
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import click
+
+from benchmarks.bench_analyzer import make_page
+from src.analysis import ProcessAnalyzer
+from src.scanner import ScamScanner
+
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / 'tests' / 'pages'
+
+
+def load_corpus(generated: int, size: int):
+    """Golden pages plus `generated` landing pages of about `size` characters"""
+    corpus = [page.read_text(encoding='utf-8') for page in sorted(PAGES_DIR.glob('*.html'))]
+    corpus += [make_page(size, seed=seed) for seed in range(generated)]
+    return corpus
+
+
+def throughput(analyze, corpus, pages: int, threads: int) -> float:
+    """Pages per second analyzed by `threads` concurrent callers"""
+    work = [corpus[i % len(corpus)] for i in range(pages)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda html: analyze(html, 'https://example.com/'), work))
+    return pages / (time.perf_counter() - start)
+
+
+@click.command()
+@click.option('--workers', default=None, help='Comma-separated worker counts (default: 1,2,4... up to the core count)')
+@click.option('--threads', default=16, help='Concurrent scan threads submitting pages')
+@click.option('--pages', default=400, help='Pages analyzed per measurement')
+@click.option('--size-kb', default=100, help='Size of the generated pages')
+def main(workers, threads, pages, size_kb):
+    cores = os.cpu_count() or 1
+    if workers:
+        counts = [int(count) for count in workers.split(',')]
+    else:
+        counts = [1]
+        while counts[-1] * 2 <= cores:
+            counts.append(counts[-1] * 2)
+
+    corpus = load_corpus(generated=20, size=size_kb * 1000)
+    print(f"{len(corpus)} pages, {pages} analyses per run, {threads} threads, {cores} cores\n")
+    print(f"{'mode':>12} {'pages/s':>9} {'speedup':>8}")
+
+    scanner = ScamScanner()
+    scanner._analyze_content(corpus[0], 'https://example.com/')
+    baseline = throughput(scanner._analyze_content, corpus, pages, threads)
+    print(f"{'in-process':>12} {baseline:>9.1f} {1.0:>7.1f}x")
+
+    for count in counts:
+        executor = ProcessAnalyzer(workers=count)
+        executor.warm_up()
+        try:
+            rate = throughput(executor.analyze, corpus, pages, threads)
+        finally:
+            executor.close()
+        print(f"{f'{count} workers':>12} {rate:>9.1f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
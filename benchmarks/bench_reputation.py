@@ -0,0 +1,104 @@
+"""
+Benchmark the domain reputation index: build, startup and lookup latency
+
+Builds an index of generated hosts, then measures (in a fresh process) how
+long opening it takes and how much resident memory that adds, and the
+latency of lookups for listed hosts, subdomains of listed hosts and
+unlisted hosts. Pages of the index touched by lookups are shared page
+cache, not private memory.
+
+Usage:
+    python -m benchmarks.bench_reputation [--hosts 1000000] [--lookups 100000]
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+from src.reputation import ReputationIndex, build_index
+
+
+def make_hosts(count: int, seed: int):
+    """Scam-list-like hosts"""
+    rng = random.Random(seed)
+    words = ['secure', 'login', 'prize', 'crypto', 'free', 'gift', 'win', 'bank', 'verify', 'promo']
+    tlds = ['com', 'xyz', 'top', 'net', 'info', 'co.uk', 'shop', 'click']
+    return [f"{rng.choice(words)}-{rng.choice(words)}{i}.{rng.choice(tlds)}" for i in range(count)]
+
+
+def rss_kb() -> int:
+    """Current resident set size of this process in KB (Linux; 0 elsewhere)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def measure_open(path: str, hosts, lookups: int) -> dict:
+    """Open time, RSS and lookup latencies of an index (in this process)"""
+    rss_before = rss_kb()
+    start = time.perf_counter()
+    index = ReputationIndex(path)
+    open_ms = (time.perf_counter() - start) * 1000
+    rss_open = rss_kb() - rss_before
+    rng = random.Random(7)
+
+    cases = {
+        'listed': [rng.choice(hosts) for _ in range(lookups)],
+        'subdomain': [f'www.cdn.{rng.choice(hosts)}' for _ in range(lookups)],
+        'unlisted': [f'unlisted{i}.example.com' for i in range(lookups)],
+    }
+    latency = {}
+    for name, queries in cases.items():
+        start = time.perf_counter()
+        for host in queries:
+            index.lookup(host)
+        latency[name] = (time.perf_counter() - start) / lookups * 1e6
+
+    return {'open_ms': open_ms, 'rss_open_kb': rss_open, 'latency_us': latency}
+
+
+@click.command()
+@click.option('--hosts', default=1_000_000, help='Hosts in the index (half scam, half good)')
+@click.option('--lookups', default=100_000, help='Lookups per case')
+@click.option('--measure', default=None, hidden=True)
+def main(hosts, lookups, measure):
+    if measure:
+        # Child process: open the index fresh and time lookups
+        sample = make_hosts(min(hosts, 10000), seed=1)
+        print(json.dumps(measure_open(measure, sample, lookups)))
+        return
+
+    scam = make_hosts(hosts // 2, seed=1)
+    good = make_hosts(hosts - hosts // 2, seed=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'reputation.idx')
+        start = time.perf_counter()
+        count = build_index(path, scam=scam, good=[f'good.{host}' for host in good])
+        build_s = time.perf_counter() - start
+        del scam, good
+
+        result = json.loads(subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_reputation', '--hosts', str(hosts),
+             '--lookups', str(lookups), '--measure', path],
+            capture_output=True, text=True, check=True
+        ).stdout)
+
+        print(f"{count} hosts, index {os.path.getsize(path) / 1e6:.1f} MB, built in {build_s:.1f} s")
+        print(f"open: {result['open_ms']:.2f} ms, resident memory added by open: {result['rss_open_kb']} KB")
+        for name, micros in result['latency_us'].items():
+            print(f"lookup {name:>10}: {micros:.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Benchmark rule evaluation: compiled rule plan vs the hardcoded heuristics
+
+Scores a corpus of pages (golden pages plus generated landing pages, with
+features extracted once up front) and a list of URLs with the compiled
+RulePlan and with the scoring code the scanner hardcoded before the rule
+engine, checking that both agree.
+
+Usage:
+    python -m benchmarks.bench_rules [--repeat 5] [--size-kb 100]
+"""
+
+import re
+import time
+from typing import List, Tuple
+from urllib.parse import urlparse
+
+import click
+import tldextract
+
+from benchmarks.bench_pool import load_corpus
+from src.html_features import PageFeatures, extract_features
+from src.rules import RulePlan, config_rules
+from src.scanner import ScamIndicators
+
+
+URLS = [
+    'https://www.example.com/landing', 'http://192.168.1.1/offer', 'http://win-free-prize-now.xyz/',
+    'https://shop.example.co.uk/p/123', 'http://crypto2024double1234.top/claim',
+    'https://thisdomainnameiswaytoolongandprobablysuspicious.com/',
+]
+
+
+# -- the scoring code before the rule engine --------------------------------
+
+def hardcoded_domain(url: str) -> Tuple[int, List[str]]:
+    """_analyze_domain before the rule engine"""
+    score = 0
+    indicators = []
+
+    parsed = urlparse(url)
+    extracted = tldextract.extract(url)
+
+    domain = extracted.domain
+    tld = f'.{extracted.suffix}'
+
+    # Check for suspicious TLD
+    if tld in ScamIndicators.SUSPICIOUS_TLD:
+        score += 15
+        indicators.append(f'Suspicious TLD: {tld}')
+
+    # Check domain length (very long domains can be suspicious)
+    if len(domain) > 20:
+        score += 10
+        indicators.append(f'Unusually long domain name ({len(domain)} chars)')
+
+    # Check for excessive hyphens or numbers
+    hyphen_count = domain.count('-')
+    if hyphen_count > 2:
+        score += 10
+        indicators.append(f'Multiple hyphens in domain ({hyphen_count})')
+
+    digit_count = sum(c.isdigit() for c in domain)
+    if digit_count > 3:
+        score += 5
+        indicators.append(f'Multiple digits in domain ({digit_count})')
+
+    # Check for HTTP (not HTTPS)
+    if parsed.scheme == 'http':
+        score += 10
+        indicators.append('No HTTPS encryption')
+
+    # Check for IP address instead of domain
+    if re.match(r'\d+\.\d+\.\d+\.\d+', parsed.netloc):
+        score += 20
+        indicators.append('Using IP address instead of domain name')
+
+    return score, indicators
+
+
+def hardcoded_content(page: PageFeatures, html: str) -> Tuple[int, List[str]]:
+    """_analyze_content before the rule engine (features already extracted)"""
+    score = 0
+    indicators = []
+
+    # Get text content
+    text = page.text.lower()
+    title = page.title.lower() if page.title else ''
+
+    # Find every phrase category in one pass over the text
+    matcher = ScamIndicators.matcher()
+    found = matcher.search(text)
+
+    # Check for scam keywords (the title counts for keywords only)
+    found_keywords = found['scam_keywords']
+    if title:
+        title_keywords = matcher.search(title)['scam_keywords']
+        if title_keywords.keys() - found_keywords.keys():
+            found_keywords = {
+                keyword: None for keyword in ScamIndicators.SCAM_KEYWORDS
+                if keyword in found_keywords or keyword in title_keywords
+            }
+    found_keywords = list(found_keywords)
+
+    if found_keywords:
+        score += len(found_keywords) * 5
+        indicators.append(f'Found {len(found_keywords)} scam keywords: {", ".join(found_keywords[:3])}{"..." if len(found_keywords) > 3 else ""}')
+
+    # Check for urgency words
+    urgency_count = len(found['urgency_words'])
+    if urgency_count > 2:
+        score += urgency_count * 3
+        indicators.append(f'High urgency language detected ({urgency_count} instances)')
+
+    # Check for too-good-to-be-true phrases
+    tgtbt_count = len(found['tgtbt_phrases'])
+    if tgtbt_count > 0:
+        score += tgtbt_count * 5
+        indicators.append(f'Too-good-to-be-true phrases detected ({tgtbt_count} instances)')
+
+    # Check for excessive exclamation marks
+    exclamation_count = text.count('!')
+    if exclamation_count > 10:
+        score += 10
+        indicators.append(f'Excessive exclamation marks ({exclamation_count})')
+
+    # Check for popup/alert scripts (common in scams)
+    if 'alert(' in html.lower() or 'confirm(' in html.lower():
+        score += 15
+        indicators.append('Contains popup/alert scripts')
+
+    # Check for missing or suspicious meta tags
+    if not page.has_meta_description:
+        score += 5
+        indicators.append('Missing meta description')
+
+    # Check for external links (phishing often has few legitimate external links)
+    if page.link_count < 3:
+        score += 5
+        indicators.append(f'Very few external links ({page.link_count})')
+
+    # Check for forms (potential data collection)
+    if page.form_actions:
+        if page.password_fields:
+            score += 15
+            indicators.append('Contains password input fields')
+
+        # Check for forms without proper action
+        for action in page.form_actions:
+            if not action or action == '#':
+                score += 10
+                indicators.append('Form with suspicious or missing action')
+                break
+
+    return score, indicators
+
+
+def hardcoded_risk_level(score: int) -> str:
+    """Convert risk score to risk level"""
+    if score >= 50:
+        return 'HIGH'
+    elif score >= 25:
+        return 'MEDIUM'
+    elif score >= 10:
+        return 'LOW'
+    else:
+        return 'MINIMAL'
+
+
+def best_time(fn, items, repeat: int) -> float:
+    """Best time in seconds to apply fn to every item"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(*item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@click.command()
+@click.option('--repeat', default=5, help='Runs per timing (best is reported)')
+@click.option('--size-kb', default=100, help='Size of the generated pages')
+def main(repeat, size_kb):
+    plan = RulePlan(config_rules(ScamIndicators.phrase_lists()))
+    corpus = load_corpus(generated=20, size=size_kb * 1000)
+    pages = [(extract_features(html), html) for html in corpus]
+    urls = [(url,) for url in URLS * 50]
+
+    for page, html in pages:
+        assert plan.content(page, html) == hardcoded_content(page, html)
+    for (url,) in urls:
+        assert plan.domain(url) == hardcoded_domain(url)
+    for score in range(100):
+        assert plan.risk_level(score) == hardcoded_risk_level(score)
+
+    print(f"best of {repeat}, {len(pages)} pages, {len(urls)} URLs\n")
+    print(f"{'stage':>8} {'hardcoded ms':>13} {'plan ms':>9} {'speedup':>8}")
+    for stage, items, old, new in [
+        ('content', pages, hardcoded_content, plan.content),
+        ('domain', urls, hardcoded_domain, plan.domain),
+    ]:
+        before = best_time(old, items, repeat)
+        after = best_time(new, items, repeat)
+        print(f"{stage:>8} {before * 1000:>13.1f} {after * 1000:>9.1f} {before / after:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark "most recent N" log queries read backwards from the end of the log
+
+Compares logstore.tail() with the original approach of parsing every line
+of scans.jsonl and slicing the last N matches, for growing log sizes.
+
+Usage:
+    python -m benchmarks.bench_tail [--sizes 10000,100000,1000000] [--limit 100]
+"""
+
+import os
+import random
+import time
+
+import click
+
+from benchmarks.bench_logstore import full_scan, write_log
+from src.logstore import tail
+
+
+def best_of(repeat, fn, *args, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+@click.command()
+@click.option('--sizes', default='10000,100000,1000000', help='Comma-separated log sizes (entries)')
+@click.option('--limit', default=100, help='Entries per query')
+@click.option('--repeat', default=3, help='Runs per measurement (best is reported)')
+@click.option('--dir', 'directory', default='bench_logs', help='Directory for the generated files')
+def main(sizes, limit, repeat, directory):
+    os.makedirs(directory, exist_ok=True)
+    log_file = os.path.join(directory, 'scans_tail.jsonl')
+    queries = [
+        ('recent', None),
+        ('risk_level=HIGH', 'HIGH'),
+        # Worst case: no entry matches, so the whole file is read either way
+        ('risk_level=NONE', 'NONE'),
+    ]
+
+    print(f"limit={limit}, best of {repeat}\n")
+    print(f"{'entries':>10} {'query':<18} {'full parse ms':>14} {'tail ms':>9} {'speedup':>8}")
+    for entries in (int(size) for size in sizes.split(',')):
+        write_log(log_file, entries, max(entries // 100, 1), random.Random(42))
+        for name, risk_level in queries:
+            match = (lambda log: True) if risk_level is None else \
+                (lambda log, level=risk_level: log['risk_level'] == level)
+            t_full, expected = best_of(repeat, full_scan, log_file, match, limit)
+            t_tail, result = best_of(repeat, tail, log_file, limit, risk_level=risk_level)
+            assert result == expected, name
+            print(f"{entries:>10,} {name:<18} {t_full * 1000:>14.1f} {t_tail * 1000:>9.2f} "
+                  f"{t_full / t_tail:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
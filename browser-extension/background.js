@@ -33,6 +33,14 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
     return true; // Keep channel open for async response
   }
   
+  if (message.type === 'BATCH_SCAN') {
+    // Results are saved to storage as they stream in
+    batchScanUrls(message.urls).then(summary => {
+      sendResponse(summary);
+    });
+    return true;
+  }
+  
   if (message.type === 'GET_CAPTURED_ADS') {
     chrome.storage.local.get(['capturedAds'], (result) => {
       sendResponse({ ads: result.capturedAds || [] });
@@ -41,32 +49,58 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
   }
 });
 
+// Read-modify-write updates of capturedAds run one after another, so
+// concurrent updates (e.g. streamed batch results) cannot overwrite each other
+let capturedAdsUpdates = Promise.resolve();
+
+/**
+ * Apply update(ads) to the stored captured ads and save them
+ * update returns false to skip saving; resolves with update's return value
+ */
+function updateCapturedAds(update) {
+  const run = () => new Promise((resolve) => {
+    chrome.storage.local.get(['capturedAds'], (data) => {
+      const ads = data.capturedAds || [];
+      const changed = update(ads);
+      if (changed === false) {
+        resolve(changed);
+        return;
+      }
+      chrome.storage.local.set({ capturedAds: ads }, () => resolve(changed));
+    });
+  });
+  const result = capturedAdsUpdates.then(run);
+  capturedAdsUpdates = result.catch((error) => console.error('Error updating captured ads:', error));
+  return result;
+}
+
 /**
  * Store captured ad URL and optionally auto-scan
  */
 function storeAdUrl(url, timestamp, pageUrl) {
-  chrome.storage.local.get(['capturedAds'], (result) => {
-    const ads = result.capturedAds || [];
-    
+  updateCapturedAds((ads) => {
     // Check if URL already exists
-    const exists = ads.some(ad => ad.url === url);
-    if (!exists) {
-      const newAd = {
-        url: url,
-        timestamp: timestamp,
-        pageUrl: pageUrl,
-        scanned: false,
-        scanResult: null
-      };
-      
-      ads.push(newAd);
-      chrome.storage.local.set({ capturedAds: ads });
-      console.log('💾 Stored ad URL:', url);
-      
-      // Auto-scan if enabled
-      console.log('🔍 Starting auto-scan for:', url);
-      autoScanIfEnabled(url, { pageUrl: pageUrl, capturedAt: timestamp });
+    if (ads.some(ad => ad.url === url)) {
+      return false;
     }
+    ads.push({
+      url: url,
+      timestamp: timestamp,
+      pageUrl: pageUrl,
+      scanned: false,
+      scanResult: null
+    });
+    return true;
+  }).then((stored) => {
+    if (!stored) {
+      return;
+    }
+    console.log('💾 Stored ad URL:', url);
+    updateBadgeCount();
+    
+    // Auto-scan if enabled
+    console.log('🔍 Starting auto-scan for:', url);
+    autoScanIfEnabled(url, { pageUrl: pageUrl, capturedAt: timestamp });
   });
 }
 
@@ -126,29 +160,7 @@ async function scanUrl(url, metadata = {}) {
     
     if (response.ok) {
       const result = await response.json();
-      
-      // Update the stored ad with scan results
-      chrome.storage.local.get(['capturedAds'], (data) => {
-        const ads = data.capturedAds || [];
-        const adIndex = ads.findIndex(ad => ad.url === url);
-        
-        if (adIndex !== -1) {
-          ads[adIndex].scanned = true;
-          ads[adIndex].scanResult = result;
-          ads[adIndex].scannedAt = new Date().toISOString();
-          chrome.storage.local.set({ capturedAds: ads });
-          updateBadgeCount();
-        }
-      });
-      
-      // Show notification for high risk
-      if (result.risk_level === 'HIGH') {
-        showNotification(
-          '⚠️ HIGH RISK AD DETECTED',
-          `Scam indicators found in: ${url.substring(0, 50)}...`
-        );
-      }
-      
+      saveScanResults([result]);
       return result;
     } else {
       throw new Error(`API returned ${response.status}`);
@@ -170,6 +182,116 @@ async function scanUrl(url, metadata = {}) {
   }
 }
 
+/**
+ * Store scan results on their captured ads (one storage update for all of
+ * them) and warn about high risk
+ */
+function saveScanResults(results) {
+  if (results.length === 0) {
+    return Promise.resolve();
+  }
+  const scannedAt = new Date().toISOString();
+  const saved = updateCapturedAds((ads) => {
+    let changed = false;
+    for (const result of results) {
+      const ad = ads.find(ad => ad.url === result.url);
+      if (ad) {
+        ad.scanned = true;
+        ad.scanResult = result;
+        ad.scannedAt = scannedAt;
+        changed = true;
+      }
+    }
+    return changed;
+  }).then((changed) => {
+    if (changed) {
+      updateBadgeCount();
+    }
+  });
+  
+  // Show notification for high risk
+  for (const result of results) {
+    if (result.risk_level === 'HIGH') {
+      showNotification(
+        '⚠️ HIGH RISK AD DETECTED',
+        `Scam indicators found in: ${result.url.substring(0, 50)}...`
+      );
+    }
+  }
+  return saved;
+}
+
+/**
+ * Scan several URLs with one /batch-scan request
+ * Results are streamed as NDJSON and saved as soon as each scan finishes,
+ * so the popup does not wait for the slowest landing page.
+ */
+async function batchScanUrls(urls) {
+  let received = 0;
+  let timedOut = 0;
+  
+  try {
+    const response = await fetch('http://localhost:5000/batch-scan', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'application/x-ndjson'
+      },
+      body: JSON.stringify({ urls: urls, source: 'browser-extension' })
+    });
+    
+    if (!response.ok) {
+      throw new Error(`API returned ${response.status}`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    
+    // Results of one chunk are saved together in a single storage update
+    const saves = [];
+    const handleLines = (lines) => {
+      const completed = [];
+      for (const line of lines) {
+        if (!line.trim()) {
+          continue;
+        }
+        const result = JSON.parse(line);
+        received++;
+        if (result.timed_out) {
+          // Leave the ad unscanned so it can be retried later
+          timedOut++;
+        } else if (!result.error) {
+          completed.push(result);
+        }
+      }
+      saves.push(saveScanResults(completed));
+    };
+    
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) {
+        break;
+      }
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+      handleLines(lines);
+    }
+    handleLines([buffered + decoder.decode()]);
+    await Promise.all(saves);
+    
+    return { total: urls.length, received: received, timedOut: timedOut };
+  } catch (error) {
+    console.error('Error batch scanning URLs:', error);
+    return {
+      error: 'Local scanner API not running',
+      message: 'Start the API server with: python api_server.py',
+      received: received
+    };
+  }
+}
+
 /**
  * Auto-scan URL if API is available
  */
@@ -106,12 +106,19 @@ function scanAll() {
       return;
     }
     
-    // Create text with URLs for manual scanning
-    const urls = unscanned.map(ad => ad.url).join('\n');
+    const urls = unscanned.map(ad => ad.url);
     
-    // Copy to clipboard
-    navigator.clipboard.writeText(urls).then(() => {
-      alert(`${unscanned.length} URLs copied to clipboard!\n\nYou can now scan them with:\npython test_batch.py\n\nOr scan individually:\npython -m src.scanner --url "URL"`);
+    // Scan through the local API; results show up as they stream in
+    chrome.runtime.sendMessage({ type: 'BATCH_SCAN', urls: urls }, (summary) => {
+      if (summary && !summary.error) {
+        loadCapturedAds();
+        return;
+      }
+      
+      // API not running: copy URLs to clipboard for manual scanning
+      navigator.clipboard.writeText(urls.join('\n')).then(() => {
+        alert(`${unscanned.length} URLs copied to clipboard!\n\nYou can now scan them with:\npython test_batch.py\n\nOr scan individually:\npython -m src.scanner --url "URL"`);
+      });
     });
   });
 }
@@ -124,5 +131,12 @@ document.getElementById('scanAllBtn').addEventListener('click', scanAll);
 // Load ads on popup open
 loadCapturedAds();
 
+// Refresh as captured ads and streamed scan results are stored
+chrome.storage.onChanged.addListener((changes, area) => {
+  if (area === 'local' && changes.capturedAds) {
+    loadCapturedAds();
+  }
+});
+
 // Refresh every 2 seconds while popup is open
 setInterval(loadCapturedAds, 2000);
@@ -0,0 +1,161 @@
+"""
+Content analysis executors.
+
+Parsing a page and matching phrases is CPU-bound and holds the GIL, so in a
+threaded server analysis throughput is capped at one core however many scan
+threads run. ProcessAnalyzer hands the fetched page to a pool of warm worker
+processes (scanner, phrase tables and parser loaded once per worker) while
+fetching stays in the calling process. ScamScanner analyzes in-process when
+no executor is given.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+from src.result import Code, Indicator
+
+try:
+    import resource
+except ImportError:  # Windows: no per-worker memory cap
+    resource = None
+
+# Default address space a worker may grow by while analyzing
+MAX_TASK_MEMORY = 512 * 1024 * 1024
+MAX_TASKS_PER_CHILD = 1000
+
+MEMORY_INDICATOR = Indicator(Code.ANALYSIS_MEMORY_LIMIT)
+
+
+class ProcessAnalyzer:
+    """Runs ScamScanner content analysis on a pool of worker processes"""
+
+    def __init__(self, workers: Optional[int] = None, analyzer: str = 'stream',
+                 max_task_memory: Optional[int] = MAX_TASK_MEMORY,
+                 max_tasks_per_child: Optional[int] = MAX_TASKS_PER_CHILD,
+                 rules_file: Optional[str] = None):
+        """
+        Args:
+            workers: Number of worker processes (default: one per core)
+            analyzer: Page feature extractor the workers use ('stream' or 'soup')
+            max_task_memory: Bytes of address space a worker may add on top of
+                its warm size; a page that needs more is skipped with an
+                indicator instead of exhausting the host (None for no cap)
+            max_tasks_per_child: Pages a worker analyzes before it is replaced,
+                so fragmented heaps are returned to the OS (None to keep workers)
+            rules_file: JSON rules file the workers score with (each worker
+                reloads it when it changes)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.analyzer = analyzer
+        self.max_task_memory = max_task_memory
+        self.max_tasks_per_child = max_tasks_per_child
+        self.rules_file = rules_file
+        self.tasks = 0
+        self.memory_errors = 0
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        # spawn: workers must not inherit the server's threads and sockets
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.analyzer, self.max_task_memory, self.rules_file),
+            max_tasks_per_child=self.max_tasks_per_child,
+        )
+
+    def warm_up(self):
+        """Start every worker now instead of on the first pages"""
+        futures = [self._executor.submit(os.getpid) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def analyze(self, html: str, url: str) -> Tuple[int, List[Indicator]]:
+        """
+        Analyze page content on a worker process
+
+        Args:
+            html: Decoded page (pickled to the worker as UTF-8 bytes)
+            url: Final URL of the page
+
+        Returns:
+            (score, indicators) exactly as ScamScanner._analyze_content
+        """
+        executor = self._executor
+        with self._lock:
+            self.tasks += 1
+        try:
+            return executor.submit(_analyze, html, url).result()
+        except MemoryError:
+            with self._lock:
+                self.memory_errors += 1
+            return 0, [MEMORY_INDICATOR]
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OOM killer): replace the pool
+            with self._lock:
+                self.memory_errors += 1
+                if self._executor is executor:
+                    self.restarts += 1
+                    self._executor = self._start()
+            executor.shutdown(wait=False, cancel_futures=True)
+            return 0, [MEMORY_INDICATOR]
+
+    def stats(self) -> Dict:
+        """Pool size and task counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'tasks': self.tasks,
+                'memory_errors': self.memory_errors,
+                'restarts': self.restarts,
+            }
+
+    def close(self):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# -- worker process --------------------------------------------------------
+
+_scanner = None
+
+
+def _init_worker(analyzer: str, max_task_memory: Optional[int], rules_file: Optional[str]):
+    global _scanner
+    from src.scanner import ScamScanner
+
+    _scanner = ScamScanner(analyzer=analyzer, rules_file=rules_file)
+    # Load the parser and fill the caches before the first real page
+    _scanner._analyze_content('<html><head><title>warm</title></head><body><p>x</p></body></html>',
+                              'https://example.com/')
+
+    if max_task_memory and resource is not None:
+        size = _address_space()
+        if size:
+            soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+            limit = size + max_task_memory
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _analyze(html: str, url: str) -> Tuple[int, List[Indicator]]:
+    return _scanner._analyze_content(html, url)
+
+
+def _address_space() -> Optional[int]:
+    """Current virtual memory size of this process in bytes (Linux only)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmSize:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
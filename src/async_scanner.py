@@ -0,0 +1,153 @@
+"""
+Asyncio scanning engine for scanning many URLs concurrently.
+
+Wraps a ScamScanner so the same domain and content heuristics apply. The
+HTTP fetch stage is the blocking requests-based one, so each scan runs on a
+worker thread while asyncio enforces the global and per-host limits and
+streams results back in completion order.
+"""
+
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from src.cache import normalize_url
+from src.scanner import ScamScanner
+from src.scheduler import HostScheduler, host_key
+from src.singleflight import AsyncSingleFlight
+
+
+class AsyncScamScanner:
+    """Concurrent scanner with a global and a per-host concurrency limit"""
+
+    def __init__(self, timeout: int = 10, concurrency: int = 10, per_host: int = 4,
+                 scanner: Optional[ScamScanner] = None):
+        """
+        Args:
+            timeout: Request timeout in seconds (ignored if scanner is given)
+            concurrency: Default maximum number of scans in flight
+            per_host: Maximum number of scans in flight against one host
+            scanner: Existing ScamScanner to share (and its session)
+        """
+        if concurrency < 1 or per_host < 1:
+            raise ValueError('concurrency and per_host must be at least 1')
+
+        # A scanner of its own fetches under the same per-host cap; a shared
+        # one keeps its scheduler's
+        self.scanner = scanner or ScamScanner(timeout=timeout,
+                                              scheduler=HostScheduler(per_host=per_host))
+        self.concurrency = concurrency
+        self.per_host = per_host
+        # Duplicate URLs in flight share one scan (and one worker slot)
+        self.inflight = AsyncSingleFlight()
+        self._configure_pool(concurrency)
+
+    def _configure_pool(self, concurrency: int):
+        """Size the shared session's connection pools for reuse across workers"""
+        scheduler = self.scanner.scheduler
+        scheduler.mount(self.scanner.session, pool_hosts=max(concurrency, scheduler.pool_hosts))
+
+    async def scan_url(self, url: str) -> Dict:
+        """Scan a single URL without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._scan_safely, url)
+
+    async def scan_many(self, urls: Iterable[str],
+                        concurrency: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Scan URLs concurrently, yielding each result as soon as it finishes
+
+        Args:
+            urls: URLs to scan (any iterable; consumed lazily)
+            concurrency: Maximum number of scans in flight (default: the
+                scanner's configured concurrency)
+
+        Yields:
+            Scan result dictionaries in completion order. Unexpected errors
+            are reported as {'url': ..., 'error': ...} like /batch-scan does.
+        """
+        limit = concurrency or self.concurrency
+        if limit < 1:
+            raise ValueError('concurrency must be at least 1')
+
+        global_limit = asyncio.Semaphore(limit)
+        host_limits = _HostLimits(self.per_host)
+        executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix='scan')
+        loop = asyncio.get_running_loop()
+
+        async def run(url: str) -> Dict:
+            # Wait for the host slot first so URLs queued behind a busy host
+            # never hold one of the global slots.
+            async with host_limits.slot(host_key(url)):
+                async with global_limit:
+                    return await loop.run_in_executor(executor, self._scan_safely, url)
+
+        async def scan_one(url: str) -> Dict:
+            result, shared = await self.inflight.do(normalize_url(url), run, url)
+            if shared:
+                result['url'] = url
+                result.setdefault('details', {})['coalesced'] = True
+            return result
+
+        # Keep a bounded window of pending tasks so huge URL lists are not
+        # materialized as tasks all at once.
+        window = limit * 4
+        remaining = iter(urls)
+        pending = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
+                    url = next(remaining, _DONE)
+                    if url is _DONE:
+                        exhausted = True
+                    else:
+                        pending.add(asyncio.ensure_future(scan_one(url)))
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scan_safely(self, url: str) -> Dict:
+        try:
+            return self.scanner.scan_url(url)
+        except Exception as e:
+            return {'url': url, 'error': str(e)}
+
+
+class _HostLimits:
+    """Per-host semaphores, kept only while scans of the host are waiting or running"""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        # Host -> [semaphore, scans waiting for or holding a slot]
+        self._hosts: Dict[str, List] = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host: str):
+        """Hold one of the host's slots (its semaphore is dropped with its last scan)"""
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.per_host), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._hosts[host]
+
+    def __len__(self):
+        return len(self._hosts)
+
+
+_DONE = object()
@@ -0,0 +1,173 @@
+"""
+Bulk scanning of URL lists to NDJSON.
+
+Reads URLs from a file or stdin (one per line, '#' comment lines and blank
+lines ignored, as in sample_urls.txt), drops duplicates (compared as
+normalized cache keys), scans them concurrently with AsyncScamScanner and
+appends one JSON result per line to the output in completion order.
+
+Runs are resumable: URLs whose result is already in the output file are
+skipped, so a 100k-URL list interrupted by a crash or Ctrl-C continues
+where it stopped when the same command is run again. A partial last line
+left by a crash is discarded. URLs whose result was an error or a failed
+fetch (timeouts, refused connections) are scanned again and get a new line;
+the last line for a URL is its current result.
+
+    python -m src.scanner --file urls.txt --output results.ndjson --concurrency 20
+"""
+
+import asyncio
+import json
+import os
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from src.async_scanner import AsyncScamScanner
+from src.cache import normalize_url
+from src.result import Code
+
+# Non-interactive progress is reported every this many results
+PROGRESS_EVERY = 1000
+
+# Start of the indicator of a scan whose fetch failed
+FETCH_FAILED_PREFIX = Code.FETCH_FAILED.template.split('{}')[0]
+
+
+def read_urls(lines: Iterable[str]) -> Iterator[str]:
+    """URLs from a URL list, skipping blank lines and '#' comments"""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def plan_batch(urls: Iterable[str], done: Set[str] = frozenset()) -> Tuple[List[str], int, int]:
+    """
+    URLs left to scan, in input order
+
+    Args:
+        urls: URLs from the list
+        done: Normalized URLs that already have a result
+
+    Returns:
+        (URLs to scan, number skipped as done, number of duplicates dropped)
+    """
+    todo = []
+    seen = set()
+    skipped = duplicates = 0
+    for url in urls:
+        key = normalize_url(url)
+        if key in done:
+            skipped += 1
+        elif key in seen:
+            duplicates += 1
+        else:
+            seen.add(key)
+            todo.append(url)
+    return todo, skipped, duplicates
+
+
+def is_final(result: Dict) -> bool:
+    """Whether a result is a verdict, not an error or a failed fetch worth retrying"""
+    if 'error' in result:
+        return False
+    indicators = result.get('indicators') or ()
+    return not any(isinstance(text, str) and text.startswith(FETCH_FAILED_PREFIX)
+                   for text in indicators)
+
+
+def scanned_urls(path: str) -> Set[str]:
+    """
+    Normalized URLs with a final result (see is_final) in an NDJSON output file
+
+    A last line without its newline (the process died while writing it) is
+    cut off the file, so the URL is scanned again and appending starts on a
+    clean line.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, 'r+b') as f:
+        end = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                f.truncate(end)
+                break
+            end += len(line)
+            try:
+                result = json.loads(line)
+                url = result.get('url')
+            except (ValueError, AttributeError):
+                continue
+            if isinstance(url, str) and is_final(result):
+                done.add(normalize_url(url))
+    return done
+
+
+async def scan_to_ndjson(urls: List[str], out: TextIO, scanner: AsyncScamScanner,
+                         concurrency: int,
+                         progress: Optional[Callable[[int, int, Dict], None]] = None) -> Dict[str, int]:
+    """
+    Scan URLs and write each result to out as one JSON line
+
+    Args:
+        urls: URLs to scan (already deduplicated)
+        out: Text stream the results are appended to (flushed per line)
+        scanner: AsyncScamScanner to scan with
+        concurrency: Maximum number of scans in flight
+        progress: Called with (done, total, result) after each result
+
+    Returns:
+        Count of results per risk level ('ERROR' for failed scans,
+        'INVALID' for invalid URLs)
+    """
+    counts: Dict[str, int] = {}
+    done = 0
+    async for result in scanner.scan_many(urls, concurrency=concurrency):
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+        done += 1
+        if 'error' in result:
+            level = 'ERROR'
+        else:
+            level = result.get('risk_level', 'INVALID')
+        counts[level] = counts.get(level, 0) + 1
+        if progress is not None:
+            progress(done, len(urls), result)
+    return counts
+
+
+def run_batch(source: TextIO, output: Optional[str], timeout: int = 10,
+              concurrency: int = 10, per_host: int = 4, resume: bool = True,
+              progress: Optional[Callable[[int, int, Dict], None]] = None) -> Dict[str, int]:
+    """
+    Scan a URL list to an NDJSON file (or stdout)
+
+    Args:
+        source: URL list stream
+        output: NDJSON file to append to; None writes to stdout (no resume)
+        timeout: Request timeout in seconds
+        concurrency: Maximum number of scans in flight
+        per_host: Maximum number of scans in flight against one host
+        resume: Skip URLs that already have a final result in output
+        progress: Called with (done, total, result) after each result
+
+    Returns:
+        Count of results per risk level, plus 'skipped' (already in output)
+        and 'duplicates' (repeated in the input)
+    """
+    done = scanned_urls(output) if output and resume else set()
+    todo, skipped, duplicates = plan_batch(read_urls(source), done)
+
+    scanner = AsyncScamScanner(timeout=timeout, concurrency=concurrency, per_host=per_host)
+    out = open(output, 'a', encoding='utf-8') if output else sys.stdout
+    try:
+        counts = asyncio.run(scan_to_ndjson(todo, out, scanner, concurrency, progress))
+    finally:
+        if output:
+            out.close()
+
+    counts['skipped'] = skipped
+    counts['duplicates'] = duplicates
+    return counts
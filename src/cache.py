@@ -0,0 +1,144 @@
+"""
+Scan result caching.
+
+Ad landing pages are reported again and again from many YouTube sessions, so
+scan results are cached for a short time under a normalized form of the URL.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only carry ad/analytics tracking state
+TRACKING_PARAMS = {
+    'gclid', 'gclsrc', 'dclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid',
+    'yclid', 'twclid', 'ttclid', 'igshid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for use as a cache key
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking query parameters (utm_*, gclid, ...), and uses '/' for an empty
+    path. Path and remaining query parameters are kept as-is, in order.
+    Unparseable URLs are returned stripped but otherwise unchanged.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    scheme = parts.scheme.lower()
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f'[{host}]'
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{port}'
+    if parts.username is not None:
+        userinfo = parts.username
+        if parts.password is not None:
+            userinfo += f':{parts.password}'
+        host = f'{userinfo}@{host}'
+
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class ScanCache:
+    """Thread-safe LRU cache of scan results with a time-to-live"""
+
+    def __init__(self, ttl: float = 600, maxsize: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttl: Seconds a result stays fresh
+            maxsize: Maximum number of cached results (least recently used
+                entries are evicted first)
+            clock: Time source, overridable for tests
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the fresh cached result for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # Callers annotate results (source, metadata...), so never hand out
+        # the cached object itself
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict):
+        """Cache a copy of a result under key"""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str):
+        """Drop the cached result for key, if any"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all cached results (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Cache counters for /stats"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
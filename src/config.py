@@ -26,9 +26,103 @@ SCORE_FEW_LINKS = 5
 SCORE_PASSWORD_FIELD = 15
 SCORE_SUSPICIOUS_FORM = 10
 SCORE_REDIRECT = 5
+SCORE_LONG_REDIRECT_CHAIN = 5
+SCORE_SUSPICIOUS_REDIRECT = 10  # a hop on another host with a suspicious domain
 SCORE_FETCH_FAILED = 10
+SCORE_KNOWN_SCAM_DOMAIN = 50  # host (or a parent domain) on the scam list
+
+# Rule limits (indicators fire past these values)
+LIMIT_DOMAIN_LENGTH = 20  # characters in the registered domain name
+LIMIT_DOMAIN_HYPHENS = 2
+LIMIT_DOMAIN_DIGITS = 3
+LIMIT_URGENCY_WORDS = 2  # urgency phrases found on the page
+LIMIT_EXCLAMATIONS = 10
+LIMIT_MIN_LINKS = 3  # pages with fewer links are flagged
+LIMIT_REDIRECT_HOPS = 3  # redirects before the final page
+LIMIT_REDIRECT_HOP_SCORE = 15  # domain score that makes a redirect hop suspicious
+
+# Optional domain reputation index built with `python -m src.reputation`
+# (known scam and known good domains; memory-mapped, not loaded)
+REPUTATION_FILE = None
+
+# Optional JSON rules file overriding the weights, thresholds, limits, flags
+# and phrase lists (see src/rules.py); checked for changes every second
+RULES_FILE = None
 
 # Feature flags
 ENABLE_REDIRECT_DETECTION = True
 ENABLE_FORM_ANALYSIS = True
 ENABLE_SCRIPT_ANALYSIS = True
+ENABLE_RESULT_CACHE = True
+ENABLE_SCAN_STORE = True
+
+# Content analysis: 'stream' extracts page features in one pass over parser
+# events; 'soup' builds a full BeautifulSoup tree (same results, slower)
+HTML_ANALYZER = 'stream'
+
+# Page download: bodies are streamed and cut off after this many bytes
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024  # larger pages are analyzed on this prefix
+
+# Redirects are followed hop by hop; redirect answers are reused for a while
+# so ads through the same tracking redirector skip those round trips
+REDIRECT_MAX_HOPS = 10
+REDIRECT_CACHE_TTL = 60  # seconds (0 disables the hop cache)
+REDIRECT_CACHE_MAX_ENTRIES = 10000
+
+# Content dedup: analyses of page bodies already seen are reused, and
+# near-identical pages (SimHash) share a campaign cluster ID
+CONTENT_INDEX_MAX_ENTRIES = 10000  # page bodies kept
+CAMPAIGN_MAX_DISTANCE = 3  # SimHash bits two pages of one campaign may differ in (0-3)
+
+# Fetch scheduling: per-host politeness and keep-alive connection reuse
+FETCH_PER_HOST = 4  # requests in flight per host; more wait their turn
+FETCH_POOL_SIZE = 10  # keep-alive connections kept per host
+FETCH_POOL_HOSTS = 100  # hosts whose connection pools are kept
+FETCH_MAX_RETRIES = 3  # retries of a 429 / 503 answer
+FETCH_BACKOFF = 0.5  # seconds before the first retry without Retry-After (doubles each time)
+FETCH_MAX_BACKOFF = 30  # longest wait honored; a longer Retry-After is not retried
+
+# Tiered scanning: stop after the URL, headers or partial-page tier once the
+# score can no longer drop below HIGH (or the caller's stop_level)
+EARLY_EXIT = True
+PARTIAL_BYTES = 64 * 1024  # page prefix scored before downloading the rest
+
+# Content analysis worker processes (0 = analyze in the API server process)
+ANALYSIS_WORKERS = 0
+ANALYSIS_MAX_TASK_MEMORY = 512 * 1024 * 1024  # bytes a worker may grow by for one page
+ANALYSIS_MAX_TASKS_PER_CHILD = 1000  # pages before a worker is replaced
+
+# Result cache (keyed on normalized URL)
+CACHE_TTL = 600  # seconds a scan result is reused
+CACHE_MAX_ENTRIES = 10000  # least recently used results are evicted beyond this
+
+# Persistent scan store (SQLite, in the log directory)
+SCAN_STORE_FILE = 'scan_cache.sqlite3'
+SCAN_STORE_TTL = 3600  # seconds before a stored result is revalidated
+SCAN_STORE_MAX_ENTRIES = 100000  # least recently used results are evicted beyond this
+
+# Scan log index (SQLite, next to scans.jsonl)
+LOG_INDEX_FILE = 'scans_index.sqlite3'
+
+# JSON encoding of API responses and scan log lines: 'auto' uses orjson or
+# msgspec when installed and the json module otherwise ('orjson', 'msgspec'
+# or 'json' to choose one)
+JSON_BACKEND = 'auto'
+
+# Background scan log writer
+LOG_QUEUE_SIZE = 10000  # entries waiting to be written; more are dropped (and counted)
+LOG_BATCH_SIZE = 100  # entries written per flush
+LOG_FLUSH_INTERVAL = 0.5  # seconds a pending entry may wait before a flush
+
+# Running /stats aggregates (JSON, next to scans.jsonl)
+STATS_FILE = 'stats.json'
+STATS_EXACT_UNIQUE_LIMIT = 10000  # unique URLs counted exactly; HyperLogLog estimate beyond
+STATS_DAY_EXACT_UNIQUE_LIMIT = 100  # the same for each day's rollup (kept for STATS_MAX_DAYS days)
+STATS_SAVE_INTERVAL = 60  # seconds between saves (the log is replayed from the saved offset)
+STATS_MAX_DAYS = 366  # upper bound for the /stats?days= window (and days kept in STATS_FILE)
+
+# Batch scanning (/batch-scan)
+BATCH_MAX_WORKERS = 8  # URLs scanned in parallel
+BATCH_REQUEST_MAX_WORKERS = 4  # of those, URLs of one request (so concurrent batches share the pool)
+BATCH_DEADLINE = 30  # seconds for a whole batch; unfinished URLs time out
+BATCH_MAX_DEADLINE = 120  # upper bound for a client-requested deadline
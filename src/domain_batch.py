@@ -0,0 +1,328 @@
+"""
+Batch domain scoring for large URL lists.
+
+Offline triage of ad logs scores millions of URLs on their domain alone.
+Calling ScamScanner._analyze_domain per URL parses every URL with urlsplit
+and builds indicator strings nobody reads. Here a URL list is turned into
+typed feature columns (one array per lexical feature, with host features
+computed once per distinct host), the rule limits are applied column by
+column and the SCORE_* weights are applied as a dot product: with NumPy
+when it is installed, otherwise with C-level map() over array.array
+columns. Scores and risk levels match _analyze_domain exactly.
+
+    python -m src.domain_batch --file urls.txt --output scores.tsv
+"""
+
+import re
+from array import array
+from itertools import product, repeat
+from operator import add, methodcaller, mul
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import scheme_chars, urlsplit
+
+import click
+
+from src.rules import IP_HOST, RulePlan, lexical_features
+
+if TYPE_CHECKING:
+    from src.reputation import ReputationIndex
+
+# Domain rules in dot product order; each is a weight name
+FEATURES = ('suspicious_tld', 'long_domain', 'multiple_hyphens', 'multiple_digits',
+            'no_https', 'ip_address', 'known_scam_domain')
+
+# Rules that still apply to known good hosts (the URL, not the host name)
+GOOD_HOST_FEATURES = ('no_https', 'ip_address')
+
+# Risk level of a URL urlsplit rejects (e.g. an unbalanced IPv6 bracket)
+INVALID = 'INVALID'
+
+# Most URLs are split with str methods mapped over the whole column (C
+# loops), with each check run on the joined column first: ASCII, a valid
+# scheme followed by '://', a netloc without IPv6 brackets or a zone ('%'),
+# and no tabs or newlines, which urlsplit removes first. The rest (IDNs,
+# IPv6 hosts, odd schemes...) go through urlsplit one by one.
+UNSAFE_CHARS = re.compile(r'[\t\r\n]')
+NETLOC = re.compile(r'[^?#]*')
+SCHEME_CHARS = frozenset(scheme_chars)
+
+_find_separator = methodcaller('find', '://')
+
+
+def split_url(url: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Scheme, netloc and host of a URL as urlsplit gives them
+
+    Returns:
+        (lowercased scheme, netloc, lowercased host or ''), or None when
+        urlsplit rejects the URL
+    """
+    try:
+        parsed = urlsplit(url)
+    except ValueError:
+        return None
+    return parsed.scheme, parsed.netloc, parsed.hostname or ''
+
+
+def _simple_scheme(scheme: str) -> bool:
+    """Whether urlsplit takes this as the scheme of 'scheme://...'"""
+    return scheme[:1].isascii() and scheme[:1].isalpha() and SCHEME_CHARS.issuperset(scheme)
+
+
+def split_urls(urls: Sequence[str]) -> Tuple[List[str], List[str], List[Optional[str]]]:
+    """
+    split_url of many URLs, as columns
+
+    Returns:
+        (schemes, netlocs, hosts); a URL urlsplit rejects has the host
+        None and an empty scheme and netloc
+    """
+    # URLs that need urlsplit
+    others = set()
+    text = '\n'.join(urls)
+    if not text.isascii() or '\t' in text or '\r' in text or text.count('\n') >= len(urls):
+        others.update(i for i, url in enumerate(urls)
+                      if not url.isascii() or UNSAFE_CHARS.search(url))
+
+    separators = list(map(_find_separator, urls))
+    if -1 in separators:
+        others.update(i for i, at in enumerate(separators) if at < 0)
+    schemes = list(map(str.__getitem__, urls, map(slice, separators)))
+    odd = {scheme for scheme in set(schemes) if not _simple_scheme(scheme)}
+    if odd:
+        others.update(i for i, scheme in enumerate(schemes) if scheme in odd)
+
+    # The netloc runs to the first '/', '?' or '#'
+    starts = list(map(add, separators, repeat(3)))
+    ends = list(map(str.find, urls, repeat('/'), starts))
+    if -1 in ends:
+        ends = [end if end >= 0 else len(url) for url, end in zip(urls, ends)]
+    netlocs = list(map(str.__getitem__, urls, map(slice, starts, ends)))
+    text = '\n'.join(netlocs)
+    if '?' in text or '#' in text:
+        netlocs = [NETLOC.match(netloc).group() if '?' in netloc or '#' in netloc else netloc
+                   for netloc in netlocs]
+    if '[' in text or ']' in text or '%' in text:
+        others.update(i for i, netloc in enumerate(netlocs)
+                      if '[' in netloc or ']' in netloc or '%' in netloc)
+
+    # Hosts repeat: each distinct netloc (and scheme) is handled once. The
+    # host is after the last '@' and before the first ':'
+    host_of = {netloc: netloc.rpartition('@')[2].partition(':')[0].lower()
+               for netloc in set(netlocs)}
+    hosts = list(map(host_of.__getitem__, netlocs))
+    lowercase = {scheme: scheme.lower() for scheme in set(schemes)}
+    schemes = list(map(lowercase.__getitem__, schemes))
+    for i in others:
+        schemes[i], netlocs[i], hosts[i] = split_url(urls[i]) or ('', '', None)
+    return schemes, netlocs, hosts
+
+
+class DomainColumns:
+    """Domain features of a URL list, one typed array per feature"""
+
+    def __init__(self):
+        self.valid = array('B')  # 0 when urlsplit rejects the URL
+        self.suspicious_tld = array('B')
+        self.domain_length = array('I')
+        self.hyphens = array('I')
+        self.digits = array('I')
+        self.http = array('B')
+        self.ip_literal = array('B')
+        self.reputation = array('b')  # 1 known scam, -1 known good, 0 not listed
+
+    def __len__(self):
+        return len(self.valid)
+
+
+def extract_columns(urls: Iterable[str], plan: RulePlan,
+                    reputation: Optional['ReputationIndex'] = None) -> DomainColumns:
+    """
+    Feature columns of a URL list
+
+    Host features (suffix split, counts, reputation) are computed once per
+    distinct host and gathered into the columns by host number.
+
+    Args:
+        urls: URLs to score
+        plan: Rule plan whose suspicious TLD list is used
+        reputation: Reputation index consulted per host, as the scanner does
+    """
+    if not isinstance(urls, Sequence):
+        urls = list(urls)
+    schemes, netlocs, hosts = split_urls(urls)
+
+    # Features per distinct host, by host number; host 0 stands for
+    # rejected URLs
+    host_ids = {None: 0}
+    host_tld, host_length = array('B', [0]), array('I', [0])
+    host_hyphens, host_digits, host_reputation = array('I', [0]), array('I', [0]), array('b', [0])
+    suspicious_tld = plan.suspicious_tld
+    for host in set(hosts):
+        if host in host_ids:
+            continue
+        host_ids[host] = len(host_length)
+        tld, length, hyphens, digits = lexical_features(host)
+        host_tld.append(tld in suspicious_tld)
+        host_length.append(length)
+        host_hyphens.append(hyphens)
+        host_digits.append(digits)
+        label = reputation.lookup(host) if reputation is not None and host else None
+        host_reputation.append(1 if label == 'scam' else -1 if label == 'good' else 0)
+
+    ids = array('I', map(host_ids.__getitem__, hosts))
+    columns = DomainColumns()
+    columns.valid = array('B', map(bool, ids))
+    columns.suspicious_tld = array('B', map(host_tld.__getitem__, ids))
+    columns.domain_length = array('I', map(host_length.__getitem__, ids))
+    columns.hyphens = array('I', map(host_hyphens.__getitem__, ids))
+    columns.digits = array('I', map(host_digits.__getitem__, ids))
+    columns.http = array('B', map('http'.__eq__, schemes))
+    ip_literal = {netloc: IP_HOST.match(netloc) is not None for netloc in set(netlocs)}
+    columns.ip_literal = array('B', map(ip_literal.__getitem__, netlocs))
+    columns.reputation = array('b', map(host_reputation.__getitem__, ids))
+    return columns
+
+
+def _numpy(use_numpy: Optional[bool]):
+    """numpy if it should and can be used, else None"""
+    if use_numpy is False:
+        return None
+    try:
+        import numpy
+    except ImportError:
+        if use_numpy:
+            raise
+        return None
+    return numpy
+
+
+def score_columns(columns: DomainColumns, plan: RulePlan,
+                  use_numpy: Optional[bool] = None) -> array:
+    """
+    Domain scores of feature columns (array of signed 64-bit ints)
+
+    Args:
+        columns: Columns from extract_columns
+        plan: Rule plan whose weights and limits are applied
+        use_numpy: True to require NumPy, False to use array.array only;
+            None uses NumPy when it is installed
+    """
+    limits = plan.limits
+    weights = array('q', [plan.weights[feature] for feature in FEATURES])
+    np = _numpy(use_numpy)
+
+    if np is not None:
+        def column(values, dtype):
+            return np.frombuffer(values, dtype=dtype)
+
+        features = np.stack([
+            column(columns.suspicious_tld, np.uint8),
+            column(columns.domain_length, np.uint32) > limits['domain_length'],
+            column(columns.hyphens, np.uint32) > limits['domain_hyphens'],
+            column(columns.digits, np.uint32) > limits['domain_digits'],
+            column(columns.http, np.uint8),
+            column(columns.ip_literal, np.uint8),
+            column(columns.reputation, np.int8) == 1,
+        ], axis=1).astype(np.int64)
+        scores = features @ column(weights, np.int64)
+        # A known good host is not scored on its lexical features
+        good = column(columns.reputation, np.int8) == -1
+        good_weights = column(array('q', [weight if feature in GOOD_HOST_FEATURES else 0
+                                          for feature, weight in zip(FEATURES, weights)]), np.int64)
+        scores[good] = features[good] @ good_weights
+        return array('q', scores.astype(np.int64).tobytes())
+
+    # Without NumPy: the dot product of each of the 2**8 combinations of
+    # rule outcomes (and known good) is computed once, and each row looks
+    # its combination up; zip() and the lookup run in C
+    features = [
+        columns.suspicious_tld,
+        map(limits['domain_length'].__lt__, columns.domain_length),
+        map(limits['domain_hyphens'].__lt__, columns.hyphens),
+        map(limits['domain_digits'].__lt__, columns.digits),
+        columns.http,
+        columns.ip_literal,
+        map((1).__eq__, columns.reputation),
+        map((-1).__eq__, columns.reputation),
+    ]
+    good_weights = [weight if feature in GOOD_HOST_FEATURES else 0
+                    for feature, weight in zip(FEATURES, weights)]
+    products = {}
+    for outcomes in product((0, 1), repeat=len(FEATURES) + 1):
+        *fired, good = outcomes
+        # A known good host is not scored on its lexical features
+        products[outcomes] = sum(map(mul, fired, good_weights if good else weights))
+    return array('q', map(products.__getitem__, zip(*features)))
+
+
+def risk_levels(scores: Iterable[int], plan: RulePlan,
+                valid: Optional[Iterable[int]] = None) -> List[str]:
+    """
+    Risk levels of scores (each distinct score is looked up once)
+
+    Args:
+        scores: Scores from score_columns
+        plan: Rule plan whose thresholds are used
+        valid: Column marking URLs urlsplit rejected (0), which get INVALID
+    """
+    scores = list(scores)
+    levels = {score: plan.risk_level(score) for score in set(scores)}
+    result = list(map(levels.__getitem__, scores))
+    if valid is not None:
+        for i, ok in enumerate(valid):
+            if not ok:
+                result[i] = INVALID
+    return result
+
+
+def score_domains(urls: Iterable[str], plan: RulePlan,
+                  reputation: Optional['ReputationIndex'] = None,
+                  use_numpy: Optional[bool] = None) -> Tuple[array, List[str]]:
+    """
+    Domain scores and risk levels of a URL list
+
+    The same scores as ScamScanner._analyze_domain(url)[0] with the same
+    plan and reputation index, and the risk levels of those scores; URLs
+    urlsplit rejects get a score of 0 and the level INVALID.
+
+    Args:
+        urls: URLs to score
+        plan: Rule plan (weights, limits, thresholds, suspicious TLDs)
+        reputation: Reputation index consulted per host
+        use_numpy: True to require NumPy, False to use array.array only;
+            None uses NumPy when it is installed
+
+    Returns:
+        (scores as an array of signed 64-bit ints, risk levels), in input order
+    """
+    columns = extract_columns(urls, plan, reputation)
+    scores = score_columns(columns, plan, use_numpy)
+    return scores, risk_levels(scores, plan, columns.valid)
+
+
+@click.command()
+@click.option('--file', '-f', 'url_file', required=True, type=click.File('r', encoding='utf-8'),
+              help="URL list, one per line ('-' for stdin, '#' comments allowed)")
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='TSV file to write (score, risk level, URL per line; default: stdout)')
+@click.option('--reputation', 'reputation_file', type=click.Path(exists=True, dir_okay=False),
+              help='Domain reputation index built with python -m src.reputation')
+@click.option('--rules', 'rules_file', type=click.Path(exists=True, dir_okay=False),
+              help='JSON rules file overriding the src/config.py weights and limits')
+def main(url_file, output, reputation_file, rules_file):
+    """Score a URL list on domain features only"""
+    from src.batch import read_urls
+    from src.reputation import ReputationIndex
+    from src.scanner import ScamScanner
+
+    reputation = ReputationIndex(reputation_file) if reputation_file else None
+    scanner = ScamScanner(rules_file=rules_file, reputation=reputation)
+    urls = list(read_urls(url_file))
+    scores, levels = scanner.analyze_domains(urls)
+    output.writelines(f'{score}\t{level}\t{url}\n' for score, level, url in zip(scores, levels, urls))
+    click.echo(f"Scored {len(urls)} URLs", err=True)
+
+
+if __name__ == '__main__':
+    main()
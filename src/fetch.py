@@ -0,0 +1,194 @@
+"""
+Bounded, streamed reading of HTTP response bodies.
+
+Landing pages are read in chunks up to a byte budget and decoded
+incrementally, so a hostile page serving hundreds of megabytes cannot
+exhaust worker memory. The content type is settled from the headers and the
+first chunk before anything is decoded, and binary responses (images,
+archives, executables...) are never decoded as text.
+"""
+
+import codecs
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+# Default byte budget for one response body
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Prefix scored before downloading the rest of a page
+PARTIAL_BYTES = 64 * 1024
+
+TEXT_TYPES = {
+    'application/xhtml+xml', 'application/xml', 'application/json',
+    'application/javascript', 'application/ecmascript', 'application/ld+json',
+}
+BINARY_PREFIXES = ('image/', 'audio/', 'video/', 'font/')
+BINARY_TYPES = {
+    'application/zip', 'application/x-zip-compressed', 'application/gzip',
+    'application/x-gzip', 'application/x-tar', 'application/x-7z-compressed',
+    'application/x-rar-compressed', 'application/vnd.rar', 'application/pdf',
+    'application/x-msdownload', 'application/x-msi', 'application/x-executable',
+    'application/x-sh', 'application/java-archive', 'application/wasm',
+    'application/vnd.android.package-archive', 'application/x-apple-diskimage',
+    'application/x-shockwave-flash',
+}
+
+# Leading bytes of common binary formats
+MAGIC_NUMBERS = (
+    b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'RIFF',
+    b'BM', b'\x00\x00\x01\x00', b'%PDF-', b'PK\x03\x04', b'PK\x05\x06',
+    b'\x1f\x8b', b'7z\xbc\xaf\x27\x1c', b'Rar!\x1a\x07', b'MZ', b'\x7fELF',
+    b'\xca\xfe\xba\xbe', b'\x00asm', b'wOFF', b'wOF2', b'OggS', b'ID3', b'fLaC',
+)
+
+
+class Body(NamedTuple):
+    """A response body read within the byte budget"""
+    content: bytes
+    text: Optional[str]
+    content_type: str
+    truncated: bool
+    binary: bool
+    complete: bool  # nothing more will be read (end of body, budget or binary)
+
+
+def media_type(response: 'requests.Response') -> str:
+    """Lowercased media type of a response without parameters ('' if absent)"""
+    return response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+
+
+def is_binary(content_type: str, prefix: bytes) -> bool:
+    """
+    Whether a body is binary, from its declared type and first bytes
+
+    Declared text types are trusted: a page can start with bytes that
+    happen to be a short signature ('MZ', 'BM'...), and two prepended bytes
+    must not exempt it from analysis. Other types are sniffed for a known
+    binary signature, and missing or generic types (application/octet-stream)
+    are also treated as binary when the first bytes contain NUL.
+    """
+    if (content_type.startswith('text/') or content_type in TEXT_TYPES
+            or content_type.endswith(('+xml', '+json'))):
+        return False
+    if content_type.startswith(BINARY_PREFIXES) or content_type in BINARY_TYPES:
+        return True
+    return prefix.startswith(MAGIC_NUMBERS) or b'\x00' in prefix[:1024]
+
+
+class BodyReader:
+    """
+    Incremental reader for a streamed response (requested with stream=True)
+
+    read() can be called with growing sizes to look at a prefix of the page
+    first and continue downloading only when needed.
+    """
+
+    def __init__(self, response: 'requests.Response', max_bytes: int = MAX_RESPONSE_BYTES,
+                 chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            response: Response of a request made with stream=True
+            max_bytes: Byte budget for the body
+            chunk_size: Bytes read per chunk
+        """
+        self.response = response
+        self.max_bytes = max_bytes
+        self.content_type = media_type(response)
+        self.size = 0
+        self.truncated = False
+        self.complete = False
+        self.binary = None
+        self._chunks = []
+        self._parts = []
+        self._decoder = None
+        self._stream = response.iter_content(chunk_size=chunk_size)
+
+    def read(self, size: Optional[int] = None) -> Body:
+        """
+        Read until at least size bytes (default: the whole body) are in
+
+        Text is decoded chunk by chunk with the charset from the headers; when
+        there is none, it is detected from the bytes read, like requests'
+        Response.text. A character cut off by the byte budget is dropped.
+        Binary bodies stop after the first chunk and are not decoded.
+
+        Returns:
+            Body with everything read so far
+        """
+        while not self.complete and (size is None or self.size < size):
+            chunk = next(self._stream, None)
+            if chunk is None:
+                self.complete = True
+                if self._decoder is not None:
+                    self._parts.append(self._decoder.decode(b'', final=True))
+                break
+            if not chunk:
+                continue
+            if self.size + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - self.size]
+                self.truncated = True
+            self.size += len(chunk)
+            self._chunks.append(chunk)
+
+            if self.binary is None:
+                self.binary = is_binary(self.content_type, chunk)
+                if self.binary:
+                    # Enough to hash and identify; the rest is never read
+                    self.complete = True
+                    break
+                self._decoder = _decoder(self.response.encoding)
+            if self._decoder is not None:
+                self._parts.append(self._decoder.decode(chunk))
+            if self.truncated:
+                self.complete = True
+        return self.body()
+
+    def body(self) -> Body:
+        """What has been read so far"""
+        content = b''.join(self._chunks)
+        self._chunks = [content]
+        if self.binary:
+            return Body(content, None, self.content_type, self.truncated, True, self.complete)
+
+        if self._decoder is None:
+            text = content.decode(_detect_encoding(content), errors='replace')
+        else:
+            text = ''.join(self._parts)
+            self._parts = [text]
+        return Body(content, text, self.content_type, self.truncated, False, self.complete)
+
+
+def read_body(response: 'requests.Response', max_bytes: int = MAX_RESPONSE_BYTES,
+              chunk_size: int = CHUNK_SIZE) -> Body:
+    """
+    Read a streamed response (requested with stream=True) up to max_bytes
+
+    Args:
+        response: Response of a request made with stream=True
+        max_bytes: Byte budget for the body
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Body with the bytes read, the decoded text (None when binary), the
+        media type and whether the body was cut at max_bytes
+    """
+    return BodyReader(response, max_bytes, chunk_size).read()
+
+
+def _decoder(encoding: Optional[str]):
+    if not encoding:
+        return None
+    try:
+        return codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        return None
+
+
+def _detect_encoding(content: bytes) -> str:
+    """Charset guess for a body without a declared one (what requests does)"""
+    if not content:
+        return 'utf-8'
+    import requests
+    return requests.compat.chardet.detect(content)['encoding'] or 'utf-8'
@@ -0,0 +1,239 @@
+"""
+Landing page fingerprints and campaign clustering.
+
+Scam campaigns serve the same landing page from many throwaway domains,
+byte for byte or with small changes (tracking IDs, nonces, a swapped
+domain name). ContentIndex keeps a bounded map from the SHA-256 of a page
+body to its content analysis, so a body that was already analyzed is not
+parsed again, and a SimHash of the page's normalized words, so near-identical
+pages fall into the same campaign cluster.
+
+Only exact body matches reuse an analysis: near-identical pages may differ
+in exactly what the content rules count (a keyword, a form), so they share
+a cluster but are analyzed on their own. Pages with too little text to
+fingerprint (error pages, bare redirect stubs) are not clustered at all:
+their few shingles would put unrelated pages in one campaign.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from src.result import Indicator
+
+# Page bodies whose analysis and fingerprint are kept
+CONTENT_INDEX_SIZE = 10000
+# Pages whose SimHashes differ in at most this many bits are one campaign
+CLUSTER_DISTANCE = 3
+
+FINGERPRINT_BITS = 64
+# Words hashed together; single words would make unrelated pages in one
+# language look alike
+SHINGLE_WORDS = 3
+# Pages with fewer distinct shingles get no fingerprint: a handful of
+# shingles ('page not found') is shared by unrelated sites
+MIN_SHINGLES = 8
+# The fingerprint is split into this many bands: two fingerprints within
+# CLUSTER_DISTANCE bits agree on at least one band (CLUSTER_DISTANCE must be
+# smaller than BANDS), so near neighbors are found by band lookups
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Characters of a page fingerprinted: campaign copies share their template
+# from the top, and fingerprinting all of a large page would cost more than
+# analyzing it
+FINGERPRINT_CHARS = 32 * 1024
+
+# Words of the page text, letters only: markup, numbers (IDs, prices,
+# dates), punctuation and case do not tell campaigns apart
+TAG = re.compile(r'<[^>]*>')
+WORD = re.compile(r'[^\W\d_]+')
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash of the normalized words of a page's text
+
+    Each distinct run of SHINGLE_WORDS words in the first FINGERPRINT_CHARS
+    characters is hashed; a bit of the result is set when it is set in more
+    than half of the shingle hashes. Pages with fewer than MIN_SHINGLES
+    distinct shingles return None.
+    """
+    words = WORD.findall(TAG.sub(' ', text[:FINGERPRINT_CHARS]).lower())
+    shingles = {' '.join(shingle)
+                for shingle in set(zip(*(words[i:] for i in range(SHINGLE_WORDS))))}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+
+    # Bit columns counted in C: one binary string per shingle, transposed
+    bits = [format(int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big'),
+                   '064b') for shingle in shingles]
+    fingerprint = 0
+    for column in zip(*bits):
+        fingerprint = fingerprint << 1 | (column.count('1') * 2 > len(bits))
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits"""
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    return [(band, fingerprint >> (band * BAND_BITS) & BAND_MASK) for band in range(BANDS)]
+
+
+class _Entry(NamedTuple):
+    fingerprint: Optional[int]
+    cluster: Optional[str]
+    analysis: Tuple[int, Tuple[Indicator, ...]]
+    version: int
+
+
+class ContentIndex:
+    """Thread-safe LRU map from page bodies to their analysis and campaign cluster"""
+
+    def __init__(self, maxsize: int = CONTENT_INDEX_SIZE, distance: int = CLUSTER_DISTANCE):
+        """
+        Args:
+            maxsize: Page bodies kept (least recently seen are evicted first)
+            distance: Largest SimHash distance within a campaign cluster
+                (below BANDS)
+        """
+        if not 0 <= distance < BANDS:
+            raise ValueError(f'distance must be between 0 and {BANDS - 1}')
+        self.maxsize = maxsize
+        self.distance = distance
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._bands: Dict[Tuple[int, int], Set[str]] = {}
+        # Cluster ID -> [page bodies kept, scans]
+        self._clusters: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, digest: str,
+            version: int = 0) -> Optional[Tuple[Tuple[int, List[Indicator]], Optional[str]]]:
+        """
+        Analysis and cluster of a page body seen before
+
+        Args:
+            digest: SHA-256 hex digest of the body
+            version: Rules version the analysis must have been made with
+
+        Returns:
+            ((score, indicators), cluster ID), or None; the cluster ID is
+            None for a page without a fingerprint
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            if entry.cluster is not None:
+                self._clusters[entry.cluster][1] += 1
+            self.hits += 1
+            score, indicators = entry.analysis
+            return (score, list(indicators)), entry.cluster
+
+    def add(self, digest: str, fingerprint: Optional[int], analysis: Tuple[int, List[Indicator]],
+            version: int = 0) -> Optional[str]:
+        """
+        Remember an analyzed page body
+
+        Args:
+            digest: SHA-256 hex digest of the body
+            fingerprint: simhash() of the page; None keeps the body for
+                exact reuse only, outside any cluster
+            analysis: (score, indicators) of its content analysis
+            version: Rules version of the analysis
+
+        Returns:
+            Campaign cluster ID: the one of the nearest page kept within
+            distance, or a new one (the page's fingerprint in hex); None
+            without a fingerprint
+        """
+        score, indicators = analysis
+        with self._lock:
+            previous = self._entries.get(digest)
+            if previous is not None:
+                # Re-analyzed under new rules: same page, same cluster
+                self._entries[digest] = previous._replace(
+                    analysis=(score, tuple(indicators)), version=version)
+                self._entries.move_to_end(digest)
+                if previous.cluster is not None:
+                    self._clusters[previous.cluster][1] += 1
+                return previous.cluster
+
+            cluster = None
+            if fingerprint is not None:
+                cluster = self._nearest(fingerprint) or f'{fingerprint:016x}'
+                for band in _bands(fingerprint):
+                    self._bands.setdefault(band, set()).add(digest)
+                counts = self._clusters.setdefault(cluster, [0, 0])
+                counts[0] += 1
+                counts[1] += 1
+            self._entries[digest] = _Entry(fingerprint, cluster, (score, tuple(indicators)), version)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return cluster
+
+    def _nearest(self, fingerprint: int) -> Optional[str]:
+        """Cluster of the closest kept page within distance"""
+        best, best_distance = None, self.distance + 1
+        for band in _bands(fingerprint):
+            for digest in self._bands.get(band, ()):
+                entry = self._entries[digest]
+                distance = hamming(fingerprint, entry.fingerprint)
+                if distance < best_distance:
+                    best, best_distance = entry.cluster, distance
+        return best
+
+    def _remove(self, digest: str):
+        entry = self._entries.pop(digest)
+        if entry.fingerprint is None:
+            return
+        for band in _bands(entry.fingerprint):
+            members = self._bands[band]
+            members.discard(digest)
+            if not members:
+                del self._bands[band]
+        counts = self._clusters[entry.cluster]
+        counts[0] -= 1
+        if not counts[0]:
+            del self._clusters[entry.cluster]
+
+    def clear(self):
+        """Forget all pages (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bands.clear()
+            self._clusters.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self, top: int = 10) -> Dict:
+        """Counters and the largest campaign clusters (by scans) for /stats"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            largest = sorted(self._clusters.items(), key=lambda item: item[1][1], reverse=True)
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'clusters': len(self._clusters),
+                'largest_clusters': {
+                    cluster: {'pages': pages, 'scans': scans}
+                    for cluster, (pages, scans) in largest[:top]
+                },
+            }
@@ -0,0 +1,195 @@
+"""
+Single-pass extraction of the page features content analysis looks at.
+
+The scanner only needs the visible text, the title, whether there is a meta
+description, the number of links, the form actions and the number of
+password inputs. extract_features() collects all of them from the events of
+lxml's HTML parser (the same parser and events BeautifulSoup's 'lxml'
+builder consumes) without building a tree, and reproduces BeautifulSoup's
+text rules so the results match soup_features(), the tree-based reference.
+"""
+
+from collections import Counter
+from typing import List, NamedTuple, Optional
+
+
+class PageFeatures(NamedTuple):
+    """What _analyze_content needs to know about a page"""
+    text: str
+    title: Optional[str]
+    has_meta_description: bool
+    link_count: int
+    form_actions: List[Optional[str]]
+    password_fields: int
+
+
+# BeautifulSoup's HTML builder keeps strings inside these tags out of
+# get_text(), and does not collapse whitespace inside the preserving tags
+STRING_CONTAINERS = frozenset(['rt', 'rp', 'style', 'script', 'template'])
+PRESERVE_WHITESPACE = frozenset(['pre', 'textarea'])
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+class _FeatureCollector:
+    """lxml parser target that gathers PageFeatures from parse events"""
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.has_meta_description = False
+        self.link_count = 0
+        self.form_actions: List[Optional[str]] = []
+        self.password_fields = 0
+
+        self._data: List[str] = []
+        self._open: List[str] = []
+        self._open_count = Counter()
+        self._containers: List[int] = []
+        self._preserving: List[int] = []
+
+        # Children of the first <title>, kept as nested lists so its
+        # BeautifulSoup .string can be worked out
+        self._title: Optional[list] = None
+        self._title_nodes: List[list] = []
+        self._title_depth = 0
+
+    # -- parser target interface ----------------------------------------
+
+    def start(self, tag, attrib, nsmap=None):
+        self._end_data()
+        if tag == 'meta':
+            if attrib.get('name') == 'description':
+                self.has_meta_description = True
+        elif tag == 'a':
+            if attrib.get('href') is not None:
+                self.link_count += 1
+        elif tag == 'form':
+            self.form_actions.append(attrib.get('action'))
+        elif tag == 'input':
+            if attrib.get('type') == 'password':
+                self.password_fields += 1
+
+        self._open.append(tag)
+        self._open_count[tag] += 1
+        depth = len(self._open)
+        if tag in PRESERVE_WHITESPACE:
+            self._preserving.append(depth)
+        if tag in STRING_CONTAINERS:
+            self._containers.append(depth)
+
+        if self._title_nodes:
+            node = []
+            self._title_nodes[-1].append(node)
+            self._title_nodes.append(node)
+        elif tag == 'title' and self._title is None:
+            self._title = []
+            self._title_nodes.append(self._title)
+            self._title_depth = depth
+
+    def end(self, tag):
+        self._end_data()
+        # Pop up to and including the most recent open tag of this name
+        if not self._open_count[tag]:
+            return
+        while self._open:
+            popped = self._pop()
+            if popped == tag:
+                break
+
+    def data(self, data):
+        self._data.append(data)
+
+    def comment(self, text):
+        self._end_data()
+        self._data.append(text)
+        self._end_data(visible=False)
+
+    def doctype(self, *args):
+        self._end_data()
+
+    def pi(self, target, data):
+        self._end_data()
+        self._data.append(f'{target} {data}')
+        self._end_data(visible=False)
+
+    def close(self):
+        self._end_data()
+
+    # -- helpers ---------------------------------------------------------
+
+    def _pop(self) -> str:
+        depth = len(self._open)
+        tag = self._open.pop()
+        self._open_count[tag] -= 1
+        if self._preserving and self._preserving[-1] == depth:
+            self._preserving.pop()
+        if self._containers and self._containers[-1] == depth:
+            self._containers.pop()
+        if self._title_nodes and depth >= self._title_depth:
+            self._title_nodes.pop()
+        return tag
+
+    def _end_data(self, visible: bool = True):
+        if not self._data:
+            return
+        string = ''.join(self._data)
+        self._data = []
+        if not self._preserving and not string.strip(ASCII_SPACES):
+            string = '\n' if '\n' in string else ' '
+        if self._title_nodes:
+            self._title_nodes[-1].append(string)
+        if visible and not self._containers:
+            self.text.append(string)
+
+    def title_string(self) -> Optional[str]:
+        """The title's only string, like BeautifulSoup's soup.title.string"""
+        node = self._title
+        while node is not None:
+            if len(node) != 1:
+                return None
+            node = node[0]
+            if isinstance(node, str):
+                return node
+        return None
+
+    def features(self) -> PageFeatures:
+        return PageFeatures(
+            text=''.join(self.text),
+            title=self.title_string(),
+            has_meta_description=self.has_meta_description,
+            link_count=self.link_count,
+            form_actions=self.form_actions,
+            password_fields=self.password_fields,
+        )
+
+
+def extract_features(html: str) -> PageFeatures:
+    """Collect page features in one pass over lxml parser events"""
+    # Imported on first use, so scans that never analyze a page skip it
+    from lxml import etree
+    if html.startswith('\N{BYTE ORDER MARK}'):
+        html = html[1:]
+    collector = _FeatureCollector()
+    parser = etree.HTMLParser(target=collector, recover=True)
+    try:
+        parser.feed(html)
+        parser.close()
+    except (UnicodeDecodeError, LookupError, etree.ParserError):
+        # Markup lxml rejects as text: BeautifulSoup retries it as UTF-8
+        # bytes, so let it handle the odd case
+        return soup_features(html)
+    return collector.features()
+
+
+def soup_features(html: str) -> PageFeatures:
+    """Collect page features from a full BeautifulSoup tree (reference implementation)"""
+    # Imported on first use: the streaming path never builds a tree
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'lxml')
+    return PageFeatures(
+        text=soup.get_text(),
+        title=soup.title.string if soup.title else None,
+        has_meta_description=soup.find('meta', attrs={'name': 'description'}) is not None,
+        link_count=len(soup.find_all('a', href=True)),
+        form_actions=[form.get('action') for form in soup.find_all('form')],
+        password_fields=len(soup.find_all('input', attrs={'type': 'password'})),
+    )
@@ -0,0 +1,141 @@
+"""
+JSON encoding for API responses and the scan log.
+
+Every scan is serialized for its response and its log line, and /logs,
+/stats and the log index parse log lines back. A JSONBackend wraps one JSON
+library behind the same three calls: dumps() to UTF-8 bytes, loads(), and
+fields(), a decoder that returns only the top-level fields a reader filters
+on. json_backend() picks orjson, then msgspec, when installed and falls
+back to the standard library json module, so neither is a requirement.
+
+msgspec decodes fields() lines into a struct of just those fields, skipping
+the rest of the line without building Python objects for it; orjson and
+json parse the line and pick the fields.
+"""
+
+import functools
+import json
+from typing import Any, Callable, Dict, Iterable, Tuple, Union
+
+# Tried in this order by json_backend('auto')
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+Decoder = Callable[[Union[bytes, str]], Dict[str, Any]]
+
+
+class JSONBackend:
+    """dumps/loads of one JSON library; invalid input raises ValueError"""
+
+    name = 'json'
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize obj to UTF-8 JSON (raises TypeError for unsupported types)"""
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def fields(self, names: Iterable[str]) -> Decoder:
+        """
+        Decoder of JSON objects that returns only the given top-level fields
+
+        Missing fields are None; input that is not a JSON object raises
+        ValueError.
+        """
+        names = tuple(names)
+        loads = self.loads
+
+        def decode(data):
+            obj = loads(data)
+            if not isinstance(obj, dict):
+                raise ValueError('not a JSON object')
+            return {name: obj.get(name) for name in names}
+        return decode
+
+
+class _Orjson(JSONBackend):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._dumps = orjson.dumps
+        self.loads = orjson.loads
+        # Non-string keys are converted like the json module does
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj, option=self._options)
+
+
+class _Msgspec(JSONBackend):
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self._encode = msgspec.json.Encoder().encode
+        self._decode = msgspec.json.Decoder().decode
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self._decode(data)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def fields(self, names: Iterable[str]) -> Decoder:
+        names = tuple(names)
+        msgspec = self._msgspec
+        struct = msgspec.defstruct('Fields', [(name, Any, None) for name in names])
+        decode_struct = msgspec.json.Decoder(struct).decode
+
+        def decode(data):
+            try:
+                decoded = decode_struct(data)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+            return {name: getattr(decoded, name) for name in names}
+        return decode
+
+
+_CLASSES = {'orjson': _Orjson, 'msgspec': _Msgspec, 'json': JSONBackend}
+
+
+@functools.lru_cache(maxsize=None)
+def json_backend(name: str = 'auto') -> JSONBackend:
+    """
+    JSON backend by name (shared instances)
+
+    Args:
+        name: 'orjson', 'msgspec', 'json', or 'auto' for the first of those
+            that is installed
+
+    Raises:
+        ValueError: Unknown backend, or a named backend is not installed
+    """
+    if name == 'auto':
+        for candidate in BACKENDS:
+            try:
+                return _CLASSES[candidate]()
+            except ImportError:
+                continue
+    if name not in _CLASSES:
+        raise ValueError(f'Unknown JSON backend: {name}')
+    try:
+        return _CLASSES[name]()
+    except ImportError as e:
+        raise ValueError(f'JSON backend {name} is not installed') from e
+
+
+def available_backends() -> Tuple[str, ...]:
+    """Names of the installed backends, fastest first"""
+    names = []
+    for name in BACKENDS:
+        try:
+            json_backend(name)
+        except ValueError:
+            continue
+        names.append(name)
+    return tuple(names)
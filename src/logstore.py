@@ -0,0 +1,364 @@
+"""
+Indexed scan log storage.
+
+scans.jsonl stays the append-only source of truth; LogStore keeps a SQLite
+index of it (timestamp, risk level, source, URL host, plus a trigram index
+over URLs) that is brought up to date incrementally from the last imported
+byte offset. Queries then touch only the matching rows instead of parsing
+the whole log.
+
+Plain "most recent N" queries do not need the index at all: tail() reads
+scans.jsonl backwards from the end and stops after N matches.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from src.jsonio import JSONBackend, json_backend
+
+# Rows inserted per transaction while importing
+IMPORT_BATCH = 10000
+
+# Bytes read per step when reading the log backwards
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Fields of a log line the index is built from
+INDEXED_FIELDS = ('timestamp', 'risk_level', 'source', 'url')
+
+
+def url_host(url: Optional[str]) -> str:
+    """Lowercased host of a logged URL ('' if it has none)"""
+    # Fast path for the common scheme://host[:port]/... shape; urlsplit is
+    # the bulk of the import cost otherwise
+    _, sep, rest = (url or '').partition('://')
+    if sep:
+        netloc = rest.split('/', 1)[0].split('?', 1)[0].split('#', 1)[0]
+        if netloc and not any(c in netloc for c in '@[\\ '):
+            return netloc.partition(':')[0].lower()
+    try:
+        return (urlsplit(url or '').hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+def iter_lines_reversed(path: str, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Yield the complete lines of a file, last line first
+
+    Reads backwards from the end in blocks. Only the bytes present when
+    reading starts are considered, and a last line without its newline
+    (still being appended) is skipped, so concurrent appends are safe. If
+    the file is truncated while reading, iteration just stops.
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        buffer = b''
+        partial_tail = True
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            chunk = f.read(size)
+            if len(chunk) != size:
+                return
+            buffer = chunk + buffer
+
+            if partial_tail:
+                end = buffer.rfind(b'\n')
+                if end < 0:
+                    continue
+                buffer = buffer[:end]
+                partial_tail = False
+
+            lines = buffer.split(b'\n')
+            buffer = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+
+        if not partial_tail and buffer.strip():
+            yield buffer
+
+
+def tail(log_file: str, limit: int = 100, risk_level: Optional[str] = None,
+         block_size: int = TAIL_BLOCK_SIZE,
+         serializer: Optional[JSONBackend] = None) -> List[Dict]:
+    """
+    Most recent entries of a JSONL scan log, newest first
+
+    Reads only as much of the end of the file as needed to find `limit`
+    entries, so the cost does not grow with the size of the log.
+
+    Args:
+        log_file: JSONL scan log
+        limit: Maximum number of entries
+        risk_level: Only return entries with this exact risk level
+        block_size: Bytes read per step
+        serializer: JSON backend to parse with (default: the fastest
+            installed)
+    """
+    if limit <= 0 or not os.path.exists(log_file):
+        return []
+
+    serializer = serializer or json_backend()
+    # Cheap byte-level pre-check before parsing; the parsed value decides
+    needle = serializer.dumps(risk_level) if risk_level else None
+    results = []
+    for raw in iter_lines_reversed(log_file, block_size):
+        if needle is not None and needle not in raw:
+            continue
+        try:
+            log = serializer.loads(raw)
+        except ValueError:
+            continue
+        if not isinstance(log, dict):
+            continue
+        if risk_level and log.get('risk_level') != risk_level:
+            continue
+        results.append(log)
+        if len(results) >= limit:
+            break
+    return results
+
+
+class LogStore:
+    """SQLite index over a JSONL scan log"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY,
+            timestamp TEXT,
+            risk_level TEXT,
+            source TEXT,
+            url TEXT,
+            host TEXT,
+            entry TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS logs_timestamp ON logs (timestamp);
+        CREATE INDEX IF NOT EXISTS logs_risk_level ON logs (risk_level, id);
+        CREATE INDEX IF NOT EXISTS logs_source ON logs (source, id);
+        CREATE INDEX IF NOT EXISTS logs_host ON logs (host, id);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    '''
+
+    def __init__(self, path: str, log_file: Optional[str] = None,
+                 serializer: Optional[JSONBackend] = None):
+        """
+        Args:
+            path: SQLite database file for the index (created if missing)
+            log_file: JSONL log that sync() imports from
+            serializer: JSON backend to parse with (default: the fastest
+                installed)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.log_file = log_file
+        serializer = serializer or json_backend()
+        self._loads = serializer.loads
+        # Imported lines are stored as they are; only the indexed fields
+        # are decoded
+        self._indexed_fields = serializer.fields(INDEXED_FIELDS)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        self.has_url_index = self._create_url_index()
+
+    def _create_url_index(self) -> bool:
+        """Trigram full-text index for substring URL lookups, if SQLite has FTS5"""
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS logs_url "
+                "USING fts5(url, content='logs', content_rowid='id', tokenize='trigram')"
+            )
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    # -- importing -----------------------------------------------------
+
+    def _get_meta(self, key: str, default=None):
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value):
+        self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    def sync(self, log_file: Optional[str] = None) -> int:
+        """
+        Import entries appended to the JSONL log since the last sync
+
+        Only complete lines are imported, so a line that is still being
+        written is picked up by the next sync. If the log shrank (rotated or
+        replaced), the index is rebuilt from the start.
+
+        Returns:
+            Number of entries imported
+        """
+        log_file = log_file or self.log_file
+        if not log_file or not os.path.exists(log_file):
+            return 0
+
+        meta_key = f'offset:{os.path.abspath(log_file)}'
+        with self._lock:
+            offset = int(self._get_meta(meta_key, 0))
+            size = os.path.getsize(log_file)
+            if size < offset:
+                self.clear()
+                offset = 0
+            if size == offset:
+                return 0
+
+            imported = 0
+            with open(log_file, 'rb') as f:
+                f.seek(offset)
+                batch = []
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break
+                    offset += len(raw)
+                    row = self._row(raw)
+                    if row is not None:
+                        batch.append(row)
+                    if len(batch) >= IMPORT_BATCH:
+                        imported += self._insert(batch, meta_key, offset)
+                        batch = []
+                imported += self._insert(batch, meta_key, offset)
+            return imported
+
+    def import_jsonl(self, log_file: str) -> int:
+        """Import an existing JSONL log (incrementally, like sync)"""
+        return self.sync(log_file)
+
+    def _row(self, raw: bytes):
+        line = raw.decode('utf-8', errors='replace').strip()
+        if not line:
+            return None
+        try:
+            log = self._indexed_fields(line)
+        except ValueError:
+            return None
+        url = log['url']
+        return (log['timestamp'], log['risk_level'], log['source'],
+                url, url_host(url), line)
+
+    def _insert(self, rows: List[tuple], meta_key: str, offset: int) -> int:
+        with self._conn:
+            last_id = self._conn.execute('SELECT COALESCE(MAX(id), 0) FROM logs').fetchone()[0]
+            self._conn.executemany(
+                'INSERT INTO logs (timestamp, risk_level, source, url, host, entry) '
+                'VALUES (?, ?, ?, ?, ?, ?)', rows
+            )
+            if self.has_url_index:
+                self._conn.execute(
+                    'INSERT INTO logs_url (rowid, url) SELECT id, url FROM logs WHERE id > ?',
+                    (last_id,)
+                )
+            self._set_meta(meta_key, offset)
+        return len(rows)
+
+    def clear(self):
+        """Drop all indexed entries and import offsets"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM logs')
+            self._conn.execute("DELETE FROM meta WHERE key LIKE 'offset:%'")
+            if self.has_url_index:
+                self._conn.execute("INSERT INTO logs_url (logs_url) VALUES ('delete-all')")
+
+    # -- queries -------------------------------------------------------
+
+    def query(self, limit: Optional[int] = None, risk_level: Optional[str] = None,
+              source: Optional[str] = None, host: Optional[str] = None,
+              url_contains: Optional[str] = None, newest_first: bool = True) -> List[Dict]:
+        """
+        Return log entries matching all given filters
+
+        Args:
+            limit: Maximum number of entries (None for all)
+            risk_level: Exact risk level
+            source: Exact source
+            host: Exact URL host (case-insensitive)
+            url_contains: Substring of the URL (case-sensitive)
+            newest_first: Order by log position, most recent first
+        """
+        where, params = [], []
+        if risk_level:
+            where.append('risk_level = ?')
+            params.append(risk_level)
+        if source:
+            where.append('source = ?')
+            params.append(source)
+        if host:
+            where.append('host = ?')
+            params.append(host.lower())
+        if url_contains:
+            # The trigram index (or LIKE) narrows candidates case-insensitively;
+            # exact case-sensitive matching happens below
+            if self.has_url_index and len(url_contains) >= 3:
+                where.append('id IN (SELECT rowid FROM logs_url WHERE url LIKE ?)')
+            else:
+                where.append('url LIKE ?')
+            params.append(f'%{url_contains}%')
+
+        sql = 'SELECT url, entry FROM logs'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY id DESC' if newest_first else ' ORDER BY id'
+
+        results = []
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            while limit is None or len(results) < limit:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for url, entry in rows:
+                    if url_contains and url_contains not in (url or ''):
+                        continue
+                    results.append(self._loads(entry))
+                    if limit is not None and len(results) >= limit:
+                        break
+        return results
+
+    def recent(self, limit: int = 100, risk_level: Optional[str] = None) -> List[Dict]:
+        """Most recent entries, newest first"""
+        return self.query(limit=limit, risk_level=risk_level)
+
+    def find(self, url_substring: str) -> List[Dict]:
+        """Entries whose URL contains the substring, oldest first"""
+        return self.query(url_contains=url_substring, newest_first=False)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM logs').fetchone()[0]
+
+    def summary(self) -> Dict:
+        """Totals by risk level and source plus the number of unique URLs"""
+        with self._lock:
+            total = self.count()
+            risk_levels = dict(self._conn.execute(
+                "SELECT COALESCE(risk_level, 'UNKNOWN'), COUNT(*) FROM logs GROUP BY 1").fetchall())
+            sources = dict(self._conn.execute(
+                "SELECT COALESCE(source, 'unknown'), COUNT(*) FROM logs GROUP BY 1").fetchall())
+            unique_urls = self._conn.execute(
+                'SELECT COUNT(DISTINCT url) FROM logs').fetchone()[0]
+        return {
+            'total_scans': total,
+            'risk_levels': risk_levels,
+            'sources': sources,
+            'unique_urls': unique_urls,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
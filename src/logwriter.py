@@ -0,0 +1,286 @@
+"""
+Background scan log writer.
+
+Request threads hand log entries to a bounded in-memory queue and return
+immediately; a single writer thread serializes each entry once and appends
+it to scans.jsonl and the daily scans_YYYY-MM-DD.jsonl file of its
+timestamp through long-lived handles, flushing in batches. Having one writer also means
+appends from concurrent requests can no longer interleave.
+"""
+
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.jsonio import JSONBackend, json_backend
+
+logger = logging.getLogger(__name__)
+
+# Date prefix of an entry's ISO timestamp that names its daily file
+DAY = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def today() -> str:
+    """Local date used to name the daily log file"""
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+class LogWriter:
+    """Thread-safe, batched JSONL writer for scan log entries"""
+
+    def __init__(self, log_dir: str, max_queue: int = 10000, batch_size: int = 100,
+                 flush_interval: float = 0.5,
+                 on_write: Optional[Callable[[Dict, int], None]] = None,
+                 day: Callable[[], str] = today, start: bool = True,
+                 serializer: Optional[JSONBackend] = None):
+        """
+        Args:
+            log_dir: Directory holding scans.jsonl and the daily logs
+            max_queue: Entries that may wait to be written; further entries
+                are dropped (and counted) rather than blocking requests
+            batch_size: Flush after this many entries
+            flush_interval: Flush at least this often (seconds) while entries
+                are pending
+            on_write: Called with (entry, offset just past its line in
+                scans.jsonl) once the entry has been flushed
+            day: Date source for the daily file name of entries without a
+                timestamp, overridable for tests
+            start: Start the writer thread right away
+            serializer: JSON backend entries are serialized with (default:
+                the fastest installed)
+        """
+        self.log_dir = log_dir
+        self.log_file = os.path.join(log_dir, 'scans.jsonl')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_write = on_write
+        self._dumps = (serializer or json_backend()).dumps
+        self._day = day
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Held while checking _closed and queueing a flush or stop marker,
+        # so no marker is queued behind the stop
+        self._state_lock = threading.Lock()
+        self._closed = False
+
+        self._main = None
+        self._daily = None
+        self._daily_name: Optional[str] = None
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+
+        os.makedirs(log_dir, exist_ok=True)
+        if start:
+            self.start()
+
+    def start(self):
+        """Start the writer thread (no-op if it is running)"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                self._thread.start()
+
+    def write(self, entry: Dict) -> bool:
+        """
+        Queue an entry for writing
+
+        Returns:
+            False if the queue was full (or the writer closed) and the entry
+            was dropped
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        """Block until every entry queued so far has been written and flushed"""
+        with self._state_lock:
+            if self._closed or self._thread is None:
+                return
+            self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Write remaining entries, fsync and close the log files"""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.start()
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    # -- writer thread -------------------------------------------------
+
+    def _run(self):
+        batch: List[Dict] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Flush interval elapsed with entries pending
+                item = None
+
+            if item is None or item is _FLUSH or item is _STOP:
+                self._write_batch(batch)
+                for _ in range(len(batch) + (item is not None)):
+                    self._queue.task_done()
+                batch = []
+                deadline = None
+                if item is _STOP:
+                    self._drain()
+                    self._close_files(sync=True)
+                    return
+                continue
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch)
+                for _ in range(len(batch)):
+                    self._queue.task_done()
+                batch = []
+                deadline = None
+
+    def _drain(self):
+        """Write entries queued after the stop (by write() calls racing close())"""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+            else:
+                self._queue.task_done()
+        self._write_batch(batch)
+        for _ in range(len(batch)):
+            self._queue.task_done()
+
+    def _write_batch(self, batch: List[Dict]):
+        """
+        Append entries to the log files
+
+        An entry that cannot be serialized or written is dropped on its own;
+        every line that reached scans.jsonl is counted and passed to on_write.
+        """
+        if not batch:
+            return
+        written: List[Tuple[Dict, int]] = []
+        # Entries in written[:durable] are on disk even if a later flush fails
+        durable = 0
+        for entry in batch:
+            try:
+                line = self._dumps(entry) + b'\n'
+            except Exception as e:
+                self._drop(f"Error serializing scan log entry: {str(e)}")
+                continue
+            try:
+                self._roll_daily(self._entry_day(entry))
+                self._main.write(line)
+            except Exception as e:
+                self._drop(f"Error writing scan log: {str(e)}")
+                # Closing flushes the lines written before this one
+                self._close_files()
+                durable = len(written)
+                continue
+            written.append((entry, self._main.tell()))
+            try:
+                self._daily.write(line)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error writing daily scan log: {str(e)}")
+
+        if self._main is not None:
+            try:
+                self._daily.flush()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error writing daily scan log: {str(e)}")
+            try:
+                self._main.flush()
+            except Exception as e:
+                self.errors += 1
+                self.dropped += len(written) - durable
+                logger.error(f"Error writing scan log: {str(e)}")
+                self._close_files()
+                del written[durable:]
+
+        self.written += len(written)
+        self.batches += 1
+        if self.on_write is not None:
+            for entry, offset in written:
+                try:
+                    self.on_write(entry, offset)
+                except Exception as e:
+                    logger.error(f"Error in scan log callback: {str(e)}")
+
+    def _drop(self, message: str):
+        self.errors += 1
+        self.dropped += 1
+        logger.error(message)
+
+    def _entry_day(self, entry: Dict) -> str:
+        """Date of the entry's timestamp, or today for entries without one"""
+        timestamp = entry.get('timestamp')
+        if isinstance(timestamp, str) and DAY.match(timestamp):
+            return timestamp[:10]
+        return self._day()
+
+    def _roll_daily(self, name: str):
+        """Open the log files, switching the daily file when the date changes"""
+        if self._main is None:
+            self._main = open(self.log_file, 'ab')
+        if name != self._daily_name:
+            if self._daily is not None:
+                self._daily.close()
+            self._daily = open(os.path.join(self.log_dir, f'scans_{name}.jsonl'), 'ab')
+            self._daily_name = name
+
+    def _close_files(self, sync: bool = False):
+        for f in (self._main, self._daily):
+            if f is None:
+                continue
+            try:
+                f.flush()
+                if sync:
+                    os.fsync(f.fileno())
+                f.close()
+            except OSError as e:
+                logger.error(f"Error closing scan log: {str(e)}")
+        self._main = self._daily = None
+        self._daily_name = None
+
+    def stats(self) -> Dict:
+        """Writer counters for /stats"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_max': self._queue.maxsize,
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'errors': self.errors,
+        }
+
+
+_FLUSH = object()
+_STOP = object()
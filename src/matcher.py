@@ -0,0 +1,186 @@
+"""
+Multi-pattern phrase matcher for the content analysis stage.
+
+Builds an Aho-Corasick automaton over one or more named phrase lists so that
+every phrase from every category is located in a single pass over the text,
+instead of one substring search per phrase.
+
+For short phrase lists a handful of C-level ``str.find`` scans is still
+cheaper than a Python-level automaton walk, so the matcher picks its strategy
+from the list size (see ``AUTOMATON_MIN_PHRASES``). Both strategies return
+identical results.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+
+# Below this many phrases in total, per-phrase str.find scans beat the
+# automaton (measured with benchmarks/bench_matcher.py).
+AUTOMATON_MIN_PHRASES = 150
+
+
+class PhraseMatcher:
+    """Compiled Aho-Corasick automaton over named phrase categories"""
+
+    def __init__(self, categories: Mapping[str, Iterable[str]], strategy: str = 'auto'):
+        """
+        Compile the automaton
+
+        Args:
+            categories: Mapping of category name to its phrase list. The order
+                of each list is kept and used to order match results.
+            strategy: 'automaton', 'find' or 'auto' (pick by phrase count)
+        """
+        if strategy not in ('auto', 'automaton', 'find'):
+            raise ValueError(f'Unknown matcher strategy: {strategy}')
+
+        self.categories: Dict[str, Tuple[str, ...]] = {
+            name: tuple(phrases) for name, phrases in categories.items()
+        }
+        self._lengths = {
+            name: tuple(len(p) for p in phrases)
+            for name, phrases in self.categories.items()
+        }
+
+        # Goto function as one dict per state, output as (category, index)
+        # pairs per state. State 0 is the root.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[Tuple[str, int], ...]] = [()]
+        self._fail: List[int] = []
+
+        for name, phrases in self.categories.items():
+            for index, phrase in enumerate(phrases):
+                if phrase:
+                    self._add(phrase, (name, index))
+
+        self._build_failure_links()
+
+        phrase_count = sum(len(phrases) for phrases in self.categories.values())
+        if strategy == 'auto':
+            strategy = 'automaton' if phrase_count >= AUTOMATON_MIN_PHRASES else 'find'
+        self.strategy = strategy
+
+    def _add(self, phrase: str, label: Tuple[str, int]):
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append(())
+            state = nxt
+        self._out[state] += (label,)
+
+    def _build_failure_links(self):
+        """Breadth-first failure link construction; outputs are merged along
+        the failure chain so each state lists every phrase ending there."""
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                target = self._goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[fail[nxt]]
+
+        self._fail = fail
+
+    @property
+    def state_count(self) -> int:
+        """Number of automaton states"""
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str, int]]:
+        """
+        Yield every phrase occurrence in the text
+
+        Yields:
+            (start_offset, category, phrase_index) tuples in order of the
+            position where each occurrence ends
+        """
+        if self.strategy == 'find':
+            yield from self._iter_find(text)
+            return
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        lengths = self._lengths
+        state = 0
+        for pos, ch in enumerate(text):
+            while True:
+                nxt = goto[state].get(ch)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            if out[state]:
+                for name, index in out[state]:
+                    yield pos - lengths[name][index] + 1, name, index
+
+    def _iter_find(self, text: str) -> Iterator[Tuple[int, str, int]]:
+        """Per-phrase str.find scans, ordered like the automaton output"""
+        matches = []
+        for name, phrases in self.categories.items():
+            for index, phrase in enumerate(phrases):
+                if not phrase:
+                    continue
+                start = text.find(phrase)
+                while start != -1:
+                    matches.append((start + len(phrase), start, name, index))
+                    start = text.find(phrase, start + 1)
+        matches.sort(key=lambda m: m[0])
+        for _, start, name, index in matches:
+            yield start, name, index
+
+    def search(self, text: str) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Find all phrases in one pass over the text
+
+        Args:
+            text: Text to search (matching is case-sensitive, so callers
+                lowercase it as the phrase lists are lowercase)
+
+        Returns:
+            Mapping of category name to {phrase: [start offsets]} for every
+            phrase that occurs at least once. Phrases are ordered as in the
+            category's phrase list; every category is present.
+        """
+        hits: Dict[str, Dict[int, List[int]]] = {name: {} for name in self.categories}
+        for start, name, index in self.iter_matches(text):
+            hits[name].setdefault(index, []).append(start)
+
+        results = {}
+        for name, found in hits.items():
+            phrases = self.categories[name]
+            results[name] = {phrases[i]: found[i] for i in sorted(found)}
+        return results
+
+    def found(self, text: str) -> Dict[str, List[str]]:
+        """Return the distinct phrases found per category, in list order"""
+        return {name: list(found) for name, found in self.search(text).items()}
+
+
+@lru_cache(maxsize=32)
+def _compile(categories: Tuple[Tuple[str, Tuple[str, ...]], ...], strategy: str) -> PhraseMatcher:
+    return PhraseMatcher(dict(categories), strategy=strategy)
+
+
+def compile_matcher(categories: Mapping[str, Iterable[str]], strategy: str = 'auto') -> PhraseMatcher:
+    """
+    Return a compiled matcher for the given phrase lists
+
+    Matchers are cached on the exact list contents, so each phrase list is
+    compiled once per process no matter how many scanners use it.
+    """
+    key = tuple((name, tuple(phrases)) for name, phrases in categories.items())
+    return _compile(key, strategy)
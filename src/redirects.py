@@ -0,0 +1,100 @@
+"""
+Redirect following with per-hop records and a hop cache.
+
+Ad clicks usually bounce through one or more tracking redirectors before
+the landing page. Redirects are followed here one request at a time (each
+through the per-host scheduler) so every hop's URL, status and latency is
+kept for analysis. Redirect answers are cached for a short time per exact
+URL, so repeated ads through the same redirector skip those round trips.
+"""
+
+import contextlib
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+from src.cache import ScanCache
+from src.scheduler import HostScheduler
+
+if TYPE_CHECKING:
+    import requests
+
+# Redirects followed before a fetch fails
+MAX_REDIRECTS = 10
+# Seconds a redirect answer is reused and how many are kept
+REDIRECT_CACHE_TTL = 60
+REDIRECT_CACHE_SIZE = 10000
+# Bytes of a redirect body read (and discarded) so its connection can go
+# back to the pool; a longer body closes the connection instead
+REDIRECT_DRAIN_BYTES = 16 * 1024
+
+
+class Hop(NamedTuple):
+    """One URL on the way to the final page"""
+    url: str
+    status: int
+    elapsed_ms: float
+    cached: bool  # answered from the hop cache, no request made
+
+
+@contextlib.contextmanager
+def follow_redirects(scheduler: HostScheduler, session: 'requests.Session', url: str,
+                     max_redirects: int = MAX_REDIRECTS, cache: Optional[ScanCache] = None,
+                     **kwargs) -> Iterator[Tuple['requests.Response', List[Hop]]]:
+    """
+    GET url, following redirects hop by hop
+
+    Args:
+        scheduler: Scheduler each request goes through
+        session: Session to fetch with
+        url: URL to fetch
+        max_redirects: Redirects followed before giving up
+        cache: Redirect answers by exact URL ({'status', 'location'}); hops
+            found in it are not requested
+        **kwargs: Passed to session.get (allow_redirects is always False)
+
+    Yields:
+        (final response, hops): the response that is not a redirect and
+        every URL fetched on the way, ending with the final one
+
+    Raises:
+        requests.TooManyRedirects: More than max_redirects redirects
+    """
+    kwargs['allow_redirects'] = False
+    hops: List[Hop] = []
+    current = url
+    for _ in range(max_redirects + 1):
+        cached = cache.get(current) if cache is not None else None
+        if cached is not None:
+            hops.append(Hop(current, cached['status'], 0.0, True))
+            current = cached['location']
+            continue
+
+        with scheduler.fetch(session, current, **kwargs) as response:
+            elapsed_ms = round(response.elapsed.total_seconds() * 1000, 1)
+            hops.append(Hop(current, response.status_code, elapsed_ms, False))
+            if not response.is_redirect:
+                yield response, hops
+                return
+            location = urljoin(current, session.get_redirect_target(response))
+            if cache is not None:
+                cache.set(current, {'status': response.status_code, 'location': location})
+            _drain(response)
+            current = location
+
+    from requests.exceptions import TooManyRedirects
+    raise TooManyRedirects(f'Exceeded {max_redirects} redirects')
+
+
+def _drain(response: 'requests.Response', limit: int = REDIRECT_DRAIN_BYTES):
+    """
+    Read what is left of a short response body before it is closed
+
+    A streamed response closed with unread body bytes closes its connection
+    rather than returning it to the pool, so every hop would open a new one.
+    The body is read undecoded and errors are ignored (the hop is done).
+    """
+    from urllib3.exceptions import HTTPError
+    try:
+        response.raw.read(limit, decode_content=False)
+    except (HTTPError, OSError):
+        pass
@@ -0,0 +1,227 @@
+"""
+Offline domain reputation index.
+
+Known scam domains and known good domains (millions of entries) are compiled
+from text lists into one compact file that is memory-mapped, not loaded:
+opening it costs a few system calls and lookups read a handful of pages, so
+it can be consulted on every scan without holding the lists as Python
+objects.
+
+File layout (little-endian):
+
+    header   magic b'SCAMREP1', prefix bits (uint32), entry count (uint64)
+    prefix   2**bits + 1 uint32 start positions, one bucket per hash prefix
+    keys     count uint64 host hashes, sorted
+    labels   count bytes, SCAM or GOOD, parallel to keys
+
+A host is looked up by its 64-bit BLAKE2b hash: the top bits pick a bucket
+from the prefix table and the bucket (about count / 2**bits keys) is
+bisected. Hash collisions between distinct hosts are possible in theory
+(around 1 in 10**7 for a million-entry list) and are accepted.
+
+Build an index with:
+
+    python -m src.reputation --scam scam_domains.txt --good top_sites.txt -o reputation.idx
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, Optional
+
+import click
+
+MAGIC = b'SCAMREP1'
+HEADER = struct.Struct('<8sIQ')
+PREFIX_BITS = 16
+
+SCAM = 1
+GOOD = 2
+LABELS = {SCAM: 'scam', GOOD: 'good'}
+
+
+def normalize_host(host: str) -> str:
+    """Lowercase host without a trailing dot or leading 'www.'"""
+    host = host.strip().lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def host_hash(host: str) -> int:
+    """64-bit key of a normalized host"""
+    return int.from_bytes(hashlib.blake2b(host.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def parse_list(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Hosts from a domain list: one per line, '#' comments, hosts-file lines
+    ('0.0.0.0 example.com') and '*.' wildcards are accepted
+    """
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        host = line.split()[-1]
+        if host.startswith('*.'):
+            host = host[2:]
+        host = normalize_host(host)
+        if host and host not in ('localhost', '0.0.0.0'):
+            yield host
+
+
+def build_index(path: str, scam: Iterable[str] = (), good: Iterable[str] = (),
+                prefix_bits: int = PREFIX_BITS) -> int:
+    """
+    Write a reputation index for the given hosts
+
+    A host on both lists is labelled scam. The file is written next to
+    path and moved into place, so a running scanner can keep using the old
+    one until it reopens.
+
+    Returns:
+        Number of distinct hosts in the index
+    """
+    labels: Dict[int, int] = {}
+    for host in good:
+        labels[host_hash(normalize_host(host))] = GOOD
+    for host in scam:
+        labels[host_hash(normalize_host(host))] = SCAM
+
+    keys = array('Q', sorted(labels))
+    values = bytes(labels[key] for key in keys)
+    del labels
+
+    buckets = 1 << prefix_bits
+    shift = 64 - prefix_bits
+    starts = array('I', [0] * (buckets + 1))
+    for key in keys:
+        starts[(key >> shift) + 1] += 1
+    for bucket in range(buckets):
+        starts[bucket + 1] += starts[bucket]
+
+    if sys.byteorder != 'little':
+        keys.byteswap()
+        starts.byteswap()
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, prefix_bits, len(keys)))
+        f.write(starts.tobytes())
+        f.write(keys.tobytes())
+        f.write(values)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class ReputationIndex:
+    """Memory-mapped reputation index (see build_index)"""
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            ValueError: The file is not a reputation index
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f'Not a reputation index: {path}')
+        magic, prefix_bits, count = HEADER.unpack_from(self._mmap)
+        buckets = 1 << prefix_bits
+        keys_offset = HEADER.size + (buckets + 1) * 4
+        if magic != MAGIC or len(self._mmap) != keys_offset + count * 9:
+            raise ValueError(f'Not a reputation index: {path}')
+
+        self.count = count
+        self._shift = 64 - prefix_bits
+        view = memoryview(self._mmap)
+        self._starts = view[HEADER.size:keys_offset]
+        self._labels = view[keys_offset + count * 8:]
+        keys = view[keys_offset:keys_offset + count * 8]
+        if sys.byteorder == 'little':
+            # Bisected in C directly over the mapped pages
+            self._starts = self._starts.cast('I')
+            self._keys = keys.cast('Q')
+        else:
+            self._starts = _LittleEndian(self._starts, 'I')
+            self._keys = _LittleEndian(keys, 'Q')
+
+    def __len__(self) -> int:
+        return self.count
+
+    def label(self, host: str) -> Optional[str]:
+        """'scam' or 'good' for a host listed exactly (after normalization), else None"""
+        key = host_hash(normalize_host(host))
+        bucket = key >> self._shift
+        lo, hi = self._starts[bucket], self._starts[bucket + 1]
+        i = bisect.bisect_left(self._keys, key, lo, hi)
+        if i < hi and self._keys[i] == key:
+            return LABELS.get(self._labels[i])
+        return None
+
+    def lookup(self, host: str) -> Optional[str]:
+        """
+        Reputation of a host, or 'scam' when a parent domain is a listed scam
+
+        'login.scam.example' matches a listing of 'scam.example'. Only scam
+        listings are inherited: anyone can host pages under a subdomain of a
+        good domain (user sites, storage buckets), so 'good' needs the host
+        itself to be listed. Single labels (TLDs) are never looked up.
+        """
+        host = normalize_host(host)
+        label = self.label(host) if host.count('.') >= 1 else None
+        if label is not None:
+            return label
+        while host.count('.') >= 2:
+            host = host.split('.', 1)[1]
+            if self.label(host) == 'scam':
+                return 'scam'
+        return None
+
+    def close(self):
+        """Unmap the index"""
+        self._starts = self._keys = self._labels = None
+        self._mmap.close()
+
+
+class _LittleEndian:
+    """Indexable little-endian integers over a buffer (big-endian hosts)"""
+
+    def __init__(self, buffer: memoryview, code: str):
+        self._buffer = buffer
+        self._struct = struct.Struct('<' + code)
+
+    def __len__(self) -> int:
+        return len(self._buffer) // self._struct.size
+
+    def __getitem__(self, i: int) -> int:
+        return self._struct.unpack_from(self._buffer, i * self._struct.size)[0]
+
+
+def _read_lists(paths) -> Iterator[str]:
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            yield from parse_list(f)
+
+
+@click.command()
+@click.option('--scam', 'scam_lists', multiple=True, type=click.Path(exists=True, dir_okay=False),
+              help='Text list of known scam domains (repeatable)')
+@click.option('--good', 'good_lists', multiple=True, type=click.Path(exists=True, dir_okay=False),
+              help='Text list of known good domains (repeatable)')
+@click.option('--output', '-o', required=True, type=click.Path(dir_okay=False),
+              help='Index file to write')
+def main(scam_lists, good_lists, output):
+    """Build a domain reputation index from text lists"""
+    count = build_index(output, _read_lists(scam_lists), _read_lists(good_lists))
+    click.echo(f"Wrote {count} hosts to {output} ({os.path.getsize(output) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
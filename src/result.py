@@ -0,0 +1,206 @@
+"""
+Scan results and indicators.
+
+A scan used to build its result as nested dicts with every indicator
+formatted into an English sentence as soon as its rule fired. ScanResult
+keeps the same fields in slots, and each Indicator is a small code from
+Code plus the values its message is formatted with; the message is only
+formatted when a result is serialized (and then kept). to_dict() gives the
+dict the JSON API, the logs and the persistent store have always used, and
+from_dict() reads one back.
+
+Indicators compare equal to their message, so code that looks for a
+message in result.indicators keeps working.
+"""
+
+import re
+from enum import IntEnum
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+
+class Code(IntEnum):
+    """Indicator codes and the message each one is formatted with"""
+
+    def __new__(cls, value: int, template: str):
+        member = int.__new__(cls, value)
+        member._value_ = value
+        member.template = template
+        return member
+
+    # Free text (messages read back that match no template)
+    TEXT = 0, '{}'
+
+    # URL and domain
+    INVALID_URL = 1, 'Invalid URL format'
+    KNOWN_GOOD_DOMAIN = 2, 'Known good domain'
+    KNOWN_SCAM_DOMAIN = 3, 'Known scam domain'
+    NO_HTTPS = 4, 'No HTTPS encryption'
+    IP_ADDRESS = 5, 'Using IP address instead of domain name'
+    SUSPICIOUS_TLD = 6, 'Suspicious TLD: {}'
+    LONG_DOMAIN = 7, 'Unusually long domain name ({} chars)'
+    MULTIPLE_HYPHENS = 8, 'Multiple hyphens in domain ({})'
+    MULTIPLE_DIGITS = 9, 'Multiple digits in domain ({})'
+
+    # Fetch and redirects
+    FETCH_FAILED = 20, 'Failed to fetch URL: {}'
+    REDIRECT = 21, 'Redirects to different URL'
+    LONG_REDIRECT_CHAIN = 22, 'Long redirect chain ({} hops)'
+    SUSPICIOUS_REDIRECT = 23, 'Redirects through suspicious domain: {}'
+    TRUNCATED = 24, 'Page larger than {} KB (only the start was analyzed)'
+
+    # Page content
+    SCAM_KEYWORDS = 40, 'Found {} scam keywords: {}'
+    URGENCY_LANGUAGE = 41, 'High urgency language detected ({} instances)'
+    TGTBT_PHRASES = 42, 'Too-good-to-be-true phrases detected ({} instances)'
+    EXCESSIVE_EXCLAMATION = 43, 'Excessive exclamation marks ({})'
+    POPUP_SCRIPT = 44, 'Contains popup/alert scripts'
+    MISSING_META = 45, 'Missing meta description'
+    FEW_LINKS = 46, 'Very few external links ({})'
+    PASSWORD_FIELD = 47, 'Contains password input fields'
+    SUSPICIOUS_FORM = 48, 'Form with suspicious or missing action'
+    ANALYSIS_MEMORY_LIMIT = 49, 'Content analysis skipped (page exceeded the analysis memory limit)'
+
+
+def _template_pattern(template: str) -> 're.Pattern':
+    return re.compile(re.escape(template).replace(r'\{\}', '(.*?)'))
+
+
+# Tried in order by Indicator.parse (TEXT matches anything, so it is left out)
+_PATTERNS = [(code, _template_pattern(code.template)) for code in Code if code is not Code.TEXT]
+
+
+class Indicator:
+    """One finding of a scan: a code and the values of its message"""
+
+    __slots__ = ('code', 'params', '_text')
+
+    def __init__(self, code: Code, *params: Any):
+        self.code = code
+        self.params = params
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """The message, formatted on first use"""
+        if self._text is None:
+            self._text = self.code.template.format(*self.params)
+        return self._text
+
+    @classmethod
+    def parse(cls, text: str) -> 'Indicator':
+        """
+        Indicator from its message (e.g. from a stored result)
+
+        Integer values are read back as ints; a message that matches no
+        template becomes a Code.TEXT indicator.
+        """
+        for code, pattern in _PATTERNS:
+            match = pattern.fullmatch(text)
+            if match is not None:
+                indicator = cls(code, *(int(value) if value.isdigit() else value
+                                        for value in match.groups()))
+                indicator._text = text
+                return indicator
+        return cls(Code.TEXT, text)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f'Indicator({self.code.name}{"".join(f", {p!r}" for p in self.params)})'
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Indicator):
+            return self.text == other.text
+        if isinstance(other, str):
+            return self.text == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def __reduce__(self):
+        return Indicator, (self.code, *self.params)
+
+    # Immutable: copies of a result share its indicators
+    def __copy__(self) -> 'Indicator':
+        return self
+
+    def __deepcopy__(self, memo) -> 'Indicator':
+        return self
+
+
+class ScanResult:
+    """Result of scanning one URL"""
+
+    __slots__ = ('url', 'valid_url', 'accessible', 'risk_score', 'risk_level',
+                 'indicators', 'details')
+
+    def __init__(self, url: str, valid_url: bool = False, accessible: bool = False,
+                 risk_score: int = 0, risk_level: Optional[str] = None,
+                 indicators: Optional[List[Indicator]] = None,
+                 details: Optional[Dict[str, Any]] = None):
+        self.url = url
+        self.valid_url = valid_url
+        self.accessible = accessible
+        self.risk_score = risk_score
+        # None until scored (invalid URLs are never scored)
+        self.risk_level = risk_level
+        self.indicators = indicators if indicators is not None else []
+        # Scan details (tiers, analyses, redirect chain, cache status...);
+        # indicator lists in them are Indicators as well
+        self.details = details if details is not None else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The result as the JSON-ready dict of the API, logs and store"""
+        result = {
+            'url': self.url,
+            'valid_url': self.valid_url,
+            'accessible': self.accessible,
+            'risk_score': self.risk_score,
+            'indicators': [indicator.text for indicator in self.indicators],
+            'details': _plain(self.details),
+        }
+        if self.risk_level is not None:
+            result['risk_level'] = self.risk_level
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'ScanResult':
+        """Result from a to_dict() dict (indicators are parsed back)"""
+        return cls(data['url'], data.get('valid_url', False), data.get('accessible', False),
+                   data.get('risk_score', 0), data.get('risk_level'),
+                   [Indicator.parse(text) for text in data.get('indicators', ())],
+                   dict(data.get('details', {})))
+
+    def codes(self) -> Tuple[Code, ...]:
+        """Codes of the indicators, in order"""
+        return tuple(indicator.code for indicator in self.indicators)
+
+    def copy(self) -> 'ScanResult':
+        """
+        Copy whose url, indicators and top-level details can be changed
+        without affecting this result (nested details are shared: they are
+        not modified once a scan is done)
+        """
+        return ScanResult(self.url, self.valid_url, self.accessible, self.risk_score,
+                          self.risk_level, list(self.indicators), dict(self.details))
+
+    # The cache and single-flight copy results with copy.deepcopy
+    def __deepcopy__(self, memo) -> 'ScanResult':
+        return self.copy()
+
+    def __repr__(self) -> str:
+        return (f'ScanResult({self.url!r}, risk_score={self.risk_score}, '
+                f'risk_level={self.risk_level!r}, indicators={len(self.indicators)})')
+
+
+def _plain(value: Any) -> Any:
+    """value with Indicators replaced by their messages (dicts and lists copied)"""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, Indicator):
+        return value.text
+    return value
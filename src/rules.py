@@ -0,0 +1,467 @@
+"""
+Declarative scoring rules and their compiled evaluation plan.
+
+The weights, risk thresholds, limits, feature flags and phrase lists the
+scanner scores with are data: they default to the settings in src/config.py
+(and the ScamIndicators phrase lists) and can be overridden by a JSON rules
+file. A RulePlan compiles one rule set once - one phrase matcher over every
+phrase list, lookup sets and patterns, and the enabled content rules ordered
+by cost, with disabled rules dropped from the plan - and RuleEngine swaps in
+a new plan when the rules file changes, without restarting the API server.
+
+Rules file format (every section and key is optional; unknown keys are
+rejected)::
+
+    {
+        "weights": {"suspicious_tld": 20, "popup_script": 0},
+        "thresholds": {"minimal": 10, "low": 25, "medium": 50},
+        "limits": {"domain_length": 25},
+        "flags": {"script_analysis": false},
+        "phrases": {"scam_keywords": ["act now", "crypto giveaway"]}
+    }
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from src import config
+from src.html_features import PageFeatures
+from src.matcher import compile_matcher
+from src.result import Code, Indicator
+from src.suffixes import HOST_CACHE_SIZE, split_host
+
+logger = logging.getLogger(__name__)
+
+# Phrase lists searched in page text (the rest of 'phrases' are plain sets)
+TEXT_PHRASES = ('scam_keywords', 'urgency_words', 'tgtbt_phrases')
+PHRASE_LISTS = TEXT_PHRASES + ('suspicious_tld',)
+FLAGS = ('redirect_detection', 'form_analysis', 'script_analysis')
+RISK_LEVELS = ('MINIMAL', 'LOW', 'MEDIUM', 'HIGH')
+
+IP_HOST = re.compile(r'\d+\.\d+\.\d+\.\d+')
+# Searched in the lowercased page (one str.lower() copy and C-level finds
+# beat a case-insensitive regex by ~10x on large pages)
+POPUP_CALLS = ('alert(', 'confirm(')
+
+
+def config_rules(phrases: Mapping[str, Sequence[str]]) -> Dict:
+    """
+    Rule set from the settings in src/config.py
+
+    Args:
+        phrases: Phrase lists by name (scam_keywords, urgency_words,
+            tgtbt_phrases, suspicious_tld)
+
+    Returns:
+        Rule set dict with weights, thresholds, limits, flags and phrases
+    """
+    settings = vars(config)
+    return {
+        'weights': _prefixed(settings, 'SCORE_'),
+        'thresholds': _prefixed(settings, 'RISK_THRESHOLD_'),
+        'limits': _prefixed(settings, 'LIMIT_'),
+        'flags': {flag: bool(settings[f'ENABLE_{flag.upper()}']) for flag in FLAGS},
+        'phrases': {name: list(phrases[name]) for name in PHRASE_LISTS},
+    }
+
+
+def lexical_features(host: str) -> Tuple[str, int, int, int]:
+    """
+    Lexical features the domain rules score a host on
+
+    Returns:
+        (TLD with its dot, registered domain length, hyphens, digits), e.g.
+        ('.co.uk', 7, 0, 0) for 'login.example.co.uk'
+    """
+    domain, suffix = split_host(host)
+    return f'.{suffix}', len(domain), domain.count('-'), sum(map(str.isdigit, domain))
+
+
+def merge_rules(base: Dict, overrides: Mapping) -> Dict:
+    """
+    Apply overrides (e.g. a parsed rules file) on top of a rule set
+
+    Raises:
+        ValueError: Unknown sections or keys, or values of the wrong type
+    """
+    if not isinstance(overrides, Mapping):
+        raise ValueError('Rules must be a JSON object')
+    rules = {section: dict(values) for section, values in base.items()}
+    for section, values in overrides.items():
+        if section not in rules:
+            raise ValueError(f'Unknown rules section: {section}')
+        if not isinstance(values, Mapping):
+            raise ValueError(f'Rules section {section} must be an object')
+        for key, value in values.items():
+            if key not in rules[section]:
+                raise ValueError(f'Unknown rule {section}.{key}')
+            if section == 'phrases':
+                if not isinstance(value, list) or not all(isinstance(p, str) for p in value):
+                    raise ValueError(f'Rule {section}.{key} must be a list of strings')
+                value = [phrase.lower() for phrase in value]
+            elif section == 'flags':
+                if not isinstance(value, bool):
+                    raise ValueError(f'Rule {section}.{key} must be true or false')
+            elif isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f'Rule {section}.{key} must be an integer')
+            rules[section][key] = value
+    return rules
+
+
+def load_rules(path: str, base: Dict) -> Dict:
+    """Rule set from a JSON rules file applied on top of base"""
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            overrides = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid rules file {path}: {e}') from e
+    return merge_rules(base, overrides)
+
+
+class RulePlan:
+    """A rule set compiled for evaluation"""
+
+    def __init__(self, rules: Dict):
+        self.rules = rules
+        self.weights = rules['weights']
+        self.limits = rules['limits']
+        self.flags = rules['flags']
+        thresholds = rules['thresholds']
+        self._levels = (
+            (thresholds['medium'], 'HIGH'),
+            (thresholds['low'], 'MEDIUM'),
+            (thresholds['minimal'], 'LOW'),
+        )
+
+        phrases = rules['phrases']
+        self.scam_keywords = tuple(phrases['scam_keywords'])
+        self.suspicious_tld = frozenset(phrases['suspicious_tld'])
+        self.matcher = compile_matcher({name: phrases[name] for name in TEXT_PHRASES})
+        self._search_phrases = any(phrases[name] for name in TEXT_PHRASES)
+
+        # With no negative weights, more evidence can only raise the score
+        self.monotonic = all(weight >= 0 for weight in self.weights.values())
+
+        # Content rules in evaluation order (cheapest first); each one
+        # fills its own slot so indicators keep the reporting order. Rules
+        # that fire on something missing from the page are not applied to a
+        # partial page: the rest of it may still have it.
+        content_rules = [
+            (0, 5, self._meta_description, False),
+            (0, 6, self._few_links, False),
+            (1, 7, self._forms, True) if self.flags['form_analysis'] else None,
+            (2, 3, self._exclamations, True),
+            (3, 0, self._phrases, True) if self._search_phrases else None,
+            (4, 4, self._popup_script, True) if self.flags['script_analysis'] else None,
+        ]
+        content_rules = sorted(rule for rule in content_rules if rule is not None)
+        self._content_rules: List[Tuple[int, Callable, bool]] = [
+            (slot, rule, partial) for cost, slot, rule, partial in content_rules
+        ]
+        self._slots = 8
+
+        # Hosts repeat across scans; a new plan starts with an empty memo
+        self._host = functools.lru_cache(maxsize=HOST_CACHE_SIZE)(self._host_features)
+
+    # -- domain --------------------------------------------------------------
+
+    def domain(self, url: str, reputation: Optional[str] = None) -> Tuple[int, List[Indicator]]:
+        """
+        Score the URL's host and scheme
+
+        Args:
+            url: The URL
+            reputation: 'scam' or 'good' when the host is on a reputation
+                list; a known good host is not scored on its lexical features
+                (the scheme and IP address rules still apply)
+        """
+        weights = self.weights
+        parsed = urlsplit(url)
+        if reputation == 'good':
+            score, indicators = 0, [Indicator(Code.KNOWN_GOOD_DOMAIN)]
+        else:
+            score, indicators = self._host(parsed.hostname or '')
+            indicators = list(indicators)
+
+        if parsed.scheme == 'http':
+            score += weights['no_https']
+            indicators.append(Indicator(Code.NO_HTTPS))
+
+        if IP_HOST.match(parsed.netloc):
+            score += weights['ip_address']
+            indicators.append(Indicator(Code.IP_ADDRESS))
+
+        if reputation == 'scam':
+            score += weights['known_scam_domain']
+            indicators.append(Indicator(Code.KNOWN_SCAM_DOMAIN))
+
+        return score, indicators
+
+    def _host_features(self, host: str) -> Tuple[int, Tuple[Indicator, ...]]:
+        """Score of the host name's lexical features (memoized per host)"""
+        weights = self.weights
+        limits = self.limits
+        score = 0
+        indicators = []
+
+        tld, domain_length, hyphen_count, digit_count = lexical_features(host)
+
+        if tld in self.suspicious_tld:
+            score += weights['suspicious_tld']
+            indicators.append(Indicator(Code.SUSPICIOUS_TLD, tld))
+
+        if domain_length > limits['domain_length']:
+            score += weights['long_domain']
+            indicators.append(Indicator(Code.LONG_DOMAIN, domain_length))
+
+        if hyphen_count > limits['domain_hyphens']:
+            score += weights['multiple_hyphens']
+            indicators.append(Indicator(Code.MULTIPLE_HYPHENS, hyphen_count))
+
+        if digit_count > limits['domain_digits']:
+            score += weights['multiple_digits']
+            indicators.append(Indicator(Code.MULTIPLE_DIGITS, digit_count))
+
+        return score, tuple(indicators)
+
+    # -- redirects -----------------------------------------------------------
+
+    def redirects(self, url: str, chain: Sequence[Tuple[str, int]]) -> Tuple[int, List[Indicator]]:
+        """
+        Score the way from the URL to the page it ended on
+
+        Args:
+            url: The scanned URL
+            chain: (URL, domain score) of every URL fetched, starting with
+                url and ending with the final page
+        """
+        if not self.flags['redirect_detection'] or not chain:
+            return 0, []
+        weights = self.weights
+        score = 0
+        indicators = []
+
+        if chain[-1][0] != url:
+            score += weights['redirect']
+            indicators.append(Indicator(Code.REDIRECT))
+
+        hops = len(chain) - 1
+        if hops > self.limits['redirect_hops']:
+            score += weights['long_redirect_chain']
+            indicators.append(Indicator(Code.LONG_REDIRECT_CHAIN, hops))
+
+        host = urlsplit(url).hostname
+        for hop_url, domain_score in chain[1:]:
+            hop_host = urlsplit(hop_url).hostname
+            if hop_host != host and domain_score >= self.limits['redirect_hop_score']:
+                score += weights['suspicious_redirect']
+                indicators.append(Indicator(Code.SUSPICIOUS_REDIRECT, hop_host))
+                break
+
+        return score, indicators
+
+    # -- content -------------------------------------------------------------
+
+    def content(self, page: PageFeatures, html: str,
+                partial: bool = False) -> Tuple[int, List[Indicator]]:
+        """
+        Score extracted page features (html is only searched for scripts)
+
+        Args:
+            page: Features of the page
+            html: The page
+            partial: The page is only a prefix; skip rules the rest of it
+                could contradict, so the score is a lower bound
+        """
+        slots: List[Optional[Tuple[int, List[Indicator]]]] = [None] * self._slots
+        for slot, rule, on_partial in self._content_rules:
+            if on_partial or not partial:
+                slots[slot] = rule(page, html)
+
+        score = 0
+        indicators = []
+        for result in slots:
+            if result is not None:
+                score += result[0]
+                indicators.extend(result[1])
+        return score, indicators
+
+    def _phrases(self, page, html):
+        weights = self.weights
+        score = 0
+        indicators = []
+        text = page.text.lower()
+        title = page.title.lower() if page.title else ''
+
+        # Find every phrase category in one pass over the text
+        found = self.matcher.search(text)
+
+        # Scam keywords (the title counts for keywords only)
+        found_keywords = found['scam_keywords']
+        if title:
+            title_keywords = self.matcher.search(title)['scam_keywords']
+            if title_keywords.keys() - found_keywords.keys():
+                found_keywords = {
+                    keyword: None for keyword in self.scam_keywords
+                    if keyword in found_keywords or keyword in title_keywords
+                }
+        found_keywords = list(found_keywords)
+        if found_keywords:
+            score += len(found_keywords) * weights['per_scam_keyword']
+            indicators.append(Indicator(Code.SCAM_KEYWORDS, len(found_keywords),
+                                        f'{", ".join(found_keywords[:3])}{"..." if len(found_keywords) > 3 else ""}'))
+
+        urgency_count = len(found['urgency_words'])
+        if urgency_count > self.limits['urgency_words']:
+            score += urgency_count * weights['per_urgency_word']
+            indicators.append(Indicator(Code.URGENCY_LANGUAGE, urgency_count))
+
+        tgtbt_count = len(found['tgtbt_phrases'])
+        if tgtbt_count > 0:
+            score += tgtbt_count * weights['per_tgtbt_phrase']
+            indicators.append(Indicator(Code.TGTBT_PHRASES, tgtbt_count))
+
+        return score, indicators
+
+    def _exclamations(self, page, html):
+        exclamation_count = page.text.count('!')
+        if exclamation_count > self.limits['exclamations']:
+            return self.weights['excessive_exclamation'], [Indicator(Code.EXCESSIVE_EXCLAMATION, exclamation_count)]
+        return None
+
+    def _popup_script(self, page, html):
+        lowered = html.lower()
+        if any(call in lowered for call in POPUP_CALLS):
+            return self.weights['popup_script'], [Indicator(Code.POPUP_SCRIPT)]
+        return None
+
+    def _meta_description(self, page, html):
+        if not page.has_meta_description:
+            return self.weights['missing_meta'], [Indicator(Code.MISSING_META)]
+        return None
+
+    def _few_links(self, page, html):
+        if page.link_count < self.limits['min_links']:
+            return self.weights['few_links'], [Indicator(Code.FEW_LINKS, page.link_count)]
+        return None
+
+    def _forms(self, page, html):
+        if not page.form_actions:
+            return None
+        score = 0
+        indicators = []
+        if page.password_fields:
+            score += self.weights['password_field']
+            indicators.append(Indicator(Code.PASSWORD_FIELD))
+        if any(not action or action == '#' for action in page.form_actions):
+            score += self.weights['suspicious_form']
+            indicators.append(Indicator(Code.SUSPICIOUS_FORM))
+        return score, indicators
+
+    # -- verdict -------------------------------------------------------------
+
+    def risk_level(self, score: int) -> str:
+        """Convert a risk score to a risk level"""
+        for threshold, level in self._levels:
+            if score >= threshold:
+                return level
+        return 'MINIMAL'
+
+    def settled(self, score: int, stop_level: str = 'HIGH') -> bool:
+        """
+        Whether scanning can stop: the score already reaches stop_level and
+        further indicators can only raise it
+        """
+        if not self.monotonic:
+            return False
+        return RISK_LEVELS.index(self.risk_level(score)) >= RISK_LEVELS.index(stop_level)
+
+
+class RuleEngine:
+    """Current RulePlan, recompiled when the rules file changes"""
+
+    def __init__(self, phrases: Mapping[str, Sequence[str]], path: Optional[str] = None,
+                 check_interval: float = 1.0):
+        """
+        Args:
+            phrases: Default phrase lists (see config_rules)
+            path: JSON rules file applied on top of src/config.py (optional;
+                it may be created, edited or removed while running)
+            check_interval: Seconds between checks of the file's mtime
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.base = config_rules(phrases)
+        self.version = 0
+        self.reload_errors = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = time.monotonic()
+        self._plan = RulePlan(self.base)
+        if path is not None:
+            self.reload()
+
+    @property
+    def plan(self) -> RulePlan:
+        """The plan to evaluate with (checks the rules file for changes)"""
+        if self.path is not None and time.monotonic() - self._checked >= self.check_interval:
+            self.reload()
+        return self._plan
+
+    def reload(self) -> bool:
+        """
+        Recompile from the rules file if it changed since the last load
+
+        A file that fails to load keeps the current plan in place.
+
+        Returns:
+            True when a new plan was installed
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime == self._mtime:
+                return False
+
+            try:
+                rules = load_rules(self.path, self.base) if mtime is not None else self.base
+                plan = RulePlan(rules)
+            except (OSError, ValueError, KeyError) as e:
+                self.reload_errors += 1
+                self.last_error = str(e)
+                self._mtime = mtime
+                logger.warning(f"Keeping current scoring rules: {e}")
+                return False
+
+            self._plan = plan
+            self._mtime = mtime
+            self.version += 1
+            self.last_error = None
+            return True
+
+    def stats(self) -> Dict:
+        """Rules source, reload count and the last load error"""
+        return {
+            'rules_file': self.path,
+            'version': self.version,
+            'reload_errors': self.reload_errors,
+            'last_error': self.last_error,
+        }
+
+
+def _prefixed(settings: Mapping, prefix: str) -> Dict[str, int]:
+    return {
+        name[len(prefix):].lower(): value
+        for name, value in settings.items() if name.startswith(prefix)
+    }
@@ -3,20 +3,37 @@ YouTube Scam Ad Scanner - Main scanner implementation
 Analyzes URLs for common scam indicators using heuristics.
 """
 
-import re
+import hashlib
+import json
 import sys
-from typing import Dict, List, Tuple
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import click
-import requests
-from bs4 import BeautifulSoup
-import tldextract
 import validators
-from colorama import init, Fore, Style
 
-# Initialize colorama for Windows compatibility
-init()
+from src.cache import ScanCache, normalize_url
+from src.fetch import MAX_RESPONSE_BYTES, PARTIAL_BYTES, Body, BodyReader
+from src.fingerprint import ContentIndex, simhash
+from src.html_features import extract_features, soup_features
+from src.matcher import PhraseMatcher, compile_matcher
+from src.redirects import MAX_REDIRECTS, REDIRECT_CACHE_SIZE, REDIRECT_CACHE_TTL, follow_redirects
+from src.result import Code, Indicator, ScanResult
+from src.rules import RISK_LEVELS, RuleEngine, RulePlan
+from src.scheduler import HostScheduler
+from src.singleflight import SingleFlight
+from src.store import ScanStore, StoredScan
+
+# requests, colorama and the process pool are imported where they are first
+# needed: a CLI run that stops before fetching (or prints JSON) never pays
+# for them
+if TYPE_CHECKING:
+    from array import array
+
+    import requests
+    from src.analysis import ProcessAnalyzer
+    from src.reputation import ReputationIndex
 
 
 class ScamIndicators:
@@ -48,214 +65,428 @@ class ScamIndicators:
         'free money', 'easy money', 'instant cash', 'guaranteed',
         'no risk', 'amazing results', 'shocking', 'unbelievable'
     ]
+    
+    @classmethod
+    def phrase_lists(cls) -> Dict[str, List[str]]:
+        """Default phrase lists for the rule engine"""
+        return {
+            'scam_keywords': cls.SCAM_KEYWORDS,
+            'urgency_words': cls.URGENCY_WORDS,
+            'tgtbt_phrases': cls.TGTBT_PHRASES,
+            'suspicious_tld': cls.SUSPICIOUS_TLD,
+        }
+    
+    @classmethod
+    def matcher(cls) -> PhraseMatcher:
+        """Compiled matcher over all phrase lists (built once per list contents)"""
+        return compile_matcher({
+            'scam_keywords': cls.SCAM_KEYWORDS,
+            'urgency_words': cls.URGENCY_WORDS,
+            'tgtbt_phrases': cls.TGTBT_PHRASES,
+        })
 
 
 class ScamScanner:
     """Main scanner class for analyzing URLs"""
     
-    def __init__(self, timeout: int = 10):
+    # Page feature extractors: single-pass parser events (default) or a
+    # full BeautifulSoup tree; both give identical results
+    ANALYZERS = {
+        'stream': extract_features,
+        'soup': soup_features,
+    }
+    
+    def __init__(self, timeout: int = 10, cache: Optional[ScanCache] = None,
+                 store: Optional[ScanStore] = None, analyzer: str = 'stream',
+                 max_bytes: int = MAX_RESPONSE_BYTES,
+                 analysis_executor: Optional['ProcessAnalyzer'] = None,
+                 rules_file: Optional[str] = None, early_exit: bool = True,
+                 partial_bytes: int = PARTIAL_BYTES,
+                 reputation: Optional['ReputationIndex'] = None,
+                 scheduler: Optional[HostScheduler] = None,
+                 redirect_cache: Optional[ScanCache] = None,
+                 max_redirects: int = MAX_REDIRECTS,
+                 content_index: Optional[ContentIndex] = None):
+        if analyzer not in self.ANALYZERS:
+            raise ValueError(f'Unknown analyzer: {analyzer}')
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # Page bodies are read up to this many bytes; the rest is never downloaded
+        self.max_bytes = max_bytes
+        # Stop after the cheapest tier that settles the verdict (URL, then
+        # headers, then the first partial_bytes of the page, then all of it)
+        self.early_exit = early_exit
+        self.partial_bytes = partial_bytes
+        self.analyzer = analyzer
+        # Weights, thresholds and phrase lists from src/config.py, overridden
+        # by rules_file when given (reloaded when the file changes)
+        self.rules = RuleEngine(ScamIndicators.phrase_lists(), rules_file)
+        # Known scam / known good domain lists, checked on every scan
+        self.reputation = reputation
+        # Content analysis runs on this executor's worker processes when set,
+        # otherwise in the calling thread
+        self.analysis_executor = analysis_executor
+        self.cache = cache
+        self.store = store
+        # Concurrent scans of the same normalized URL share one fetch+parse
+        self.inflight = SingleFlight()
+        # Per-host concurrency caps, 429/503 backoff and connection pooling
+        # for every fetch made through this scanner
+        self.scheduler = scheduler or HostScheduler()
+        # Redirect answers by URL, so shared tracking redirectors are not
+        # requested again for every ad that goes through them
+        self.redirect_cache = redirect_cache if redirect_cache is not None else ScanCache(
+            ttl=REDIRECT_CACHE_TTL, maxsize=REDIRECT_CACHE_SIZE)
+        self.max_redirects = max_redirects
+        # Content analysis by page body, and campaign clusters of
+        # near-identical pages served from different domains
+        self.content_index = content_index if content_index is not None else ContentIndex()
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self) -> 'requests.Session':
+        """HTTP session shared by all scans, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    session = requests.Session()
+                    session.headers.update({
+                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                    })
+                    self.scheduler.mount(session)
+                    self._session = session
+        return self._session
+    
+    def scan_url(self, url: str, force_refresh: bool = False, stop_level: str = 'HIGH') -> Dict:
+        """
+        Scan a URL for scam indicators
+        
+        Same as scan(), with the result as a dict (see ScanResult.to_dict).
+        
+        Returns:
+            Dictionary containing scan results and risk score
+        """
+        return self.scan(url, force_refresh, stop_level).to_dict()
     
-    def scan_url(self, url: str) -> Dict:
+    def scan(self, url: str, force_refresh: bool = False, stop_level: str = 'HIGH') -> ScanResult:
         """
         Scan a URL for scam indicators
         
+        Results are looked up in the in-memory cache, then in the persistent
+        store; stale stored results are revalidated with a conditional GET.
+        
+        The scan runs in tiers from cheapest to most expensive and stops as
+        soon as the score reaches stop_level, since further indicators can
+        only raise it; details['tiers'] lists the tiers that ran.
+        
         Args:
             url: The URL to scan
+            force_refresh: Bypass the result cache and store and rescan
+            stop_level: Risk level that is enough for the caller: 'HIGH'
+                (default) stops only when the verdict is final; 'MEDIUM' or
+                'LOW' stop sooner (such results are not cached)
             
         Returns:
-            Dictionary containing scan results and risk score
+            The scan result
         """
-        results = {
-            'url': url,
-            'valid_url': False,
-            'accessible': False,
-            'risk_score': 0,
-            'indicators': [],
-            'details': {}
-        }
+        if stop_level not in RISK_LEVELS[1:]:
+            raise ValueError(f'Unknown stop level: {stop_level}')
+        key = normalize_url(url)
+        if self.cache is not None and not force_refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                cached.url = url
+                cached.details['cache'] = 'hit'
+                return cached
+        
+        # A forced rescan must not be answered by a scan that may have read
+        # the cache or store, nor a lower stop level by a HIGH one
+        flight = key if stop_level == 'HIGH' else f'{key} {stop_level}'
+        if force_refresh:
+            flight += ' refresh'
+        results, shared = self.inflight.do(flight, self._scan_and_cache, url, key,
+                                           force_refresh, stop_level)
+        if shared:
+            results.url = url
+            results.details['coalesced'] = True
+        
+        return results
+    
+    def _scan_and_cache(self, url: str, key: str, force_refresh: bool = False,
+                        stop_level: str = 'HIGH') -> ScanResult:
+        stored = None
+        if self.store is not None and not force_refresh:
+            stored = self.store.get(key)
+            if stored is not None and self.store.is_fresh(stored):
+                self.store.fresh_hits += 1
+                self.store.touch(key)
+                results = ScanResult.from_dict(stored.result)
+                results.url = url
+                results.details['cache'] = 'store'
+                if self.cache is not None:
+                    self.cache.set(key, results)
+                return results
+        
+        results, page = self._scan(url, stored, stop_level)
+        
+        # Only cache completed scans and final verdicts; fetch failures are
+        # often transient, a lower stop level may hide a higher verdict, and
+        # content analysis that was skipped is retried on the next scan
+        stopped = 'stopped_after' in results.details
+        skipped = Code.ANALYSIS_MEMORY_LIMIT in results.codes()
+        if (results.accessible or stopped) and (stop_level == 'HIGH' or not stopped) and not skipped:
+            if self.cache is not None:
+                self.cache.set(key, results)
+            if self.store is not None:
+                if results.details.get('cache') == 'revalidated':
+                    self.store.revalidated += 1
+                else:
+                    self.store.misses += 1
+                self.store.put(key, results.to_dict(), **page)
+        
+        return results
+    
+    def _scan(self, url: str, stored: Optional[StoredScan] = None,
+              stop_level: str = 'HIGH') -> Tuple[ScanResult, Dict]:
+        """
+        Scan a URL without consulting the cache
+        
+        Args:
+            url: The URL to scan
+            stored: Previous stored scan; its validators are sent as a
+                conditional GET and its content analysis is reused when the
+                page is unchanged
+            stop_level: Stop once the risk level reaches this one
+        
+        Returns:
+            (results, page) where page holds the etag, last_modified and
+            content_hash of the fetched page for the persistent store
+        """
+        page = {}
+        plan = self.rules.plan
+        results = ScanResult(url)
+        details = results.details
         
         # Validate URL
         if not validators.url(url):
-            results['indicators'].append('Invalid URL format')
-            return results
+            results.indicators.append(Indicator(Code.INVALID_URL))
+            return results, page
         
-        results['valid_url'] = True
+        results.valid_url = True
         
-        # Analyze domain
+        # Tier 1: URL and domain heuristics
+        tiers = ['url']
+        details['tiers'] = tiers
         domain_score, domain_indicators = self._analyze_domain(url)
-        results['risk_score'] += domain_score
-        results['indicators'].extend(domain_indicators)
-        results['details']['domain_analysis'] = {
+        results.risk_score += domain_score
+        results.indicators.extend(domain_indicators)
+        details['domain_analysis'] = {
             'score': domain_score,
             'indicators': domain_indicators
         }
         
+        if self._settled(plan, results.risk_score, stop_level):
+            return self._stop(results, plan, stop_level), page
+        
         # Try to fetch and analyze page content
+        from requests.exceptions import RequestException
         try:
-            response = self.session.get(url, timeout=self.timeout, allow_redirects=True)
-            results['accessible'] = True
-            results['details']['status_code'] = response.status_code
-            results['details']['final_url'] = response.url
+            headers = {}
+            if stored is not None:
+                if stored.etag:
+                    headers['If-None-Match'] = stored.etag
+                if stored.last_modified:
+                    headers['If-Modified-Since'] = stored.last_modified
             
-            # Check for redirects
-            if response.url != url:
-                results['indicators'].append(f'Redirects to different URL')
-                results['risk_score'] += 5
-            
-            if response.status_code == 200:
-                # Analyze page content
-                content_score, content_indicators = self._analyze_content(response.text, response.url)
-                results['risk_score'] += content_score
-                results['indicators'].extend(content_indicators)
-                results['details']['content_analysis'] = {
-                    'score': content_score,
-                    'indicators': content_indicators
-                }
+            # Streamed: the status and headers arrive before the body, and
+            # at most max_bytes of the body are downloaded. Redirects are
+            # followed hop by hop, each after a free slot for its host.
+            with follow_redirects(self.scheduler, self.session, url, self.max_redirects,
+                                  self.redirect_cache, timeout=self.timeout,
+                                  headers=headers, stream=True) as (response, hops):
+                if response.status_code == 304 and stored is not None:
+                    # Unchanged since the stored scan: skip download and parse
+                    results = ScanResult.from_dict(stored.result)
+                    results.url = url
+                    results.details['cache'] = 'revalidated'
+                    return results, {
+                        'etag': response.headers.get('ETag', stored.etag),
+                        'last_modified': response.headers.get('Last-Modified', stored.last_modified),
+                        'content_hash': stored.content_hash
+                    }
+                
+                # Tier 2: status, redirects and headers
+                tiers.append('headers')
+                results.accessible = True
+                details['status_code'] = response.status_code
+                details['final_url'] = response.url
+                
+                # Check for redirects, with the domain of every hop analyzed
+                chain = []
+                for hop in hops:
+                    hop_score, hop_indicators = self._analyze_domain(hop.url)
+                    chain.append(dict(hop._asdict(), domain_score=hop_score,
+                                      domain_indicators=hop_indicators))
+                if len(chain) > 1:
+                    details['redirect_chain'] = chain
+                redirect_score, redirect_indicators = plan.redirects(
+                    url, [(hop['url'], hop['domain_score']) for hop in chain])
+                results.risk_score += redirect_score
+                results.indicators.extend(redirect_indicators)
                 
-        except requests.exceptions.RequestException as e:
-            results['indicators'].append(f'Failed to fetch URL: {str(e)}')
-            results['risk_score'] += 10
+                if response.status_code == 200:
+                    page = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                    }
+                    if self._settled(plan, results.risk_score, stop_level):
+                        return self._stop(results, plan, stop_level), page
+                    
+                    reader = BodyReader(response, self.max_bytes)
+                    body = reader.read(self.partial_bytes if self.early_exit else None)
+                    if not body.complete:
+                        # Tier 3: score the start of the page with the rules
+                        # the rest of it cannot undo
+                        tiers.append('partial')
+                        partial_score, partial_indicators = self._analyze_prefix(body.text, plan)
+                        if self._settled(plan, results.risk_score + partial_score, stop_level):
+                            results.risk_score += partial_score
+                            results.indicators.extend(partial_indicators)
+                            details['content_analysis'] = {
+                                'score': partial_score,
+                                'indicators': partial_indicators,
+                                'partial': True
+                            }
+                            return self._stop(results, plan, stop_level), page
+                        body = reader.read()
+                    
+                    # Tier 4: the whole page
+                    tiers.append('content')
+                    page['content_hash'] = hashlib.sha256(body.content).hexdigest()
+                    self._add_content(results, body, response.url, page, stored)
+                
+        except RequestException as e:
+            results.indicators.append(Indicator(Code.FETCH_FAILED, str(e)))
+            results.risk_score += plan.weights['fetch_failed']
         
         # Calculate risk level
-        results['risk_level'] = self._calculate_risk_level(results['risk_score'])
+        results.risk_level = plan.risk_level(results.risk_score)
         
-        return results
+        return results, page
     
-    def _analyze_domain(self, url: str) -> Tuple[int, List[str]]:
-        """Analyze domain for suspicious characteristics"""
-        score = 0
-        indicators = []
-        
-        parsed = urlparse(url)
-        extracted = tldextract.extract(url)
-        
-        domain = extracted.domain
-        tld = f'.{extracted.suffix}'
+    def _add_content(self, results: ScanResult, body: Body, url: str, page: Dict,
+                     stored: Optional[StoredScan]):
+        """Add the content analysis of a downloaded page to results"""
+        details = results.details
+        details['content_type'] = body.content_type
         
-        # Check for suspicious TLD
-        if tld in ScamIndicators.SUSPICIOUS_TLD:
-            score += 15
-            indicators.append(f'Suspicious TLD: {tld}')
+        if body.truncated:
+            results.indicators.append(Indicator(Code.TRUNCATED, self.max_bytes // 1024))
+            details['truncated'] = True
         
-        # Check domain length (very long domains can be suspicious)
-        if len(domain) > 20:
-            score += 10
-            indicators.append(f'Unusually long domain name ({len(domain)} chars)')
+        previous = None
+        if stored is not None and stored.content_hash == page['content_hash']:
+            previous = stored.result['details'].get('content_analysis')
         
-        # Check for excessive hyphens or numbers
-        hyphen_count = domain.count('-')
-        if hyphen_count > 2:
-            score += 10
-            indicators.append(f'Multiple hyphens in domain ({hyphen_count})')
-        
-        digit_count = sum(c.isdigit() for c in domain)
-        if digit_count > 3:
-            score += 5
-            indicators.append(f'Multiple digits in domain ({digit_count})')
-        
-        # Check for HTTP (not HTTPS)
-        if parsed.scheme == 'http':
-            score += 10
-            indicators.append('No HTTPS encryption')
+        if body.binary:
+            # Images, archives, executables...: nothing to parse as HTML
+            content_score, content_indicators = 0, []
+            details['binary'] = True
+        else:
+            version = self.rules.version
+            indexed = None
+            if previous is not None:
+                # Same body as the stored scan: reuse its content analysis
+                content_score = previous['score']
+                content_indicators = [Indicator.parse(text) for text in previous['indicators']]
+                details['cache'] = 'revalidated'
+            else:
+                indexed = self.content_index.get(page['content_hash'], version)
+            if indexed is not None:
+                # Same body as a page analyzed before (often on another
+                # domain of the same campaign): reuse its content analysis
+                (content_score, content_indicators), cluster = indexed
+                details['content_reused'] = True
+            else:
+                if previous is None:
+                    # Analyze page content
+                    content_score, content_indicators = self.analyze_content(body.text, url)
+                if Code.ANALYSIS_MEMORY_LIMIT in (indicator.code for indicator in content_indicators):
+                    # Skipped (over the memory limit or a worker died): not
+                    # a verdict on the body, so it is not reused
+                    cluster = None
+                else:
+                    cluster = self.content_index.add(page['content_hash'], simhash(body.text),
+                                                     (content_score, content_indicators), version)
+            if cluster is not None:
+                details['campaign_id'] = cluster
+        results.risk_score += content_score
+        results.indicators.extend(content_indicators)
+        details['content_analysis'] = {
+            'score': content_score,
+            'indicators': content_indicators
+        }
+    
+    def _settled(self, plan: RulePlan, score: int, stop_level: str) -> bool:
+        return self.early_exit and plan.settled(score, stop_level)
+    
+    def _stop(self, results: ScanResult, plan: RulePlan, stop_level: str) -> ScanResult:
+        """Finish results early: the verdict can no longer drop below stop_level"""
+        results.details['stopped_after'] = results.details['tiers'][-1]
+        results.details['stop_level'] = stop_level
+        results.risk_level = plan.risk_level(results.risk_score)
+        return results
+    
+    def _analyze_prefix(self, html: str, plan: RulePlan) -> Tuple[int, List[Indicator]]:
+        """Lower bound on the content score from the start of a page"""
+        # Drop a tag cut off at the end (e.g. a form whose action is missing)
+        html = html[:html.rfind('>') + 1]
+        return plan.content(self.ANALYZERS[self.analyzer](html), html, partial=True)
+    
+    def _analyze_domain(self, url: str) -> Tuple[int, List[Indicator]]:
+        """Analyze domain for suspicious characteristics"""
+        reputation = None
+        if self.reputation is not None:
+            host = urlparse(url).hostname
+            if host:
+                reputation = self.reputation.lookup(host)
+        return self.rules.plan.domain(url, reputation)
+    
+    def analyze_domains(self, urls: Iterable[str]) -> Tuple['array', List[str]]:
+        """
+        Domain scores and risk levels of many URLs at once
         
-        # Check for IP address instead of domain
-        if re.match(r'\d+\.\d+\.\d+\.\d+', parsed.netloc):
-            score += 20
-            indicators.append('Using IP address instead of domain name')
+        Same scores as _analyze_domain, computed on feature columns (see
+        src/domain_batch.py); for offline triage of large URL lists.
         
-        return score, indicators
+        Returns:
+            (scores, risk levels) in input order; URLs that cannot be split
+            get a score of 0 and the level 'INVALID'
+        """
+        from src.domain_batch import score_domains
+        return score_domains(urls, self.rules.plan, self.reputation)
+    
+    def analyze_content(self, html: str, url: str) -> Tuple[int, List[Indicator]]:
+        """Analyze page content on the analysis executor, or in this thread"""
+        if self.analysis_executor is not None:
+            return self.analysis_executor.analyze(html, url)
+        return self._analyze_content(html, url)
     
-    def _analyze_content(self, html: str, url: str) -> Tuple[int, List[str]]:
+    def _analyze_content(self, html: str, url: str) -> Tuple[int, List[Indicator]]:
         """Analyze page content for scam indicators"""
-        score = 0
-        indicators = []
-        
-        soup = BeautifulSoup(html, 'lxml')
-        
-        # Get text content
-        text = soup.get_text().lower()
-        title = soup.title.string.lower() if soup.title else ''
-        
-        # Check for scam keywords
-        found_keywords = []
-        for keyword in ScamIndicators.SCAM_KEYWORDS:
-            if keyword in text or keyword in title:
-                found_keywords.append(keyword)
-        
-        if found_keywords:
-            score += len(found_keywords) * 5
-            indicators.append(f'Found {len(found_keywords)} scam keywords: {", ".join(found_keywords[:3])}{"..." if len(found_keywords) > 3 else ""}')
-        
-        # Check for urgency words
-        urgency_count = sum(1 for word in ScamIndicators.URGENCY_WORDS if word in text)
-        if urgency_count > 2:
-            score += urgency_count * 3
-            indicators.append(f'High urgency language detected ({urgency_count} instances)')
-        
-        # Check for too-good-to-be-true phrases
-        tgtbt_count = sum(1 for phrase in ScamIndicators.TGTBT_PHRASES if phrase in text)
-        if tgtbt_count > 0:
-            score += tgtbt_count * 5
-            indicators.append(f'Too-good-to-be-true phrases detected ({tgtbt_count} instances)')
-        
-        # Check for excessive exclamation marks
-        exclamation_count = text.count('!')
-        if exclamation_count > 10:
-            score += 10
-            indicators.append(f'Excessive exclamation marks ({exclamation_count})')
-        
-        # Check for popup/alert scripts (common in scams)
-        if 'alert(' in html.lower() or 'confirm(' in html.lower():
-            score += 15
-            indicators.append('Contains popup/alert scripts')
-        
-        # Check for missing or suspicious meta tags
-        if not soup.find('meta', attrs={'name': 'description'}):
-            score += 5
-            indicators.append('Missing meta description')
-        
-        # Check for external links (phishing often has few legitimate external links)
-        external_links = soup.find_all('a', href=True)
-        if len(external_links) < 3:
-            score += 5
-            indicators.append(f'Very few external links ({len(external_links)})')
-        
-        # Check for forms (potential data collection)
-        forms = soup.find_all('form')
-        if forms:
-            password_fields = soup.find_all('input', attrs={'type': 'password'})
-            if password_fields:
-                score += 15
-                indicators.append('Contains password input fields')
-            
-            # Check for forms without proper action
-            for form in forms:
-                if not form.get('action') or form.get('action') == '#':
-                    score += 10
-                    indicators.append('Form with suspicious or missing action')
-                    break
-        
-        return score, indicators
+        page = self.ANALYZERS[self.analyzer](html)
+        return self.rules.plan.content(page, html)
     
     def _calculate_risk_level(self, score: int) -> str:
         """Convert risk score to risk level"""
-        if score >= 50:
-            return 'HIGH'
-        elif score >= 25:
-            return 'MEDIUM'
-        elif score >= 10:
-            return 'LOW'
-        else:
-            return 'MINIMAL'
+        return self.rules.plan.risk_level(score)
 
 
 def print_results(results: Dict):
     """Pretty print scan results"""
+    from colorama import Fore, Style
+    
     print("\n" + "=" * 70)
     print(f"SCAM SCAN RESULTS")
     print("=" * 70)
@@ -263,8 +494,8 @@ def print_results(results: Dict):
     print(f"Valid URL: {results['valid_url']}")
     print(f"Accessible: {results['accessible']}")
     
-    # Color-coded risk level
-    risk_level = results['risk_level']
+    # Color-coded risk level (none for an invalid URL)
+    risk_level = results.get('risk_level', 'UNKNOWN')
     risk_score = results['risk_score']
     
     if risk_level == 'HIGH':
@@ -302,17 +533,68 @@ def print_results(results: Dict):
     print()
 
 
+def _batch_progress(done: int, total: int, result: Dict):
+    """Progress counter on stderr: live on a terminal, periodic otherwise"""
+    from src.batch import PROGRESS_EVERY
+    if sys.stderr.isatty():
+        click.echo(f"\r[{done}/{total}] scanned", err=True, nl=done == total)
+    elif done % PROGRESS_EVERY == 0 or done == total:
+        click.echo(f"[{done}/{total}] scanned", err=True)
+
+
+def run_batch_cli(source, output: Optional[str], timeout: int, concurrency: int,
+                  per_host: int, resume: bool):
+    """Batch mode of main: scan a URL list to NDJSON and exit"""
+    from src.batch import run_batch
+    
+    counts = run_batch(source, output, timeout=timeout, concurrency=concurrency,
+                       per_host=per_host, resume=resume, progress=_batch_progress)
+    skipped = counts.pop('skipped')
+    duplicates = counts.pop('duplicates')
+    summary = ', '.join(f"{level}: {count}" for level, count in sorted(counts.items()))
+    click.echo(f"Scanned {sum(counts.values())} URLs ({summary or 'none'}); "
+               f"skipped {skipped} already in the output, {duplicates} duplicates", err=True)
+    
+    sys.exit(1 if counts.get('HIGH') else 0)
+
+
 @click.command()
-@click.option('--url', '-u', required=True, help='URL to scan for scam indicators')
+@click.option('--url', '-u', help='URL to scan for scam indicators')
 @click.option('--timeout', '-t', default=10, help='Request timeout in seconds (default: 10)')
 @click.option('--json', 'output_json', is_flag=True, help='Output results as JSON')
-def main(url: str, timeout: int, output_json: bool):
+@click.option('--file', '-f', 'url_file', type=click.File('r', encoding='utf-8'),
+              help="Batch mode: scan every URL in this list ('-' for stdin)")
+@click.option('--output', '-o', type=click.Path(dir_okay=False),
+              help='Batch mode: NDJSON file to append results to (default: stdout)')
+@click.option('--concurrency', '-c', default=10, show_default=True,
+              help='Batch mode: URLs scanned in parallel')
+@click.option('--per-host', default=4, show_default=True,
+              help='Batch mode: URLs scanned in parallel against one host')
+@click.option('--resume/--no-resume', default=True, show_default=True,
+              help='Batch mode: skip URLs that already have a result in --output')
+def main(url: Optional[str], timeout: int, output_json: bool, url_file, output: Optional[str],
+         concurrency: int, per_host: int, resume: bool):
     """
     YouTube Scam Ad Scanner
     
     Scan a URL for common scam indicators including suspicious domains,
     scam keywords, urgency language, and other heuristics.
+    
+    With --file, scan a list of URLs (one per line, '#' comments allowed)
+    and write one JSON result per line in completion order.
     """
+    if (url is None) == (url_file is None):
+        raise click.UsageError('Give either --url or --file')
+    if concurrency < 1 or per_host < 1:
+        raise click.UsageError('--concurrency and --per-host must be at least 1')
+    if url_file is not None:
+        run_batch_cli(url_file, output, timeout, concurrency, per_host, resume)
+    
+    if not output_json:
+        # Initialize colorama for Windows compatibility
+        from colorama import init
+        init()
+    
     scanner = ScamScanner(timeout=timeout)
     
     click.echo(f"Scanning URL: {url}")
@@ -321,13 +603,12 @@ def main(url: str, timeout: int, output_json: bool):
     results = scanner.scan_url(url)
     
     if output_json:
-        import json
         print(json.dumps(results, indent=2))
     else:
         print_results(results)
     
     # Exit with error code if high risk
-    if results['risk_level'] == 'HIGH':
+    if results.get('risk_level') == 'HIGH':
         sys.exit(1)
     
     sys.exit(0)
@@ -0,0 +1,256 @@
+"""
+Per-host politeness for the fetch stage.
+
+Many ads share one redirector or ad network host, and concurrent scans
+against it trip rate limits. HostScheduler caps the requests in flight per
+host across every scan in the process (API threads, /batch-scan workers,
+AsyncScamScanner), backs a host off when it answers 429 or 503 (honoring
+Retry-After, exponential otherwise) and retries, so other scans queue behind
+the backoff instead of hammering the host. It also sizes the session's
+keep-alive connection pools so connections to a host are reused rather than
+reopened, and keeps per-host queue depth and latency for /stats.
+"""
+
+import contextlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    import requests
+
+PER_HOST = 4
+POOL_SIZE = 10
+POOL_HOSTS = 100
+MAX_RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+# Idle hosts whose state (and stats) is kept
+MAX_HOSTS = 10000
+
+RETRY_STATUSES = frozenset([429, 503])
+
+
+def host_key(url: str) -> str:
+    """Host a request is scheduled under (lowercased, without port)"""
+    try:
+        return (urlsplit(url).hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+def retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds a Retry-After header asks to wait (delay-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class _Host:
+    """Scheduling state and counters of one host"""
+
+    __slots__ = ('ready', 'active', 'queued', 'not_before', 'requests', 'throttled',
+                 'retries', 'latency_total', 'latency_max')
+
+    def __init__(self, lock: threading.Lock):
+        self.ready = threading.Condition(lock)
+        self.active = 0
+        self.queued = 0
+        self.not_before = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+
+class HostScheduler:
+    """Per-host concurrency caps, backoff and retries for HTTP fetches"""
+
+    def __init__(self, per_host: int = PER_HOST, pool_size: int = POOL_SIZE,
+                 pool_hosts: int = POOL_HOSTS, max_retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF,
+                 max_hosts: int = MAX_HOSTS):
+        """
+        Args:
+            per_host: Requests in flight per host (others queue)
+            pool_size: Keep-alive connections kept open per host
+            pool_hosts: Hosts whose connection pools are kept
+            max_retries: Retries of a request answered with 429 or 503
+            backoff: First backoff in seconds when there is no Retry-After
+                (doubled on each retry)
+            max_backoff: Longest wait honored; a longer Retry-After is not
+                retried and its response is returned
+            max_hosts: Hosts whose state is kept (idle ones are forgotten
+                first)
+        """
+        if per_host < 1 or pool_size < 1 or pool_hosts < 1:
+            raise ValueError('per_host, pool_size and pool_hosts must be at least 1')
+        self.per_host = per_host
+        self.pool_size = pool_size
+        self.pool_hosts = pool_hosts
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_hosts = max_hosts
+        self._lock = threading.Lock()
+        self._hosts: 'OrderedDict[str, _Host]' = OrderedDict()
+
+    def mount(self, session: 'requests.Session', pool_hosts: Optional[int] = None):
+        """
+        Size a session's connection pools for keep-alive reuse
+
+        Args:
+            session: Session the scans fetch with
+            pool_hosts: Hosts whose pools are kept (default: the scheduler's)
+        """
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=pool_hosts or self.pool_hosts,
+                              pool_maxsize=max(self.pool_size, self.per_host))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    @contextlib.contextmanager
+    def fetch(self, session: 'requests.Session', url: str,
+              **kwargs) -> Iterator['requests.Response']:
+        """
+        GET url once a slot for its host is free, retrying 429 and 503
+
+        The host slot is held until the block exits, so a streamed body
+        counts against the host while it downloads; the response is closed
+        on exit.
+
+        Args:
+            session: Session to fetch with
+            url: URL to fetch
+            **kwargs: Passed to session.get
+        """
+        key = host_key(url)
+        attempt = 0
+        while True:
+            host = self._acquire(key)
+            try:
+                start = time.monotonic()
+                response = session.get(url, **kwargs)
+            except BaseException:
+                self._release(host)
+                raise
+            latency = time.monotonic() - start
+
+            delay, retry = None, False
+            if response.status_code in RETRY_STATUSES:
+                delay, retry = self._backoff(response, attempt)
+                retry = retry and attempt < self.max_retries
+            self._record(host, latency, delay, retry)
+            if not retry:
+                break
+            response.close()
+            self._release(host)
+            attempt += 1
+
+        try:
+            yield response
+        finally:
+            response.close()
+            self._release(host)
+
+    def _backoff(self, response: 'requests.Response', attempt: int) -> Tuple[float, bool]:
+        """
+        Seconds to back the host off after a 429/503, and whether to retry
+        (not when Retry-After asks for more than max_backoff)
+        """
+        requested = retry_after(response.headers.get('Retry-After'))
+        if requested is None:
+            return min(self.backoff * 2 ** attempt, self.max_backoff), True
+        return min(requested, self.max_backoff), requested <= self.max_backoff
+
+    def _acquire(self, key: str) -> _Host:
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                self._forget_idle()
+                host = self._hosts[key] = _Host(self._lock)
+            self._hosts.move_to_end(key)
+            host.queued += 1
+            while True:
+                wait = host.not_before - time.monotonic()
+                if host.active < self.per_host and wait <= 0:
+                    break
+                host.ready.wait(wait if wait > 0 else None)
+            host.queued -= 1
+            host.active += 1
+            host.requests += 1
+            return host
+
+    def _record(self, host: _Host, latency: float, delay: Optional[float], retry: bool):
+        with self._lock:
+            host.latency_total += latency
+            host.latency_max = max(host.latency_max, latency)
+            if delay is not None:
+                # Every request to the host waits out the backoff, not just this one
+                host.throttled += 1
+                host.retries += retry
+                host.not_before = max(host.not_before, time.monotonic() + delay)
+
+    def _release(self, host: _Host):
+        with self._lock:
+            host.active -= 1
+            host.ready.notify_all()
+
+    def _forget_idle(self):
+        """Make room for a new host by dropping least recently used idle ones"""
+        now = time.monotonic()
+        excess = len(self._hosts) + 1 - self.max_hosts
+        for key in list(self._hosts):
+            if excess <= 0:
+                break
+            host = self._hosts[key]
+            if not host.active and not host.queued and host.not_before <= now:
+                del self._hosts[key]
+                excess -= 1
+
+    def stats(self, top: int = 20) -> Dict:
+        """Totals and the busiest hosts (by queue depth, then requests) for /stats"""
+        now = time.monotonic()
+        with self._lock:
+            hosts = sorted(self._hosts.items(),
+                           key=lambda item: (item[1].queued, item[1].requests), reverse=True)
+            busiest = {
+                key: {
+                    'in_flight': host.active,
+                    'queued': host.queued,
+                    'requests': host.requests,
+                    'throttled': host.throttled,
+                    'retries': host.retries,
+                    'avg_latency_ms': round(host.latency_total / host.requests * 1000, 1)
+                    if host.requests else 0.0,
+                    'max_latency_ms': round(host.latency_max * 1000, 1),
+                    'backoff_remaining': round(max(0.0, host.not_before - now), 3),
+                }
+                for key, host in hosts[:top]
+            }
+            return {
+                'per_host': self.per_host,
+                'pool_size': self.pool_size,
+                'hosts': len(self._hosts),
+                'in_flight': sum(host.active for _, host in hosts),
+                'queued': sum(host.queued for _, host in hosts),
+                'requests': sum(host.requests for _, host in hosts),
+                'throttled': sum(host.throttled for _, host in hosts),
+                'retries': sum(host.retries for _, host in hosts),
+                'busiest': busiest,
+            }
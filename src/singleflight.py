@@ -0,0 +1,124 @@
+"""
+In-flight request coalescing ("single-flight").
+
+When many callers ask for the same key at once, the first caller does the
+work and the others wait for its result instead of repeating it. Works for
+threads (SingleFlight) and for asyncio coroutines (AsyncSingleFlight).
+"""
+
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _Counters:
+    """Executed/collapsed counters shared by both implementations"""
+
+    def __init__(self):
+        self.executed = 0
+        self.collapsed = 0
+        self._calls: Dict[str, Any] = {}
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._calls),
+            'executed': self.executed,
+            'collapsed': self.collapsed,
+        }
+
+
+class SingleFlight(_Counters):
+    """Coalesce concurrent calls for the same key across threads"""
+
+    def __init__(self, copy_result: Callable[[Any], Any] = copy.deepcopy):
+        """
+        Args:
+            copy_result: Applied to the shared result for every waiting
+                caller, so callers can annotate their result independently
+        """
+        super().__init__()
+        self._copy = copy_result
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) unless a call for key is already running
+
+        Returns:
+            (result, shared) where shared is True if the result came from
+            another caller's in-flight call. Exceptions raised by the
+            running call are re-raised in every waiting caller.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.collapsed += 1
+                future.waiters += 1
+                leader = False
+            else:
+                future = Future()
+                future.waiters = 0
+                self._calls[key] = future
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            return self._copy(future.result()), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+
+        # Waiters can no longer join once the key is removed, so the
+        # snapshot is only taken when someone is actually waiting
+        with self._lock:
+            del self._calls[key]
+            waiters = future.waiters
+        future.set_result(self._copy(result) if waiters else result)
+        return result, False
+
+
+class AsyncSingleFlight(_Counters):
+    """Coalesce concurrent coroutine calls for the same key in one event loop"""
+
+    def __init__(self, copy_result: Callable[[Any], Any] = copy.deepcopy):
+        super().__init__()
+        self._copy = copy_result
+
+    async def do(self, key: str, fn: Callable[..., Awaitable], *args, **kwargs) -> Tuple[Any, bool]:
+        """Await fn(*args, **kwargs) unless a call for key is already running
+
+        Same contract as SingleFlight.do.
+        """
+        # Imported here: thread-only users (the scanner CLI) never need it
+        import asyncio
+
+        future = self._calls.get(key)
+        if future is not None:
+            self.collapsed += 1
+            # shield: a cancelled waiter must not cancel the shared call
+            return self._copy(await asyncio.shield(future)), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executed += 1
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            del self._calls[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved so an exception nobody awaited is not logged
+                future.exception()
+            raise
+
+        del self._calls[key]
+        future.set_result(self._copy(result))
+        return result, False
@@ -0,0 +1,406 @@
+"""
+Running scan statistics.
+
+Totals, risk-level and source counts, unique URLs and per-day rollups are
+updated as scans are logged instead of being recomputed from the whole log
+for every /stats request. The aggregates are saved next to scans.jsonl
+together with the log offset they cover, so a restart only replays the
+lines appended since the last save; saves happen at most every
+save_interval seconds (and at shutdown), not per logged scan. Only the most
+recent days are kept (as many as the longest /stats window), so the file
+does not grow with the age of the log.
+
+Unique URLs are counted exactly while there are few of them and switch to a
+HyperLogLog estimate once there are more than the exact limit. Per-day
+counts switch much sooner (day_exact_limit), so a busy day costs a few KB
+of registers rather than every URL scanned that day.
+"""
+
+import base64
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from src.jsonio import JSONBackend, json_backend
+
+# Fields of a log entry the aggregates count
+COUNTED_FIELDS = ('timestamp', 'risk_level', 'source', 'url')
+# Per-day rollups kept (the newest days)
+MAX_DAYS = 366
+# Unique URLs of one day counted exactly: about as many as fit in the size
+# of the day's HyperLogLog registers
+DAY_EXACT_LIMIT = 100
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality estimator (64-bit hashes, 2**precision registers)"""
+
+    def __init__(self, precision: int = 14, registers: Optional[bytearray] = None):
+        """
+        Args:
+            precision: Number of index bits (4-16); the standard error is
+                about 1.04 / sqrt(2**precision)
+            registers: Existing registers to restore
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError('register count does not match precision')
+
+    def add(self, value: str):
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Estimated number of distinct values added"""
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: 'HyperLogLog'):
+        """Fold another estimator with the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError('cannot merge HyperLogLogs with different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_dict(self) -> Dict:
+        return {'precision': self.precision,
+                'registers': base64.b64encode(bytes(self.registers)).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        return cls(data['precision'], bytearray(base64.b64decode(data['registers'])))
+
+
+class UniqueCounter:
+    """Distinct-value counter: exact up to a limit, HyperLogLog beyond it"""
+
+    def __init__(self, exact_limit: int = 10000, precision: int = 14):
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self._values = set()
+        self._hll: Optional[HyperLogLog] = None
+
+    @property
+    def exact(self) -> bool:
+        return self._hll is None
+
+    def add(self, value: str):
+        if self._hll is not None:
+            self._hll.add(value)
+            return
+        self._values.add(value)
+        if len(self._values) > self.exact_limit:
+            self._switch_to_estimate()
+
+    def _switch_to_estimate(self):
+        self._hll = HyperLogLog(self.precision)
+        for value in self._values:
+            self._hll.add(value)
+        self._values = set()
+
+    def count(self) -> int:
+        return len(self._values) if self._hll is None else self._hll.count()
+
+    def merge(self, other: 'UniqueCounter'):
+        """Fold another counter into this one (switching to an estimate if needed)"""
+        if self._hll is None and other._hll is None:
+            for value in other._values:
+                self.add(value)
+            return
+        if self._hll is None:
+            self._switch_to_estimate()
+        if other._hll is None:
+            for value in other._values:
+                self._hll.add(value)
+        else:
+            self._hll.merge(other._hll)
+
+    def to_dict(self) -> Dict:
+        if self._hll is None:
+            return {'values': sorted(self._values)}
+        return {'hll': self._hll.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict, exact_limit: int = 10000, precision: int = 14) -> 'UniqueCounter':
+        counter = cls(exact_limit, precision)
+        if 'hll' in data:
+            counter._hll = HyperLogLog.from_dict(data['hll'])
+            counter.precision = counter._hll.precision
+        else:
+            for value in data.get('values', []):
+                counter.add(value)
+        return counter
+
+
+class Rollup:
+    """Scan counts for one period (all time or a single day)"""
+
+    def __init__(self, exact_limit: int = 10000, precision: int = 14):
+        self.total = 0
+        self.risk_levels = Counter()
+        self.sources = Counter()
+        self.unique = UniqueCounter(exact_limit, precision)
+
+    def add(self, entry: Dict):
+        self.total += 1
+        self.risk_levels[entry.get('risk_level') or 'UNKNOWN'] += 1
+        self.sources[entry.get('source') or 'unknown'] += 1
+        url = entry.get('url')
+        if url:
+            self.unique.add(url)
+
+    def merge(self, other: 'Rollup'):
+        self.total += other.total
+        self.risk_levels.update(other.risk_levels)
+        self.sources.update(other.sources)
+        self.unique.merge(other.unique)
+
+    def summary(self) -> Dict:
+        return {
+            'total_scans': self.total,
+            'risk_levels': dict(self.risk_levels),
+            'sources': dict(self.sources),
+            'unique_urls': self.unique.count(),
+            'unique_urls_exact': self.unique.exact,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'total': self.total,
+            'risk_levels': dict(self.risk_levels),
+            'sources': dict(self.sources),
+            'unique': self.unique.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, exact_limit: int = 10000, precision: int = 14) -> 'Rollup':
+        rollup = cls(exact_limit, precision)
+        rollup.total = data.get('total', 0)
+        rollup.risk_levels.update(data.get('risk_levels', {}))
+        rollup.sources.update(data.get('sources', {}))
+        rollup.unique = UniqueCounter.from_dict(data.get('unique', {}), exact_limit, precision)
+        return rollup
+
+
+class ScanStats:
+    """All-time and per-day scan aggregates, persisted as JSON"""
+
+    def __init__(self, path: Optional[str] = None, exact_limit: int = 10000,
+                 precision: int = 14, day_precision: int = 12,
+                 day_exact_limit: int = DAY_EXACT_LIMIT, save_interval: float = 60,
+                 max_days: int = MAX_DAYS, serializer: Optional[JSONBackend] = None):
+        """
+        Args:
+            path: JSON file the aggregates are saved to (None keeps them in memory)
+            exact_limit: Unique URLs counted exactly before switching to HyperLogLog
+            precision: HyperLogLog precision for the all-time unique count
+            day_precision: HyperLogLog precision for per-day unique counts
+            day_exact_limit: Unique URLs of one day counted exactly
+            save_interval: Seconds between saves triggered by added entries
+                (0 to only save explicitly)
+            max_days: Per-day rollups kept; older days are dropped when saving
+            serializer: JSON backend the aggregates are saved with and log
+                lines are decoded with by sync() (default: the fastest installed)
+        """
+        self.path = path
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self.day_precision = day_precision
+        self.day_exact_limit = day_exact_limit
+        self.save_interval = save_interval
+        self.max_days = max_days
+        self._serializer = serializer or json_backend()
+        # Replayed log lines are decoded into just the counted fields
+        self._counted_fields = self._serializer.fields(COUNTED_FIELDS)
+        self.offset = 0
+        self._lock = threading.RLock()
+        # Held for a whole save, so snapshots are written in order
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.total = Rollup(self.exact_limit, self.precision)
+        self.days: Dict[str, Rollup] = {}
+
+    @classmethod
+    def load(cls, path: str, read_only: bool = False, **kwargs) -> 'ScanStats':
+        """
+        Restore saved aggregates (empty ones if the file is missing or unreadable)
+
+        Args:
+            path: JSON file the aggregates were saved to
+            read_only: Never write the file back (e.g. while the API server
+                that owns it is running); the stats are kept in memory
+            **kwargs: Passed to ScanStats
+        """
+        stats = cls(None if read_only else path, **kwargs)
+        try:
+            with open(path, 'rb') as f:
+                data = stats._serializer.loads(f.read())
+        except (OSError, ValueError):
+            return stats
+        if not isinstance(data, dict):
+            return stats
+
+        stats.offset = data.get('offset', 0)
+        stats.total = Rollup.from_dict(data.get('total', {}), stats.exact_limit, stats.precision)
+        stats.days = {
+            day: Rollup.from_dict(rollup, stats.day_exact_limit, stats.day_precision)
+            for day, rollup in data.get('days', {}).items()
+        }
+        stats._prune()
+        return stats
+
+    def add(self, entry: Dict, offset: Optional[int] = None):
+        """
+        Count a logged scan
+
+        Args:
+            entry: Log entry as written to scans.jsonl
+            offset: Log file offset just past the entry's line; entries at or
+                before the offset already counted are ignored
+        """
+        with self._lock:
+            if offset is not None:
+                if offset <= self.offset:
+                    return
+                self.offset = offset
+            self._add(entry)
+            self._unsaved += 1
+            due = (self.path and self.save_interval
+                   and time.monotonic() - self._saved_at >= self.save_interval)
+            if due:
+                # Other adds wait for the next interval, not for this save
+                self._saved_at = time.monotonic()
+        if due:
+            self.save()
+
+    def _add(self, entry: Dict):
+        self.total.add(entry)
+        day = str(entry.get('timestamp') or '')[:10]
+        if day:
+            rollup = self.days.get(day)
+            if rollup is None:
+                rollup = self.days[day] = Rollup(self.day_exact_limit, self.day_precision)
+            rollup.add(entry)
+
+    def sync(self, log_file: str) -> int:
+        """
+        Count entries appended to the log since the covered offset
+
+        If the log shrank (rotated or replaced), the aggregates are rebuilt
+        from the start of the file.
+
+        Returns:
+            Number of entries counted
+        """
+        if not os.path.exists(log_file):
+            return 0
+
+        with self._lock:
+            size = os.path.getsize(log_file)
+            if size < self.offset:
+                self._reset()
+            if size == self.offset:
+                return 0
+
+            counted = 0
+            with open(log_file, 'rb') as f:
+                f.seek(self.offset)
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break
+                    self.offset += len(raw)
+                    try:
+                        entry = self._counted_fields(raw)
+                    except ValueError:
+                        continue
+                    self._add(entry)
+                    counted += 1
+        if counted and self.path:
+            self.save()
+        return counted
+
+    def summary(self) -> Dict:
+        """All-time totals"""
+        with self._lock:
+            return self.total.summary()
+
+    def window(self, days: int, today: Optional[date] = None) -> Dict:
+        """
+        Totals for the last `days` days, including today
+
+        Returns:
+            The window totals plus a 'daily' list with one summary per day
+            that has scans, oldest first
+        """
+        today = today or date.today()
+        names = [(today - timedelta(days=n)).isoformat() for n in range(days - 1, -1, -1)]
+        with self._lock:
+            merged = Rollup(self.day_exact_limit, self.day_precision)
+            daily = []
+            for name in names:
+                rollup = self.days.get(name)
+                if rollup is None:
+                    continue
+                merged.merge(rollup)
+                daily.append({'date': name, **rollup.summary()})
+        summary = merged.summary()
+        summary['days'] = days
+        summary['daily'] = daily
+        return summary
+
+    def _prune(self):
+        """Drop the per-day rollups older than the newest max_days"""
+        if len(self.days) > self.max_days:
+            for day in sorted(self.days)[:-self.max_days]:
+                del self.days[day]
+
+    def save(self):
+        """
+        Write the aggregates atomically to the JSON file (older days are dropped first)
+
+        Only taking the snapshot holds the stats lock; entries keep being
+        counted while it is serialized and written.
+        """
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                self._prune()
+                data = {
+                    'offset': self.offset,
+                    'total': self.total.to_dict(),
+                    'days': {day: rollup.to_dict() for day, rollup in self.days.items()},
+                }
+                self._unsaved = 0
+                self._saved_at = time.monotonic()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(self._serializer.dumps(data))
+            os.replace(tmp_path, self.path)
+
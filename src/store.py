@@ -0,0 +1,150 @@
+"""
+Persistent scan cache backed by SQLite.
+
+Keeps the latest scan result per normalized URL together with the fetch
+time, the ETag/Last-Modified validators and a hash of the page body, so a
+restarted API server can answer repeat scans without a cold warm-up and
+revalidate stale entries with conditional GETs. The store holds at most
+max_entries results; the least recently used are evicted beyond that.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+# Stored results kept before the least recently used are evicted
+STORE_MAX_ENTRIES = 100000
+
+
+class StoredScan(NamedTuple):
+    """A persisted scan result and the validators of the page it came from"""
+    result: Dict
+    fetched_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: Optional[str]
+
+
+class ScanStore:
+    """SQLite (WAL mode) store of scan results keyed by normalized URL"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS scans (
+            url_key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT,
+            used_at REAL
+        )
+    '''
+
+    def __init__(self, path: str, ttl: float = 3600, max_entries: int = STORE_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            ttl: Seconds a stored result is used without revalidation
+            max_entries: Stored results kept (least recently used are
+                evicted first)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(scans)')}
+        if 'used_at' not in columns:
+            # Stores written before eviction: rows count as used when fetched
+            self._conn.execute('ALTER TABLE scans ADD COLUMN used_at REAL')
+            self._conn.execute('UPDATE scans SET used_at = fetched_at')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS scans_used_at ON scans (used_at)')
+        self._entries = self._conn.execute('SELECT COUNT(*) FROM scans').fetchone()[0]
+
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[StoredScan]:
+        """Return the stored scan for key, fresh or not, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, fetched_at, etag, last_modified, content_hash '
+                'FROM scans WHERE url_key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredScan(json.loads(row[0]), *row[1:])
+
+    def is_fresh(self, stored: StoredScan, now: Optional[float] = None) -> bool:
+        """Whether a stored scan is within the TTL"""
+        return (now if now is not None else time.time()) - stored.fetched_at < self.ttl
+
+    def put(self, key: str, result: Dict, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, content_hash: Optional[str] = None,
+            fetched_at: Optional[float] = None):
+        """Insert or replace the stored scan for key, evicting the least recently used beyond max_entries"""
+        fetched_at = fetched_at or time.time()
+        with self._lock:
+            exists = self._conn.execute('SELECT 1 FROM scans WHERE url_key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO scans '
+                '(url_key, result, fetched_at, etag, last_modified, content_hash, used_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, json.dumps(result), fetched_at,
+                 etag, last_modified, content_hash, fetched_at)
+            )
+            if exists is None:
+                self._entries += 1
+            if self._entries > self.max_entries:
+                excess = self._entries - self.max_entries
+                self._conn.execute(
+                    'DELETE FROM scans WHERE url_key IN '
+                    '(SELECT url_key FROM scans ORDER BY used_at LIMIT ?)', (excess,)
+                )
+                self._entries -= excess
+                self.evictions += excess
+
+    def touch(self, key: str, used_at: Optional[float] = None):
+        """Mark a stored scan as used now (it is evicted last)"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE scans SET used_at = ? WHERE url_key = ?',
+                (used_at or time.time(), key)
+            )
+
+    def delete(self, key: str):
+        """Remove the stored scan for key"""
+        with self._lock:
+            deleted = self._conn.execute('DELETE FROM scans WHERE url_key = ?', (key,)).rowcount
+            self._entries -= deleted
+
+    def __len__(self):
+        return self._entries
+
+    def stats(self) -> Dict:
+        """Store counters for /stats"""
+        return {
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'fresh_hits': self.fresh_hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,138 @@
+"""
+Offline public suffix lookup.
+
+Splitting a host into its registrable domain and public suffix needs the
+Public Suffix List. tldextract.extract() looks for a cached copy on disk on
+first use and may download a fresh one, and every call re-parses the URL.
+This module builds a label trie from the snapshot bundled with tldextract
+(or a local list file) once per process, on first use and without touching
+the network, and memoizes the split per host, since a scanner sees the same
+hosts over and over.
+
+Results match tldextract with private domains excluded, except that hosts
+are lowercased.
+"""
+
+import functools
+import importlib.util
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Same rule syntax tldextract parses
+RULE = re.compile(r'^(?P<suffix>[.*!]*\w[\S]*)', re.UNICODE | re.MULTILINE)
+PRIVATE_SEPARATOR = '// ===BEGIN PRIVATE DOMAINS==='
+OCTET = r'(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])'
+IPV4_HOST = re.compile(rf'(?:{OCTET}\.){{3}}{OCTET}', re.ASCII)
+
+# Hosts whose split is remembered
+HOST_CACHE_SIZE = 65536
+
+# Trie node key marking the end of a rule (labels are never None)
+_END = None
+
+
+def parse_suffix_list(text: str) -> List[str]:
+    """ICANN (public) rules of a Public Suffix List, in file order"""
+    public = text.partition(PRIVATE_SEPARATOR)[0]
+    return [m.group('suffix') for m in RULE.finditer(public)]
+
+
+def bundled_suffix_list() -> str:
+    """The Public Suffix List snapshot shipped with tldextract"""
+    # Located, not imported: importing tldextract pulls in requests and
+    # its cache machinery
+    spec = importlib.util.find_spec('tldextract')
+    path = os.path.join(os.path.dirname(spec.origin), '.tld_set_snapshot')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class SuffixTrie:
+    """Public suffix rules as nested dicts keyed by reversed labels"""
+
+    def __init__(self, rules: Sequence[str]):
+        self._root: Dict = {}
+        for rule in rules:
+            node = self._root
+            for label in reversed(rule.split('.')):
+                node = node.setdefault(label, {})
+            node[_END] = True
+        self.rules = len(rules)
+
+    def suffix_index(self, labels: Sequence[str]) -> Optional[int]:
+        """Index of the first public suffix label, or None if nothing matches"""
+        node = self._root
+        suffix_idx = label_idx = len(labels)
+        for label in reversed(labels):
+            if label.startswith('xn--'):
+                label = _decode_punycode(label)
+            child = node.get(label)
+            if child is not None:
+                label_idx -= 1
+                node = child
+                if _END in node:
+                    suffix_idx = label_idx
+                continue
+            if '*' in node:
+                # '*.ck' makes any label a suffix, except '!www.ck'
+                return label_idx if '!' + label in node else label_idx - 1
+            break
+        return None if suffix_idx == len(labels) else suffix_idx
+
+    def split(self, host: str) -> Tuple[str, str]:
+        """
+        Registrable domain label and public suffix of a host
+
+        Args:
+            host: Lowercase host name, e.g. 'login.example.co.uk'
+
+        Returns:
+            (domain, suffix), e.g. ('example', 'co.uk'); an IPv4 address is
+            its own domain with no suffix, and a host with no known suffix
+            has its last label as the domain
+        """
+        host = host.replace('\u3002', '.').replace('\uff0e', '.').replace('\uff61', '.').rstrip('.')
+        labels = host.split('.')
+        index = self.suffix_index(labels)
+        if index is None:
+            if len(labels) == 4 and IPV4_HOST.fullmatch(host):
+                return host, ''
+            return labels[-1], ''
+        domain = labels[index - 1] if index > 0 else ''
+        return domain, '.'.join(labels[index:])
+
+
+def _decode_punycode(label: str) -> str:
+    import idna
+    try:
+        return idna.decode(label)
+    except (UnicodeError, IndexError):
+        return label
+
+
+_trie: Optional[SuffixTrie] = None
+_trie_lock = threading.Lock()
+
+
+def default_trie() -> SuffixTrie:
+    """Trie of the bundled suffix list, built on first use"""
+    global _trie
+    if _trie is None:
+        with _trie_lock:
+            if _trie is None:
+                _trie = SuffixTrie(parse_suffix_list(bundled_suffix_list()))
+    return _trie
+
+
+def load_trie(path: str) -> SuffixTrie:
+    """Trie of a local Public Suffix List file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return SuffixTrie(parse_suffix_list(f.read()))
+
+
+@functools.lru_cache(maxsize=HOST_CACHE_SIZE)
+def split_host(host: str) -> Tuple[str, str]:
+    """SuffixTrie.split with the bundled list, memoized per host"""
+    return default_trie().split(host)
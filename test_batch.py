@@ -2,9 +2,13 @@
 Batch URL Scanner - Test multiple URLs at once
 
 Usage:
-    python test_batch.py
+    python test_batch.py [urls.txt]
     
-This script reads URLs from sample_urls.txt and scans them all.
+This script reads URLs from sample_urls.txt (or the given file) and scans
+them all one by one. For large lists use the scanner's batch mode, which
+scans concurrently and writes resumable NDJSON:
+
+    python -m src.scanner --file urls.txt --output results.ndjson
 """
 
 from src.scanner import ScamScanner
@@ -29,12 +33,7 @@ def load_urls_from_file(filename='sample_urls.txt'):
 
 
 def main():
-    # Example URLs to test
-    urls = [
-        "https://www.wikipedia.org",
-        "https://www.github.com",
-        "https://www.python.org",
-    ]
+    urls = load_urls_from_file(sys.argv[1] if len(sys.argv) > 1 else 'sample_urls.txt')
     
     print("=" * 70)
     print("BATCH URL SCANNER")
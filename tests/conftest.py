@@ -0,0 +1,139 @@
+"""Shared pytest fixtures"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+
+STUB_DELAY = 0.1
+STUB_SLOW_DELAY = 1.0
+STUB_PAGE = b"<html><head><title>Stub</title></head><body><p>Hello</p></body></html>"
+
+
+STUB_ETAG = '"stub-v1"'
+
+# Other bodies by path prefix: (Content-Type, body)
+STUB_BODIES = {
+    '/big': ('text/html; charset=utf-8',
+             b'<html><body>' + b'<p>act now \xc3\xa9</p>' * 20000 + b'</body></html>'),
+    '/image': ('image/png', b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 64),
+    '/download': ('application/octet-stream', b'PK\x03\x04' + bytes(4096)),
+    '/scam': ('text/html; charset=utf-8',
+              b'<html><body>' + b'<p>Act now! You have won! Claim your prize! Free money! '
+              b'Hurry, urgent, last chance!</p>' * 5000 + b'</body></html>'),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves a small page after a fixed delay and tracks concurrency
+    
+    Paths starting with /slow are served after STUB_SLOW_DELAY instead.
+    Paths starting with /etag carry an ETag and answer a matching
+    If-None-Match with 304 Not Modified. Paths in STUB_BODIES get their
+    own content type and body. Paths starting with /throttle answer 429
+    (Retry-After: 0) while server.throttle is positive, /throttle-long
+    answers 429 with a Retry-After of an hour and /unavailable answers 503
+    while server.throttle is positive. /hop/N redirects to /hop/N-1 until
+    /hop/0, and /redirect?to=URL redirects to URL.
+    """
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(STUB_SLOW_DELAY if self.path.startswith('/slow') else STUB_DELAY)
+            location = self._redirect()
+            if location:
+                body = b'<html><body>Redirecting</body></html>'
+                self.send_response(302)
+                self.send_header('Location', location)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            status, retry_after = self._throttled()
+            if status:
+                self.send_response(status)
+                if retry_after is not None:
+                    self.send_header('Retry-After', retry_after)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            etag = STUB_ETAG if self.path.startswith('/etag') else None
+            if etag and self.headers.get('If-None-Match') == etag:
+                with server.lock:
+                    server.not_modified += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            content_type, body = next(
+                (value for prefix, value in STUB_BODIES.items() if self.path.startswith(prefix)),
+                ('text/html', STUB_PAGE)
+            )
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except ConnectionError:
+                # Client stopped reading (size-capped download)
+                pass
+        finally:
+            with server.lock:
+                server.active -= 1
+    
+    def _redirect(self):
+        """Location of a redirect answer, or None"""
+        if self.path.startswith('/hop/'):
+            hops = int(self.path[len('/hop/'):])
+            return f'/hop/{hops - 1}' if hops > 0 else None
+        if self.path.startswith('/redirect?to='):
+            return unquote(self.path[len('/redirect?to='):])
+        return None
+    
+    def _throttled(self):
+        """(status, Retry-After) of a throttling answer, or (None, None)"""
+        server = self.server
+        if self.path.startswith('/throttle-long'):
+            return 429, '3600'
+        with server.lock:
+            if server.throttle <= 0:
+                return None, None
+            if self.path.startswith('/throttle'):
+                server.throttle -= 1
+                return 429, '0'
+            if self.path.startswith('/unavailable'):
+                server.throttle -= 1
+                return 503, None
+        return None, None
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Start the stub HTTP server on a free local port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.not_modified = 0
+    server.active = 0
+    server.max_active = 0
+    server.throttle = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
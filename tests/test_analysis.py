@@ -0,0 +1,74 @@
+"""Tests for process-pool content analysis"""
+
+from pathlib import Path
+
+import pytest
+from src.analysis import MEMORY_INDICATOR, ProcessAnalyzer
+from src.result import Code
+from src.scanner import ScamScanner
+from src.store import ScanStore
+
+
+PAGES = sorted((Path(__file__).parent / 'pages').glob('*.html'))
+
+
+@pytest.fixture(scope='module')
+def pool():
+    """One warm worker process shared by the tests"""
+    executor = ProcessAnalyzer(workers=1)
+    executor.warm_up()
+    yield executor
+    executor.close()
+
+
+class TestProcessAnalyzer:
+    """Test the ProcessAnalyzer class"""
+    
+    def test_matches_inline_analysis(self, pool):
+        """Test that worker results equal in-process analysis"""
+        scanner = ScamScanner()
+        for page in PAGES:
+            html = page.read_text(encoding='utf-8')
+            assert pool.analyze(html, 'https://example.com/') == \
+                scanner._analyze_content(html, 'https://example.com/')
+        assert pool.stats()['tasks'] == len(PAGES)
+    
+    def test_scanner_uses_executor(self, pool, stub_server):
+        """Test that ScamScanner sends content analysis to the executor"""
+        tasks = pool.stats()['tasks']
+        results = ScamScanner(analysis_executor=pool).scan_url(f"{stub_server.url}/page")
+        assert results['details']['content_analysis']['indicators'] == [
+            'Missing meta description', 'Very few external links (0)'
+        ]
+        assert pool.stats()['tasks'] == tasks + 1
+    
+    def test_memory_cap(self):
+        """Test that a page over the memory cap is skipped and the pool keeps working"""
+        executor = ProcessAnalyzer(workers=1, analyzer='soup', max_task_memory=16 * 1024 * 1024)
+        try:
+            assert executor.analyze('<div><p>act now</p></div>' * 200000, 'https://example.com/') == \
+                (0, [MEMORY_INDICATOR])
+            assert executor.stats()['memory_errors'] == 1
+    
+            score, indicators = executor.analyze('<p>act now</p>', 'https://example.com/')
+            assert 'Missing meta description' in indicators
+        finally:
+            executor.close()
+    
+    def test_memory_cap_in_scan_result(self, stub_server, tmp_path):
+        """Test that a skipped page serializes and is analyzed again on the next scan"""
+        executor = ProcessAnalyzer(workers=1, analyzer='soup', max_task_memory=1024 * 1024)
+        try:
+            store = ScanStore(str(tmp_path / 'scan_cache.sqlite3'))
+            scanner = ScamScanner(analysis_executor=executor, store=store)
+            url = f"{stub_server.url}/big"
+            for force_refresh in (True, False):
+                result = scanner.scan(url, force_refresh=force_refresh)
+                assert result.codes()[-1] == Code.ANALYSIS_MEMORY_LIMIT
+                assert result.to_dict()['indicators'][-1] == MEMORY_INDICATOR.text
+                assert 'content_reused' not in result.details
+                assert 'cache' not in result.details
+            assert executor.stats()['memory_errors'] == 2
+            assert len(scanner.content_index) == len(store) == 0
+        finally:
+            executor.close()
@@ -0,0 +1,161 @@
+"""Tests for the local API server"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import api_server
+from src.cache import ScanCache
+from src.store import ScanStore
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask test client writing scan logs and cached scans to a temporary directory"""
+    monkeypatch.setattr(api_server, 'LOG_DIR', str(tmp_path))
+    monkeypatch.setattr(api_server.scanner, 'cache', ScanCache(ttl=60))
+    monkeypatch.setattr(api_server.scanner, 'store', ScanStore(str(tmp_path / 'cache.sqlite3')))
+    api_server.app.config['TESTING'] = True
+    with api_server.app.test_client() as client:
+        yield client
+
+
+class TestBatchScan:
+    """Test the /batch-scan endpoint"""
+    
+    def test_requires_urls(self, client):
+        """Test that a missing URL list is rejected"""
+        response = client.post('/batch-scan', json={})
+        assert response.status_code == 400
+    
+    def test_results_in_request_order(self, client, stub_server):
+        """Test that JSON mode returns results in request order"""
+        urls = [f"{stub_server.url}/slow/a", "not-a-valid-url", f"{stub_server.url}/b"]
+        response = client.post('/batch-scan', json={'urls': urls})
+        data = response.get_json()
+        
+        assert data['total'] == 3
+        assert data['timed_out'] == 0
+        assert [r['url'] for r in data['results']] == urls
+    
+    def test_deadline_reports_timeouts(self, client, stub_server):
+        """Test that URLs unfinished at the deadline come back as timeouts"""
+        urls = [f"{stub_server.url}/fast", f"{stub_server.url}/slow"]
+        response = client.post('/batch-scan', json={'urls': urls, 'deadline': 0.5})
+        data = response.get_json()
+        
+        fast, slow = data['results']
+        assert fast['accessible'] is True
+        assert slow['timed_out'] is True
+        assert data['timed_out'] == 1
+    
+    def test_ndjson_streams_in_completion_order(self, client, stub_server):
+        """Test that NDJSON mode yields one result per line as scans finish"""
+        urls = [f"{stub_server.url}/slow", f"{stub_server.url}/fast"]
+        response = client.post(
+            '/batch-scan',
+            json={'urls': urls},
+            headers={'Accept': 'application/x-ndjson'}
+        )
+        
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [r['url'] for r in lines] == list(reversed(urls))
+    
+    def test_concurrent_batch_not_starved(self, monkeypatch):
+        """Test that a large batch leaves pool workers for a concurrent one"""
+        monkeypatch.setattr(api_server, 'batch_executor', ThreadPoolExecutor(max_workers=2))
+        monkeypatch.setattr(api_server.config, 'BATCH_REQUEST_MAX_WORKERS', 1)
+        monkeypatch.setattr(api_server, 'scan_for_batch',
+                            lambda url, source, force_refresh: time.sleep(0.2) or {'url': url})
+        
+        large = threading.Thread(target=lambda: list(api_server.iter_batch_results(
+            [f'https://large.example/{i}' for i in range(10)], 'api', 10)))
+        large.start()
+        time.sleep(0.05)
+        results = list(api_server.iter_batch_results(['https://small.example/'], 'api', 1))
+        large.join()
+        api_server.batch_executor.shutdown()
+        
+        assert results == [(0, {'url': 'https://small.example/'})]
+    
+    def test_deadline_times_out_unsubmitted_urls(self, monkeypatch):
+        """Test that URLs still waiting for a worker at the deadline time out in order"""
+        monkeypatch.setattr(api_server.config, 'BATCH_REQUEST_MAX_WORKERS', 1)
+        monkeypatch.setattr(api_server, 'scan_for_batch',
+                            lambda url, source, force_refresh: time.sleep(0.3) or {'url': url})
+        
+        results = list(api_server.iter_batch_results(['a', 'b', 'c'], 'api', 0.1))
+        assert [index for index, _ in results] == [0, 1, 2]
+        assert all(result['timed_out'] for _, result in results)
+    
+    def test_invalid_deadline(self, client):
+        """Test that a non-numeric deadline is rejected"""
+        response = client.post('/batch-scan', json={'urls': [], 'deadline': 'soon'})
+        assert response.status_code == 400
+
+
+class TestScanCaching:
+    """Test result caching through /scan and /stats"""
+    
+    def test_force_refresh_and_stats(self, client, stub_server):
+        """Test that repeats hit the cache unless force_refresh is set"""
+        url = f"{stub_server.url}/ad"
+        before = client.get('/stats').get_json()['cache']
+        
+        client.post('/scan', json={'url': url})
+        client.post('/scan', json={'url': url})
+        client.post('/scan', json={'url': url, 'force_refresh': True})
+        
+        after = client.get('/stats').get_json()['cache']
+        assert stub_server.requests == 2
+        assert after['hits'] - before['hits'] == 1
+        assert after['misses'] - before['misses'] == 1
+    
+    def test_stop_level(self, client, stub_server):
+        """Test that /scan passes stop_level through and rejects unknown levels"""
+        response = client.post('/scan', json={'url': f"{stub_server.url}/ad", 'stop_level': 'MEDIUM'})
+        assert response.get_json()['details']['stopped_after'] == 'url'
+        assert stub_server.requests == 0
+    
+        response = client.post('/scan', json={'url': f"{stub_server.url}/ad", 'stop_level': 'max'})
+        assert response.status_code == 400
+
+
+class TestLogs:
+    """Test the /logs and /stats endpoints"""
+    
+    def test_logs_filters(self, client, stub_server):
+        """Test that /logs filters by risk level, host and URL substring"""
+        client.post('/scan', json={'url': f"{stub_server.url}/first"})
+        client.post('/scan', json={'url': f"{stub_server.url}/second"})
+        client.post('/scan', json={'url': 'not-a-valid-url'})
+        
+        logs = client.get('/logs').get_json()['logs']
+        assert [log['url'] for log in logs][:2] == ['not-a-valid-url', f"{stub_server.url}/second"]
+        
+        data = client.get('/logs', query_string={'q': '/first'}).get_json()
+        assert [log['url'] for log in data['logs']] == [f"{stub_server.url}/first"]
+        
+        data = client.get('/logs', query_string={'host': '127.0.0.1'}).get_json()
+        assert data['total'] == 2
+        
+        stats = client.get('/stats').get_json()
+        assert stats['total_scans'] == 3
+    
+    def test_stats_window(self, client, stub_server):
+        """Test that /stats reports running totals and a day window"""
+        client.post('/scan', json={'url': f"{stub_server.url}/a"})
+        client.post('/scan', json={'url': f"{stub_server.url}/a", 'force_refresh': True})
+        
+        stats = client.get('/stats', query_string={'days': 7}).get_json()
+        assert stats['total_scans'] == 2
+        assert stats['unique_urls'] == 1
+        assert stats['unique_urls_exact'] is True
+        assert stats['window']['total_scans'] == 2
+        assert len(stats['window']['daily']) == 1
+        
+        assert client.get('/stats', query_string={'days': 0}).status_code == 400
@@ -0,0 +1,97 @@
+"""Tests for the asyncio scanning engine against a local stub HTTP server"""
+
+import asyncio
+import time
+
+import pytest
+from src.async_scanner import AsyncScamScanner, _HostLimits
+from tests.conftest import STUB_DELAY
+
+
+def run_batch(scanner, urls, concurrency):
+    """Scan URLs and return (results in completion order, elapsed seconds)"""
+    async def collect():
+        return [result async for result in scanner.scan_many(urls, concurrency=concurrency)]
+    
+    start = time.perf_counter()
+    results = asyncio.run(collect())
+    return results, time.perf_counter() - start
+
+
+class TestAsyncScamScanner:
+    """Test the AsyncScamScanner class"""
+    
+    def test_invalid_limits(self):
+        """Test that non-positive limits are rejected"""
+        with pytest.raises(ValueError):
+            AsyncScamScanner(concurrency=0)
+    
+    def test_results_match_sync_scanner(self, stub_server):
+        """Test that async results use the same heuristics as ScamScanner"""
+        scanner = AsyncScamScanner(timeout=5, concurrency=2, per_host=2)
+        url = f"{stub_server.url}/page"
+        results, _ = run_batch(scanner, [url], concurrency=2)
+        expected = scanner.scanner.scan_url(url)
+        
+        assert len(results) == 1
+        assert results[0]['accessible'] is True
+        assert results[0]['risk_score'] == expected['risk_score']
+        assert results[0]['indicators'] == expected['indicators']
+    
+    def test_near_linear_speedup(self, stub_server):
+        """Test that throughput scales with concurrency up to the limit"""
+        urls = [f"{stub_server.url}/page/{i}" for i in range(8)]
+        scanner = AsyncScamScanner(timeout=5, concurrency=8, per_host=8)
+        
+        serial, serial_time = run_batch(scanner, urls, concurrency=1)
+        parallel, parallel_time = run_batch(scanner, urls, concurrency=8)
+        
+        assert sorted(r['url'] for r in serial) == sorted(urls)
+        assert sorted(r['url'] for r in parallel) == sorted(urls)
+        assert serial_time >= len(urls) * STUB_DELAY
+        # Ideal speedup is 8x; allow generous slack for slow CI machines
+        assert serial_time / parallel_time > 4
+    
+    def test_per_host_limit(self, stub_server):
+        """Test that the per-host limit caps concurrent requests to one host"""
+        urls = [f"{stub_server.url}/page/{i}" for i in range(4)]
+        scanner = AsyncScamScanner(timeout=5, concurrency=4, per_host=1)
+        
+        results, elapsed = run_batch(scanner, urls, concurrency=4)
+        
+        assert len(results) == 4
+        assert stub_server.max_active == 1
+        assert elapsed >= len(urls) * STUB_DELAY
+    
+    def test_host_limits_dropped_when_idle(self):
+        """Test that a host's semaphore lives only while its scans wait or run"""
+        async def check():
+            limits = _HostLimits(per_host=1)
+            release = asyncio.Event()
+            
+            async def hold(host):
+                async with limits.slot(host):
+                    await release.wait()
+            
+            tasks = [asyncio.ensure_future(hold(host)) for host in ('a', 'a', 'b')]
+            await asyncio.sleep(0)
+            assert len(limits) == 2
+            release.set()
+            await asyncio.gather(*tasks)
+            assert len(limits) == 0
+            
+            task = asyncio.ensure_future(hold('c'))
+            await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            assert len(limits) == 0
+        
+        asyncio.run(check())
+    
+    def test_results_stream_in_completion_order(self, stub_server):
+        """Test that fast results are yielded before slow ones finish"""
+        scanner = AsyncScamScanner(timeout=5, concurrency=2, per_host=2)
+        urls = ["not-a-valid-url", f"{stub_server.url}/slow"]
+        results, _ = run_batch(scanner, urls, concurrency=2)
+        
+        assert [r['url'] for r in results] == urls
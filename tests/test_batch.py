@@ -0,0 +1,114 @@
+"""Tests for bulk scanning of URL lists to NDJSON"""
+
+import io
+import json
+
+from click.testing import CliRunner
+from src.batch import plan_batch, read_urls, run_batch, scanned_urls
+from src.scanner import main
+
+
+def read_results(path):
+    """Results in an NDJSON file"""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestUrlList:
+    """Test reading and planning a URL list"""
+    
+    def test_read_urls(self):
+        """Test that comments and blank lines are skipped"""
+        lines = ['# header\n', '\n', '  https://a.example/  \n', '# http://b.example\n', 'c.example\n']
+        assert list(read_urls(lines)) == ['https://a.example/', 'c.example']
+    
+    def test_sample_urls(self):
+        """Test that the sample list parses to its uncommented URLs"""
+        with open('sample_urls.txt', encoding='utf-8') as f:
+            urls = list(read_urls(f))
+        assert 'https://www.wikipedia.org' in urls
+        assert not any(url.startswith('#') for url in urls)
+    
+    def test_plan_batch(self):
+        """Test dedup on normalized URLs and skipping finished ones"""
+        urls = ['https://a.example', 'HTTPS://A.example/', 'https://b.example/?utm_source=x',
+                'https://b.example/', 'https://c.example/']
+        todo, skipped, duplicates = plan_batch(urls, done={'https://c.example/'})
+        assert todo == ['https://a.example', 'https://b.example/?utm_source=x']
+        assert (skipped, duplicates) == (1, 2)
+    
+    def test_scanned_urls_drops_partial_line(self, tmp_path):
+        """Test that a line cut off by a crash is removed and its URL rescanned"""
+        path = tmp_path / 'results.ndjson'
+        path.write_text('{"url": "https://a.example/"}\nnot json\n{"url": "https://b.exa', encoding='utf-8')
+        assert scanned_urls(str(path)) == {'https://a.example/'}
+        assert path.read_text(encoding='utf-8') == '{"url": "https://a.example/"}\nnot json\n'
+        assert scanned_urls(str(tmp_path / 'missing.ndjson')) == set()
+    
+    def test_scanned_urls_skips_errors(self, tmp_path):
+        """Test that errors and failed fetches are not treated as done"""
+        path = tmp_path / 'results.ndjson'
+        lines = [
+            {'url': 'https://a.example/', 'error': 'boom'},
+            {'url': 'https://b.example/', 'indicators': ['Failed to fetch URL: timed out']},
+            {'url': 'https://c.example/', 'indicators': ['No HTTPS encryption']},
+            {'url': 'https://d.example/', 'error': 'boom'},
+            {'url': 'https://d.example/', 'indicators': []},
+        ]
+        path.write_text(''.join(json.dumps(line) + '\n' for line in lines), encoding='utf-8')
+        assert scanned_urls(str(path)) == {'https://c.example/', 'https://d.example/'}
+
+
+class TestRunBatch:
+    """Test batch scans against the stub server"""
+    
+    def test_scan_and_resume(self, stub_server, tmp_path):
+        """Test that results are appended once per URL and a rerun skips them"""
+        output = str(tmp_path / 'results.ndjson')
+        source = f"# ads\n{stub_server.url}/a\n{stub_server.url}/b\n{stub_server.url}/a\nnot-a-url\n"
+        progress = []
+        
+        counts = run_batch(io.StringIO(source), output, timeout=5, concurrency=2,
+                           progress=lambda done, total, result: progress.append((done, total)))
+        results = read_results(output)
+        assert sorted(result['url'] for result in results) == sorted([
+            'not-a-url', f'{stub_server.url}/a', f'{stub_server.url}/b'])
+        assert counts['duplicates'] == 1 and counts['skipped'] == 0
+        assert counts['INVALID'] == 1
+        assert progress == [(1, 3), (2, 3), (3, 3)]
+        requests_before = stub_server.requests
+        
+        source += f"{stub_server.url}/c\n"
+        counts = run_batch(io.StringIO(source), output, timeout=5, concurrency=2)
+        assert counts['skipped'] == 4
+        assert [result['url'] for result in read_results(output)][3:] == [f'{stub_server.url}/c']
+        assert stub_server.requests == requests_before + 1
+    
+    def test_resume_retries_failed_fetches(self, stub_server, tmp_path):
+        """Test that a rerun scans URLs whose fetch failed again"""
+        output = str(tmp_path / 'results.ndjson')
+        # Nothing listens on port 1: the connection is refused
+        source = f"{stub_server.url}/a\nhttp://127.0.0.1:1/down\n"
+        run_batch(io.StringIO(source), output, timeout=5, concurrency=2)
+        assert stub_server.requests == 1
+        
+        counts = run_batch(io.StringIO(source), output, timeout=5, concurrency=2)
+        assert counts['skipped'] == 1
+        results = read_results(output)
+        assert [result['url'] for result in results[2:]] == ['http://127.0.0.1:1/down']
+        assert not results[2]['accessible']
+        assert stub_server.requests == 1
+    
+    def test_cli(self, stub_server, tmp_path):
+        """Test the scanner CLI's batch mode reading stdin"""
+        output = str(tmp_path / 'results.ndjson')
+        result = CliRunner().invoke(main, ['--file', '-', '--output', output, '-c', '2'],
+                                    input=f"{stub_server.url}/page\n")
+        assert result.exit_code == 0
+        assert 'Scanned 1 URLs' in result.output
+        assert read_results(output)[0]['accessible'] is True
+    
+    def test_cli_needs_one_source(self):
+        """Test that exactly one of --url and --file is required"""
+        assert CliRunner().invoke(main, []).exit_code == 2
+        assert CliRunner().invoke(main, ['--url', 'https://a.example', '--file', '-']).exit_code == 2
@@ -0,0 +1,119 @@
+"""Tests for URL normalization and the scan result cache"""
+
+import pytest
+from src.cache import ScanCache, normalize_url
+from src.scanner import ScamScanner
+
+
+class FakeClock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestNormalizeUrl:
+    """Test the normalize_url function"""
+    
+    def test_scheme_and_host_case_folded(self):
+        """Test that scheme and host are lowercased but the path is not"""
+        assert normalize_url('HTTPS://Example.COM/Path') == 'https://example.com/Path'
+    
+    def test_default_ports_dropped(self):
+        """Test that default ports are removed and others kept"""
+        assert normalize_url('http://example.com:80/') == 'http://example.com/'
+        assert normalize_url('https://example.com:443/') == 'https://example.com/'
+        assert normalize_url('https://example.com:8443/') == 'https://example.com:8443/'
+    
+    def test_tracking_params_removed(self):
+        """Test that utm_* and click IDs are removed and order is kept"""
+        url = 'https://example.com/offer?b=2&utm_source=yt&gclid=abc&a=1&UTM_Medium=x'
+        assert normalize_url(url) == 'https://example.com/offer?b=2&a=1'
+    
+    def test_fragment_and_empty_path(self):
+        """Test that fragments are dropped and an empty path becomes /"""
+        assert normalize_url('https://example.com#top') == 'https://example.com/'
+    
+    def test_equivalent_urls_share_key(self):
+        """Test that equivalent ad URLs map to the same key"""
+        assert normalize_url('https://Shop.example.com:443/?utm_campaign=1') == \
+            normalize_url('https://shop.example.com/?fbclid=xyz')
+
+
+class TestScanCache:
+    """Test the ScanCache class"""
+    
+    def test_hit_and_miss_counters(self):
+        """Test hit/miss counting"""
+        cache = ScanCache(ttl=10)
+        assert cache.get('a') is None
+        cache.set('a', {'risk_score': 1})
+        assert cache.get('a') == {'risk_score': 1}
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_returns_copies(self):
+        """Test that mutating a returned result does not alter the cache"""
+        cache = ScanCache(ttl=10)
+        cache.set('a', {'details': {}})
+        cache.get('a')['details']['x'] = 1
+        assert cache.get('a') == {'details': {}}
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL"""
+        clock = FakeClock()
+        cache = ScanCache(ttl=10, clock=clock)
+        cache.set('a', {})
+        clock.now = 9.9
+        assert cache.get('a') is not None
+        clock.now = 10
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+        assert len(cache) == 0
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = ScanCache(ttl=10, maxsize=2)
+        cache.set('a', {})
+        cache.set('b', {})
+        cache.get('a')
+        cache.set('c', {})
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.stats()['evictions'] == 1
+
+
+class TestScannerCache:
+    """Test the cache in front of ScamScanner.scan_url"""
+    
+    @pytest.fixture
+    def scanner(self):
+        """Create a scanner with a result cache"""
+        return ScamScanner(timeout=5, cache=ScanCache(ttl=60))
+    
+    def test_repeat_scan_served_from_cache(self, scanner, stub_server):
+        """Test that a repeat scan of an equivalent URL skips the fetch"""
+        first = scanner.scan_url(f"{stub_server.url}/offer?utm_source=a")
+        second = scanner.scan_url(f"{stub_server.url}/offer?utm_source=b")
+        
+        assert stub_server.requests == 1
+        assert second['url'] == f"{stub_server.url}/offer?utm_source=b"
+        assert second['details']['cache'] == 'hit'
+        assert second['risk_score'] == first['risk_score']
+    
+    def test_force_refresh(self, scanner, stub_server):
+        """Test that force_refresh rescans and refreshes the entry"""
+        scanner.scan_url(f"{stub_server.url}/offer")
+        result = scanner.scan_url(f"{stub_server.url}/offer", force_refresh=True)
+        
+        assert stub_server.requests == 2
+        assert 'cache' not in result['details']
+    
+    def test_failed_fetch_not_cached(self, scanner):
+        """Test that fetch failures are not cached"""
+        scanner.scan_url("http://127.0.0.1:9/unreachable")
+        assert len(scanner.cache) == 0
@@ -0,0 +1,120 @@
+"""Tests for batch domain scoring"""
+
+import json
+from urllib.parse import urlsplit
+
+import pytest
+from click.testing import CliRunner
+from src.domain_batch import INVALID, extract_columns, main, score_columns, score_domains, split_urls
+from src.reputation import ReputationIndex, build_index
+from src.scanner import ScamScanner
+
+# URLs urlsplit handles in unusual ways, next to ordinary ones
+EDGE_URLS = [
+    'https://www.example.com/', 'http://secure-login-verify-account.xyz/x?y=1',
+    'HTTP://Prize-Winner-2024-55.TOP/claim', 'http://192.168.1.20/promo',
+    'https://user:pw@203.0.113.7:8443/login', 'http://1.2.3.4@evil-1234-5.top/',
+    'http://a@b@c-1-2-3-4.xyz:1:2/x', 'https://example.com', 'https://example.com?q=1',
+    'https://example.com#top', 'https://host.xyz./', 'http://[::1]:8080/', 'http://[bad/',
+    'https://Ab%Cd.xyz/', 'https://xn--80ak6aa92e.com/', 'http://ünïcode-123-4-5.top/',
+    '  http://a-b-c-d.xyz/', 'ht\ttp://a-b-c-d.xyz/', 'http:example.xyz', '//host.xyz/path',
+    'not a url', '', 'a:b://c.xyz', 'h+t.t-p://x-1-2-3.xyz', 'https://x.xyz/\u00e9',
+]
+
+
+def urlsplit_parts(url):
+    """(scheme, netloc, host) as the scanner gets them, or the rejected marker"""
+    try:
+        parsed = urlsplit(url)
+    except ValueError:
+        return '', '', None
+    return parsed.scheme, parsed.netloc, parsed.hostname or ''
+
+
+def expected(scanner, urls):
+    """Scores and levels of _analyze_domain, URL by URL"""
+    scores, levels = [], []
+    for url in urls:
+        try:
+            score = scanner._analyze_domain(url)[0]
+        except ValueError:
+            scores.append(0)
+            levels.append(INVALID)
+        else:
+            scores.append(score)
+            levels.append(scanner.rules.plan.risk_level(score))
+    return scores, levels
+
+
+class TestSplitUrls:
+    """Test column-wise URL splitting"""
+    
+    def test_matches_urlsplit(self):
+        """Test that every URL is split exactly as urlsplit splits it"""
+        schemes, netlocs, hosts = split_urls(EDGE_URLS)
+        assert list(zip(schemes, netlocs, hosts)) == [urlsplit_parts(url) for url in EDGE_URLS]
+    
+    def test_empty(self):
+        """Test an empty column"""
+        assert split_urls([]) == ([], [], [])
+
+
+class TestScoreDomains:
+    """Test batch scores against _analyze_domain"""
+    
+    def test_matches_analyze_domain(self):
+        """Test scores and risk levels of edge cases and many generated hosts"""
+        scanner = ScamScanner()
+        urls = EDGE_URLS + [f'http://www.win-big-{i}-{i * 7}.{tld}/offer?id={i}'
+                            for i in range(500) for tld in ('com', 'xyz')][:600]
+        scores, levels = scanner.analyze_domains(urls)
+        assert (list(scores), levels) == expected(scanner, urls)
+        assert levels[EDGE_URLS.index('http://[bad/')] == INVALID
+    
+    def test_rules_file(self, tmp_path):
+        """Test that overridden weights and limits are applied"""
+        rules = tmp_path / 'rules.json'
+        rules.write_text(json.dumps({'weights': {'suspicious_tld': 40, 'no_https': 0},
+                                     'limits': {'domain_hyphens': 0}}))
+        scanner = ScamScanner(rules_file=str(rules))
+        scores, levels = scanner.analyze_domains(EDGE_URLS)
+        assert (list(scores), levels) == expected(scanner, EDGE_URLS)
+    
+    def test_reputation(self, tmp_path):
+        """Test that known scam hosts add their weight and known good ones only the scheme's"""
+        path = str(tmp_path / 'reputation.idx')
+        build_index(path, scam=['secure-login-verify-account.xyz'], good=['prize-winner-2024-55.top'])
+        index = ReputationIndex(path)
+        scanner = ScamScanner(reputation=index)
+        scores, levels = scanner.analyze_domains(EDGE_URLS)
+        assert (list(scores), levels) == expected(scanner, EDGE_URLS)
+        assert scores[2] == scanner.rules.plan.weights['no_https']
+        index.close()
+    
+    def test_array_and_numpy_agree(self):
+        """Test that the NumPy dot product gives the array.array scores"""
+        scanner = ScamScanner()
+        plan = scanner.rules.plan
+        columns = extract_columns(EDGE_URLS, plan)
+        scores = score_columns(columns, plan, use_numpy=False)
+        pytest.importorskip('numpy')
+        assert score_columns(columns, plan, use_numpy=True) == scores
+    
+    def test_iterable(self):
+        """Test that any iterable of URLs is accepted, including an empty one"""
+        plan = ScamScanner().rules.plan
+        scores, levels = score_domains(iter(EDGE_URLS[:3]), plan)
+        assert len(scores) == len(levels) == 3
+        assert score_domains([], plan) == (score_columns(extract_columns([], plan), plan), [])
+
+
+class TestMain:
+    """Test the command line"""
+    
+    def test_tsv(self):
+        """Test that scores, levels and URLs are written as TSV, skipping comments"""
+        result = CliRunner().invoke(main, ['--file', '-'],
+                                    input='# ad log\nhttps://www.example.com/\nhttp://[bad/\n')
+        assert result.exit_code == 0
+        assert result.stdout.splitlines() == ['0\tMINIMAL\thttps://www.example.com/',
+                                              f'0\t{INVALID}\thttp://[bad/']
@@ -0,0 +1,114 @@
+"""Tests for bounded, streamed response reading"""
+
+import io
+
+import requests
+
+from src.fetch import is_binary, read_body
+from src.scanner import ScamScanner
+
+
+def make_response(body, content_type='text/html; charset=utf-8'):
+    """A streamed requests.Response over an in-memory body"""
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    if content_type is not None:
+        response.headers['Content-Type'] = content_type
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class TestReadBody:
+    """Test read_body()"""
+    
+    def test_small_body_read_whole(self):
+        """Test that a body under the budget is read and decoded in full"""
+        body = read_body(make_response('<p>héllo</p>'.encode('utf-8')), max_bytes=1024)
+        assert body.text == '<p>héllo</p>'
+        assert body.content_type == 'text/html'
+        assert not body.truncated
+        assert not body.binary
+    
+    def test_truncates_at_budget(self):
+        """Test that reading stops at max_bytes and the prefix is decoded"""
+        data = b'<p>' + b'x' * 10000
+        body = read_body(make_response(data), max_bytes=100, chunk_size=32)
+        assert body.truncated
+        assert body.content == data[:100]
+        assert body.text == data[:100].decode()
+    
+    def test_split_multibyte_characters(self):
+        """Test that characters split across chunks and the budget decode cleanly"""
+        data = 'é€😀'.encode('utf-8') * 50
+        body = read_body(make_response(data), chunk_size=3)
+        assert body.text == 'é€😀' * 50
+    
+        body = read_body(make_response(data), max_bytes=4, chunk_size=3)
+        assert body.truncated
+        assert body.text == 'é'
+    
+    def test_charset_from_headers_and_detection(self):
+        """Test the declared charset and detection when there is none"""
+        data = 'prix très bas, dépêchez-vous'.encode('latin-1')
+        assert read_body(make_response(data, 'text/html; charset=iso-8859-1')).text == \
+            'prix très bas, dépêchez-vous'
+        assert read_body(make_response(data, 'application/xhtml+xml')).text == \
+            data.decode(requests.compat.chardet.detect(data)['encoding'])
+    
+    def test_binary_not_decoded(self):
+        """Test that binary bodies are identified from the first chunk and not decoded"""
+        png = b'\x89PNG\r\n\x1a\n' + bytes(100000)
+        body = read_body(make_response(png, 'image/png'), chunk_size=1024)
+        assert body.binary
+        assert body.text is None
+        assert body.content == png[:1024]
+    
+    def test_is_binary(self):
+        """Test content type and magic number classification"""
+        assert is_binary('image/png', b'')
+        assert is_binary('application/zip', b'')
+        assert is_binary('application/octet-stream', b'PK\x03\x04')
+        assert is_binary('application/octet-stream', b'abc\x00def')
+        assert is_binary('', b'\x1f\x8b\x08')
+        assert not is_binary('text/html', b'<html>')
+        assert not is_binary('application/octet-stream', b'<html>')
+        assert not is_binary('', b'<html>')
+        assert not is_binary('image/svg+xml', b'<svg>')
+    
+    def test_declared_html_with_signature_bytes(self):
+        """Test that a text/html page starting like a binary format is still analyzed"""
+        for start in (b'MZ', b'BM', b'ID3', b'RIFF', b'OggS', b'BMW deals '):
+            assert not is_binary('text/html', start + b'<html>')
+            html = start + b'<html><body><p>Act now! You have won!</p></body></html>'
+            body = read_body(make_response(html, 'text/html; charset=utf-8'))
+            assert not body.binary
+            assert 'You have won' in body.text
+            assert ScamScanner()._analyze_content(body.text, 'https://example.com/')[0] > 0
+        assert is_binary('application/octet-stream', b'MZ\x90\x00')
+
+
+class TestStreamedScan:
+    """Test size-capped and binary downloads in ScamScanner"""
+    
+    def test_large_page_truncated(self, stub_server):
+        """Test that a page over the budget is flagged and its prefix analyzed"""
+        scanner = ScamScanner(max_bytes=64 * 1024)
+        results = scanner.scan_url(f"{stub_server.url}/big")
+        assert results['details']['truncated'] is True
+        assert 'Page larger than 64 KB (only the start was analyzed)' in results['indicators']
+        assert any(indicator.startswith('Found 1 scam keywords') for indicator in results['indicators'])
+    
+    def test_small_page_not_truncated(self, stub_server):
+        """Test that a page under the budget is not flagged"""
+        results = ScamScanner().scan_url(f"{stub_server.url}/page")
+        assert 'truncated' not in results['details']
+        assert results['details']['content_type'] == 'text/html'
+    
+    def test_binary_responses_skip_analysis(self, stub_server):
+        """Test that images and archives are not analyzed as text"""
+        for path in ('/image', '/download'):
+            results = ScamScanner().scan_url(f"{stub_server.url}{path}")
+            assert results['accessible']
+            assert results['details']['binary'] is True
+            assert results['details']['content_analysis'] == {'score': 0, 'indicators': []}
@@ -0,0 +1,131 @@
+"""Tests for page fingerprints, content dedup and campaign clusters"""
+
+import os
+
+import pytest
+from src.fingerprint import BANDS, MIN_SHINGLES, ContentIndex, hamming, simhash
+from src.scanner import ScamScanner
+
+PAGES = os.path.join(os.path.dirname(__file__), 'pages')
+
+
+def page(name):
+    with open(os.path.join(PAGES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class TestSimhash:
+    """Test the SimHash fingerprint"""
+    
+    def test_ignores_numbers_case_and_markup(self):
+        """Test that tracking IDs, case and whitespace do not change the fingerprint"""
+        a = '<p class="x">Claim your PRIZE now, order 1234</p>'
+        b = '<p class="x" data-id="99">\n  claim your prize NOW, order 98765</p>'
+        assert simhash(a) == simhash(b)
+    
+    def test_near_identical_pages_are_close(self):
+        """Test that a page with a swapped brand name stays within a few bits"""
+        html = page('scam_offer.html')
+        mutated = html.replace('<title>', '<title>MegaWin ', 1)
+        assert hamming(simhash(html), simhash(mutated)) <= 3
+        assert hamming(simhash(html), simhash(page('legit_article.html'))) > 10
+    
+    def test_too_few_shingles(self):
+        """Test that pages with too little text have no fingerprint"""
+        assert simhash('') is None
+        assert simhash('<br/> 123 !!! <img src="a.png">') is None
+        assert simhash('<h1>404 Not Found</h1><p>The page does not exist.</p>') is None
+        assert simhash(' '.join(f'word{chr(97 + i)}' for i in range(MIN_SHINGLES + 2))) is not None
+
+
+class TestContentIndex:
+    """Test the content analysis map and clustering"""
+    
+    def test_exact_hit(self):
+        """Test that an added body is found with its analysis and cluster"""
+        index = ContentIndex()
+        cluster = index.add('d1', 0xABCD, (20, ['Scam keyword']))
+        assert cluster == '000000000000abcd'
+        assert index.get('d1') == ((20, ['Scam keyword']), cluster)
+        assert index.get('d2') is None
+        assert (index.hits, index.misses) == (1, 1)
+    
+    def test_rules_version(self):
+        """Test that an analysis made under other rules is not reused, but the cluster is kept"""
+        index = ContentIndex()
+        cluster = index.add('d1', 0xABCD, (20, []), version=1)
+        assert index.get('d1', version=2) is None
+        assert index.add('d1', 0xABCD, (25, []), version=2) == cluster
+        assert index.get('d1', version=2) == ((25, []), cluster)
+        assert len(index) == 1
+    
+    def test_near_duplicates_share_cluster(self):
+        """Test that fingerprints within the distance join the existing cluster"""
+        index = ContentIndex(distance=3)
+        first = index.add('d1', 0xF0F0_0000_0000_0000, (0, []))
+        assert index.add('d2', 0xF0F0_0000_0000_0007, (0, [])) == first
+        assert index.add('d3', 0x0F0F_0000_0000_0000, (0, [])) != first
+        assert index.stats()['largest_clusters'][first] == {'pages': 2, 'scans': 2}
+    
+    def test_eviction(self):
+        """Test that evicted bodies leave no band entries or empty clusters behind"""
+        index = ContentIndex(maxsize=2)
+        index.add('d1', 0, (0, []))
+        index.add('d2', 0xFFFF_FFFF_0000_0000, (0, []))
+        index.add('d3', 0x0000_0000_FFFF_FFFF, (0, []))
+        assert index.get('d1') is None
+        assert index.evictions == 1
+        assert index.stats()['clusters'] == 2
+        assert len(index._bands) <= 2 * BANDS
+    
+    def test_without_fingerprint(self):
+        """Test that a page without a fingerprint is reused exactly but never clustered"""
+        index = ContentIndex(maxsize=2)
+        index.add('d1', 0, (0, []))
+        assert index.add('d2', None, (5, [])) is None
+        assert index.get('d2') == ((5, []), None)
+        assert index.add('d2', None, (5, []), version=1) is None
+        assert index.stats()['clusters'] == 1
+        assert all('d2' not in members for members in index._bands.values())
+    
+        index.add('d3', None, (0, []))
+        index.add('d4', None, (0, []))
+        assert len(index) == 2
+        assert index.stats()['clusters'] == 0
+        assert not index._bands
+    
+    def test_invalid_distance(self):
+        """Test that distances the band lookup cannot find are rejected"""
+        with pytest.raises(ValueError):
+            ContentIndex(distance=BANDS)
+
+
+class TestScannerDedup:
+    """Test content dedup in scans"""
+    
+    def test_same_body_analyzed_once(self, stub_server, monkeypatch):
+        """Test that the same body on another URL reuses the analysis and cluster"""
+        scanner = ScamScanner(timeout=5, early_exit=False)
+        calls = []
+        analyze = scanner.analyze_content
+        monkeypatch.setattr(scanner, 'analyze_content',
+                            lambda html, url: calls.append(url) or analyze(html, url))
+        
+        first = scanner.scan_url(f'{stub_server.url}/scam')
+        second = scanner.scan_url(f'{stub_server.url}/scam-copy')
+        assert len(calls) == 1
+        assert second['details']['content_reused'] is True
+        assert 'content_reused' not in first['details']
+        assert first['details']['campaign_id'] == second['details']['campaign_id']
+        assert first['details']['content_analysis'] == second['details']['content_analysis']
+        assert first['risk_score'] == second['risk_score']
+    
+    def test_different_bodies(self, stub_server):
+        """Test that a page too short to fingerprint is kept for reuse but not clustered"""
+        scanner = ScamScanner(timeout=5, early_exit=False)
+        page_result = scanner.scan_url(f'{stub_server.url}/page')
+        scam_result = scanner.scan_url(f'{stub_server.url}/scam')
+        assert 'campaign_id' not in page_result['details']
+        assert 'campaign_id' in scam_result['details']
+        assert len(scanner.content_index) == 2
+        assert scanner.content_index.stats()['clusters'] == 1
@@ -0,0 +1,96 @@
+"""Tests for single-pass page feature extraction"""
+
+import random
+from pathlib import Path
+
+import pytest
+from src.html_features import extract_features, soup_features
+from src.scanner import ScamScanner
+
+
+PAGES = sorted((Path(__file__).parent / 'pages').glob('*.html'))
+
+FUZZ_TAGS = ['p', 'div', 'a', 'b', 'title', 'script', 'style', 'template', 'rt', 'rp',
+             'ruby', 'pre', 'textarea', 'form', 'input', 'meta', 'html', 'head', 'body',
+             'table', 'tr', 'td', 'li', 'span', 'br', 'svg', 'select', 'noscript']
+FUZZ_ATTRS = ['href="x"', 'href=""', 'href', 'name="description"', 'name="Description"',
+              'type="password"', 'type="PASSWORD"', 'action=""', 'action="#"', 'action="/go"']
+FUZZ_TEXT = ['act now', ' ', '\n', '  \n ', 'Free trial!!', 'you have won', '&amp;',
+             '&nbsp;', '<', 'é', '\t', 'x', '\r\n', '<!-- act now -->', '<!DOCTYPE html>']
+
+
+def random_markup(rng):
+    """Tag soup mixing the constructs the extractors treat specially"""
+    parts = []
+    for _ in range(rng.randint(0, 60)):
+        roll = rng.random()
+        if roll < 0.35:
+            attrs = ' '.join(rng.sample(FUZZ_ATTRS, rng.randint(0, 2)))
+            parts.append(f'<{rng.choice(FUZZ_TAGS)} {attrs}>')
+        elif roll < 0.55:
+            parts.append(f'</{rng.choice(FUZZ_TAGS)}>')
+        else:
+            parts.append(rng.choice(FUZZ_TEXT))
+    return ''.join(parts)
+
+
+class TestExtractFeatures:
+    """Test the streaming extractor against the BeautifulSoup reference"""
+    
+    @pytest.mark.parametrize('page', PAGES, ids=lambda page: page.name)
+    def test_golden_pages_match_soup(self, page):
+        """Test that features and indicators match the tree-based analysis"""
+        html = page.read_text(encoding='utf-8')
+        assert extract_features(html) == soup_features(html)
+    
+        stream = ScamScanner(analyzer='stream')._analyze_content(html, 'https://example.com/')
+        soup = ScamScanner(analyzer='soup')._analyze_content(html, 'https://example.com/')
+        assert stream == soup
+    
+    def test_random_markup_matches_soup(self):
+        """Test that malformed tag soup gives the same features"""
+        rng = random.Random(1234)
+        for _ in range(500):
+            html = random_markup(rng)
+            assert extract_features(html) == soup_features(html), html
+    
+    def test_hidden_text_excluded(self):
+        """Test that script, style and template text is not page text"""
+        page = extract_features(
+            '<style>act now</style><script>act now</script>'
+            '<template><p>act now</p></template><p>visible</p><!-- act now -->'
+        )
+        assert page.text == 'visible'
+    
+    def test_whitespace_between_tags(self):
+        """Test that whitespace-only strings collapse like BeautifulSoup's"""
+        page = extract_features('<p><b>risk</b>   <b>free</b></p><p>a</p>\n  \n<p>b</p>'
+                                '<pre><b>x</b>   <b>y</b></pre>')
+        assert page.text == 'risk freea\nbx   y'
+    
+    def test_forms_links_and_meta(self):
+        """Test form actions, password fields, links and meta description"""
+        page = extract_features(
+            '<meta name="description" content=""><a href="">1</a><a>2</a>'
+            '<form><input type="password"></form><form action="/go"></form>'
+        )
+        assert page.has_meta_description
+        assert page.link_count == 1
+        assert page.form_actions == [None, '/go']
+        assert page.password_fields == 1
+    
+    def test_title(self):
+        """Test the title string, including titles without a single string"""
+        assert extract_features('<title>Prize</title><title>x</title>').title == 'Prize'
+        assert extract_features('<title></title>').title is None
+        assert extract_features('<p>no title</p>').title is None
+    
+    def test_empty_title_does_not_fail_analysis(self):
+        """Test that an empty title no longer breaks content analysis"""
+        score, indicators = ScamScanner()._analyze_content('<title></title>', 'https://a.com/')
+        assert 'Missing meta description' in indicators
+    
+    def test_unknown_analyzer(self):
+        """Test that an unknown analyzer name is rejected"""
+        with pytest.raises(ValueError):
+            ScamScanner(analyzer='regex')
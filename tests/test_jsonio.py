@@ -0,0 +1,92 @@
+"""Tests for the pluggable JSON backends"""
+
+import json
+
+import pytest
+
+from src.jsonio import BACKENDS, available_backends, json_backend
+from src.logstore import LogStore, tail
+from src.logwriter import LogWriter
+from src.stats import ScanStats
+
+ENTRY = {
+    'timestamp': '2026-03-10T12:00:00',
+    'url': 'https://例え.example/ad?x=1',
+    'risk_level': 'HIGH',
+    'risk_score': 55,
+    'indicators': ['Suspicious TLD: .xyz', 'No HTTPS encryption'],
+    'source': 'api',
+    'metadata': {'nested': [1, 2.5, None, True]},
+}
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    return json_backend(request.param)
+
+
+class TestBackends:
+    """Test every installed backend against the json module"""
+    
+    def test_round_trip(self, backend):
+        """Test that dumps gives UTF-8 JSON the json module reads back"""
+        data = backend.dumps(ENTRY)
+        assert isinstance(data, bytes)
+        assert json.loads(data) == ENTRY
+        assert backend.loads(data) == ENTRY
+        assert backend.loads(json.dumps(ENTRY)) == ENTRY
+    
+    def test_non_string_keys(self, backend):
+        """Test that integer keys are written as strings, like the json module does"""
+        assert backend.loads(backend.dumps({1: 'a'})) == {'1': 'a'}
+    
+    def test_fields(self, backend):
+        """Test that fields() returns only the requested fields, None when missing"""
+        decode = backend.fields(('url', 'risk_level', 'missing'))
+        assert decode(json.dumps(ENTRY).encode()) == {
+            'url': ENTRY['url'], 'risk_level': 'HIGH', 'missing': None}
+    
+    def test_invalid_input(self, backend):
+        """Test that bad JSON and non-objects raise ValueError"""
+        with pytest.raises(ValueError):
+            backend.loads(b'{"url": ')
+        decode = backend.fields(('url',))
+        with pytest.raises(ValueError):
+            decode(b'[1, 2]')
+        with pytest.raises(ValueError):
+            decode(b'not json')
+
+
+class TestSelection:
+    """Test choosing a backend"""
+    
+    def test_auto_prefers_fast_backends(self):
+        """Test that 'auto' picks the first installed backend"""
+        assert json_backend().name == available_backends()[0]
+        assert available_backends()[-1] == 'json'
+        assert set(available_backends()) <= set(BACKENDS)
+    
+    def test_unknown_backend(self):
+        """Test that unknown names are rejected"""
+        with pytest.raises(ValueError):
+            json_backend('yaml')
+
+
+class TestLogs:
+    """Test scan logs written and read with each backend"""
+    
+    def test_log_round_trip(self, backend, tmp_path):
+        """Test that the writer, index, tail and stats agree on written lines"""
+        writer = LogWriter(str(tmp_path), serializer=backend)
+        writer.write(ENTRY)
+        writer.write(dict(ENTRY, risk_level='LOW', url='https://b.example/'))
+        writer.close()
+        log_file = str(tmp_path / 'scans.jsonl')
+    
+        assert [log['url'] for log in tail(log_file, risk_level='HIGH', serializer=backend)] == [ENTRY['url']]
+        store = LogStore(str(tmp_path / 'index.sqlite3'), log_file, serializer=backend)
+        assert store.sync() == 2
+        assert store.query(host='b.example')[0]['risk_level'] == 'LOW'
+        stats = ScanStats(serializer=backend)
+        assert stats.sync(log_file) == 2
+        assert stats.summary()['risk_levels'] == {'HIGH': 1, 'LOW': 1}
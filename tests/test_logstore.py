@@ -0,0 +1,213 @@
+"""Tests for the indexed scan log store"""
+
+import json
+import threading
+
+import pytest
+from src.logstore import LogStore, iter_lines_reversed, tail, url_host
+
+
+def make_entry(i, risk_level='LOW', source='api', url=None):
+    """A scan log entry like api_server.log_scan writes"""
+    return {
+        'timestamp': f'2026-01-01T00:00:{i:02d}',
+        'url': url or f'https://site{i}.example.com/offer',
+        'risk_level': risk_level,
+        'risk_score': i,
+        'indicators': [],
+        'source': source,
+    }
+
+
+def append(log_file, *entries):
+    with open(log_file, 'a', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Path of a temporary scans.jsonl"""
+    return str(tmp_path / 'scans.jsonl')
+
+
+@pytest.fixture
+def store(tmp_path, log_file):
+    """LogStore indexing the temporary log"""
+    return LogStore(str(tmp_path / 'scans_index.sqlite3'), log_file)
+
+
+class TestLogStore:
+    """Test the LogStore class"""
+    
+    def test_url_host(self):
+        """Test host extraction from logged URLs"""
+        assert url_host('https://Example.COM:8080/path') == 'example.com'
+        assert url_host('not a url') == ''
+        assert url_host(None) == ''
+    
+    def test_sync_missing_log(self, store):
+        """Test that syncing a log that does not exist imports nothing"""
+        assert store.sync() == 0
+        assert store.count() == 0
+    
+    def test_sync_is_incremental(self, store, log_file):
+        """Test that only lines appended since the last sync are imported"""
+        append(log_file, make_entry(0), make_entry(1))
+        assert store.sync() == 2
+        assert store.sync() == 0
+    
+        append(log_file, make_entry(2))
+        assert store.sync() == 1
+        assert store.count() == 3
+    
+    def test_partial_last_line_waits(self, store, log_file):
+        """Test that a line still being written is picked up by the next sync"""
+        append(log_file, make_entry(0))
+        line = json.dumps(make_entry(1))
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(line[:10])
+        assert store.sync() == 1
+    
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(line[10:] + '\n')
+        assert store.sync() == 1
+        assert store.recent(1)[0]['risk_score'] == 1
+    
+    def test_skips_malformed_lines(self, store, log_file):
+        """Test that blank and malformed lines are ignored"""
+        append(log_file, make_entry(0))
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write('\n{broken\n[1, 2]\n')
+        append(log_file, make_entry(1))
+        assert store.sync() == 2
+    
+    def test_rebuilds_after_rotation(self, store, log_file):
+        """Test that a log that shrank is re-imported from the start"""
+        append(log_file, make_entry(0), make_entry(1), make_entry(2))
+        store.sync()
+    
+        with open(log_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(make_entry(9)) + '\n')
+        store.sync()
+        assert [log['risk_score'] for log in store.query()] == [9]
+    
+    def test_survives_reopen(self, tmp_path, log_file):
+        """Test that a reopened index resumes from the stored offset"""
+        path = str(tmp_path / 'scans_index.sqlite3')
+        append(log_file, make_entry(0))
+        LogStore(path, log_file).sync()
+        append(log_file, make_entry(1))
+    
+        store = LogStore(path, log_file)
+        assert store.sync() == 1
+        assert store.count() == 2
+    
+    def test_recent_newest_first(self, store, log_file):
+        """Test that recent() returns the latest entries first"""
+        append(log_file, *[make_entry(i) for i in range(5)])
+        store.sync()
+        assert [log['risk_score'] for log in store.recent(3)] == [4, 3, 2]
+    
+    def test_query_filters(self, store, log_file):
+        """Test filtering by risk level, source and host"""
+        append(log_file,
+               make_entry(0, 'HIGH', 'api', 'https://bad.xyz/a'),
+               make_entry(1, 'LOW', 'cli', 'https://good.com/'),
+               make_entry(2, 'HIGH', 'cli', 'https://BAD.xyz/b'),
+               make_entry(3, 'HIGH', 'batch_api', 'https://other.xyz/'))
+        store.sync()
+    
+        assert [log['risk_score'] for log in store.query(risk_level='HIGH')] == [3, 2, 0]
+        assert [log['risk_score'] for log in store.query(risk_level='HIGH', source='cli')] == [2]
+        assert [log['risk_score'] for log in store.query(host='Bad.XYZ')] == [2, 0]
+        assert [log['risk_score'] for log in store.query(risk_level='HIGH', limit=1)] == [3]
+        assert [log['risk_score'] for log in store.query(risk_level='HIGH', newest_first=False)] == [0, 2, 3]
+    
+    def test_url_substring_is_case_sensitive(self, store, log_file):
+        """Test that URL lookups match like the old 'in' check did"""
+        append(log_file,
+               make_entry(0, url='https://a.com/FreeGift'),
+               make_entry(1, url='https://b.com/freegift'),
+               make_entry(2, url='https://c.com/x'))
+        store.sync()
+    
+        assert [log['risk_score'] for log in store.find('freegift')] == [1]
+        assert [log['risk_score'] for log in store.find('.com/')] == [0, 1, 2]
+        assert [log['risk_score'] for log in store.find('/x')] == [2]
+        assert store.find('nothing') == []
+    
+    def test_summary(self, store, log_file):
+        """Test totals by risk level and source"""
+        missing = make_entry(3)
+        del missing['risk_level'], missing['source']
+        append(log_file,
+               make_entry(0, 'HIGH', 'api', 'https://a.com/'),
+               make_entry(1, 'HIGH', 'cli', 'https://a.com/'),
+               make_entry(2, 'LOW', 'api', 'https://b.com/'),
+               missing)
+        store.sync()
+    
+        summary = store.summary()
+        assert summary['total_scans'] == 4
+        assert summary['risk_levels'] == {'HIGH': 2, 'LOW': 1, 'UNKNOWN': 1}
+        assert summary['sources'] == {'api': 2, 'cli': 1, 'unknown': 1}
+        assert summary['unique_urls'] == 3
+
+
+class TestTail:
+    """Test reading the most recent entries backwards"""
+    
+    def test_newest_first(self, log_file):
+        """Test that tail returns the last entries, newest first"""
+        append(log_file, *[make_entry(i) for i in range(10)])
+        assert [log['risk_score'] for log in tail(log_file, 3)] == [9, 8, 7]
+        assert len(tail(log_file, 100)) == 10
+        assert tail(log_file, 0) == []
+    
+    def test_missing_log(self, tmp_path):
+        """Test that a missing log has no entries"""
+        assert tail(str(tmp_path / 'missing.jsonl')) == []
+    
+    @pytest.mark.parametrize('block_size', [1, 7, 64, 65536])
+    def test_block_boundaries(self, log_file, block_size):
+        """Test that lines split across blocks are reassembled"""
+        append(log_file, *[make_entry(i) for i in range(20)])
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write('\n\n{broken\n')
+        append(log_file, make_entry(20))
+        
+        logs = tail(log_file, 100, block_size=block_size)
+        assert [log['risk_score'] for log in logs] == list(range(20, -1, -1))
+    
+    def test_risk_level_filter(self, log_file):
+        """Test that the risk level filter is applied while reading"""
+        append(log_file, *[make_entry(i, 'HIGH' if i % 3 == 0 else 'LOW') for i in range(10)])
+        logs = tail(log_file, 2, risk_level='HIGH')
+        assert [log['risk_score'] for log in logs] == [9, 6]
+        assert tail(log_file, 10, risk_level='MEDIUM') == []
+    
+    def test_skips_partial_last_line(self, log_file):
+        """Test that a line still being appended is not returned"""
+        append(log_file, make_entry(0), make_entry(1))
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(make_entry(2))[:15])
+        assert [log['risk_score'] for log in tail(log_file, 5)] == [1, 0]
+        assert list(iter_lines_reversed(log_file, 4))[-1] == json.dumps(make_entry(0)).encode()
+    
+    def test_concurrent_appends(self, log_file):
+        """Test that tailing while another thread appends only sees whole entries"""
+        append(log_file, *[make_entry(i % 60) for i in range(200)])
+        done = threading.Event()
+        
+        def writer():
+            for i in range(2000):
+                append(log_file, make_entry(i % 60))
+            done.set()
+        
+        thread = threading.Thread(target=writer)
+        thread.start()
+        while not done.is_set():
+            for log in tail(log_file, 50, block_size=256):
+                assert log['url'].endswith('/offer')
+        thread.join()
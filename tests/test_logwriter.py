@@ -0,0 +1,172 @@
+"""Tests for the background scan log writer"""
+
+import json
+import threading
+
+from src.jsonio import json_backend
+from src.logwriter import _STOP, LogWriter
+
+
+def read_lines(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestLogWriter:
+    """Test the LogWriter class"""
+    
+    def test_writes_main_and_daily_log(self, tmp_path):
+        """Test that entries land in scans.jsonl and the daily log"""
+        writer = LogWriter(str(tmp_path), day=lambda: '2026-03-10')
+        writer.write({'url': 'https://a.com/'})
+        writer.write({'url': 'https://b.com/'})
+        writer.close()
+    
+        expected = [{'url': 'https://a.com/'}, {'url': 'https://b.com/'}]
+        assert read_lines(tmp_path / 'scans.jsonl') == expected
+        assert read_lines(tmp_path / 'scans_2026-03-10.jsonl') == expected
+        assert writer.stats()['written'] == 2
+    
+    def test_flush_makes_entries_visible(self, tmp_path):
+        """Test that flush() waits for queued entries to be written"""
+        writer = LogWriter(str(tmp_path), batch_size=1000, flush_interval=60)
+        for i in range(5):
+            writer.write({'i': i})
+        writer.flush()
+    
+        assert len(read_lines(tmp_path / 'scans.jsonl')) == 5
+        assert writer.stats()['queue_depth'] == 0
+        writer.close()
+    
+    def test_flushes_on_interval(self, tmp_path):
+        """Test that pending entries are written after the flush interval"""
+        written = threading.Event()
+        writer = LogWriter(str(tmp_path), batch_size=1000, flush_interval=0.05,
+                           on_write=lambda entry, offset: written.set())
+        writer.write({'i': 0})
+        assert written.wait(5)
+        assert writer.stats()['batches'] == 1
+        writer.close()
+    
+    def test_batches_by_size(self, tmp_path):
+        """Test that full batches are written together"""
+        writer = LogWriter(str(tmp_path), batch_size=10, flush_interval=60, start=False)
+        for i in range(25):
+            writer.write({'i': i})
+        writer.close()
+    
+        assert writer.stats()['batches'] == 3
+        assert [entry['i'] for entry in read_lines(tmp_path / 'scans.jsonl')] == list(range(25))
+    
+    def test_rolls_daily_file(self, tmp_path):
+        """Test that the daily file follows the date"""
+        days = iter(['2026-03-10', '2026-03-11'])
+        writer = LogWriter(str(tmp_path), day=lambda: next(days), start=False)
+        writer.write({'i': 0})
+        writer.start()
+        writer.flush()
+        writer.write({'i': 1})
+        writer.close()
+    
+        assert read_lines(tmp_path / 'scans_2026-03-10.jsonl') == [{'i': 0}]
+        assert read_lines(tmp_path / 'scans_2026-03-11.jsonl') == [{'i': 1}]
+        assert len(read_lines(tmp_path / 'scans.jsonl')) == 2
+    
+    def test_daily_file_by_entry_timestamp(self, tmp_path):
+        """Test that each entry goes to the daily file of its own timestamp"""
+        writer = LogWriter(str(tmp_path), day=lambda: '2026-03-12', start=False)
+        entries = [{'timestamp': '2026-03-10T23:59:59.9'}, {'timestamp': '2026-03-11T00:00:00.1'},
+                   {'timestamp': '2026-03-10T23:59:59.95'}, {'timestamp': '../x'}, {'i': 0}]
+        for entry in entries:
+            writer.write(entry)
+        writer.close()
+    
+        assert writer.stats()['batches'] == 1
+        assert read_lines(tmp_path / 'scans_2026-03-10.jsonl') == [entries[0], entries[2]]
+        assert read_lines(tmp_path / 'scans_2026-03-11.jsonl') == [entries[1]]
+        assert read_lines(tmp_path / 'scans_2026-03-12.jsonl') == entries[3:]
+        assert read_lines(tmp_path / 'scans.jsonl') == entries
+    
+    def test_drops_when_queue_full(self, tmp_path):
+        """Test that a full queue drops entries instead of blocking"""
+        writer = LogWriter(str(tmp_path), max_queue=2, start=False)
+        assert writer.write({'i': 0})
+        assert writer.write({'i': 1})
+        assert not writer.write({'i': 2})
+        assert writer.stats()['queue_depth'] == 2
+        assert writer.stats()['dropped'] == 1
+        writer.close()
+    
+        assert len(read_lines(tmp_path / 'scans.jsonl')) == 2
+        assert not writer.write({'i': 3})
+    
+    def test_on_write_offsets(self, tmp_path):
+        """Test that the callback gets the log offset just past each entry"""
+        seen = []
+        writer = LogWriter(str(tmp_path), on_write=lambda entry, offset: seen.append(offset))
+        writer.write({'url': 'https://a.com/'})
+        writer.write({'url': 'https://b.com/'})
+        writer.close()
+    
+        with open(tmp_path / 'scans.jsonl', 'rb') as f:
+            data = f.read()
+        assert seen == [data.index(b'\n') + 1, len(data)]
+    
+    def test_bad_entry_dropped_alone(self, tmp_path):
+        """Test that an entry that cannot be serialized does not drop the rest of its batch"""
+        seen = []
+        writer = LogWriter(str(tmp_path), start=False, serializer=json_backend('json'),
+                           on_write=lambda entry, offset: seen.append((entry['i'], offset)))
+        for entry in ({'i': 0}, {'i': 1, 'bad': object()}, {'i': 2}):
+            writer.write(entry)
+        writer.close()
+    
+        assert read_lines(tmp_path / 'scans.jsonl') == [{'i': 0}, {'i': 2}]
+        with open(tmp_path / 'scans.jsonl', 'rb') as f:
+            data = f.read()
+        assert seen == [(0, data.index(b'\n') + 1), (2, len(data))]
+        stats = writer.stats()
+        assert (stats['written'], stats['dropped'], stats['errors']) == (2, 1, 1)
+    
+    def test_flush_racing_close(self, tmp_path):
+        """Test that flush() returns when close() runs at the same time"""
+        for _ in range(50):
+            writer = LogWriter(str(tmp_path))
+            writer.write({'i': 0})
+            flusher = threading.Thread(target=writer.flush)
+            flusher.start()
+            writer.close()
+            flusher.join(5)
+            assert not flusher.is_alive()
+    
+    def test_entries_behind_stop_written(self, tmp_path):
+        """Test that entries queued behind the stop marker are still written"""
+        writer = LogWriter(str(tmp_path), start=False)
+        writer.write({'i': 0})
+        writer._queue.put(_STOP)
+        writer.write({'i': 1})
+        writer.start()
+        writer._thread.join(5)
+    
+        assert read_lines(tmp_path / 'scans.jsonl') == [{'i': 0}, {'i': 1}]
+        assert writer._queue.unfinished_tasks == 0
+    
+    def test_concurrent_writes_do_not_interleave(self, tmp_path):
+        """Test that entries from many threads are written as whole lines"""
+        writer = LogWriter(str(tmp_path), batch_size=7)
+    
+        def produce(n):
+            for i in range(200):
+                writer.write({'thread': n, 'i': i, 'padding': 'x' * 500})
+    
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+    
+        entries = read_lines(tmp_path / 'scans.jsonl')
+        assert len(entries) == 1600
+        for n in range(8):
+            assert [e['i'] for e in entries if e['thread'] == n] == list(range(200))
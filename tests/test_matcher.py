@@ -0,0 +1,78 @@
+"""Unit tests for the phrase matcher"""
+
+import random
+import re
+
+import pytest
+from src.matcher import PhraseMatcher, compile_matcher
+from src.scanner import ScamIndicators
+
+
+def naive_search(categories, text):
+    """Reference result using one regex scan per phrase"""
+    results = {}
+    for name, phrases in categories.items():
+        results[name] = {}
+        for phrase in phrases:
+            offsets = [m.start() for m in re.finditer(f'(?={re.escape(phrase)})', text)]
+            if offsets:
+                results[name][phrase] = offsets
+    return results
+
+
+class TestPhraseMatcher:
+    """Test the PhraseMatcher class"""
+    
+    @pytest.mark.parametrize('strategy', ['automaton', 'find'])
+    def test_overlapping_phrases(self, strategy):
+        """Test that overlapping and nested phrases are all reported"""
+        matcher = PhraseMatcher({
+            'a': ['limited time', 'limited time offer', 'time offer'],
+            'b': ['offer'],
+        }, strategy=strategy)
+        results = matcher.search('a limited time offer!')
+        assert results['a'] == {'limited time': [2], 'limited time offer': [2], 'time offer': [10]}
+        assert results['b'] == {'offer': [15]}
+    
+    @pytest.mark.parametrize('strategy', ['automaton', 'find'])
+    def test_counts_and_offsets(self, strategy):
+        """Test that repeated phrases report every offset"""
+        matcher = PhraseMatcher({'urgency': ['hurry', 'urgent']}, strategy=strategy)
+        results = matcher.search('hurry! hurry! urgent')
+        assert results['urgency'] == {'hurry': [0, 7], 'urgent': [14]}
+    
+    def test_results_follow_list_order(self):
+        """Test that found phrases are ordered as in the phrase list"""
+        matcher = PhraseMatcher({'k': ['zeta', 'alpha', 'mid']}, strategy='automaton')
+        assert matcher.found('alpha mid zeta')['k'] == ['zeta', 'alpha', 'mid']
+    
+    def test_missing_category_is_empty(self):
+        """Test that categories without hits are still present"""
+        matcher = PhraseMatcher({'a': ['x'], 'b': ['y']})
+        assert matcher.search('xxx')['b'] == {}
+    
+    @pytest.mark.parametrize('strategy', ['automaton', 'find'])
+    def test_matches_naive_search(self, strategy):
+        """Test equivalence with per-phrase searching on random text"""
+        categories = {
+            'scam': ScamIndicators.SCAM_KEYWORDS,
+            'urgency': ScamIndicators.URGENCY_WORDS,
+            'tgtbt': ScamIndicators.TGTBT_PHRASES,
+        }
+        words = [p for phrases in categories.values() for p in phrases] + ['the', 'a', 'now', 'free']
+        rng = random.Random(7)
+        text = ' '.join(rng.choice(words) for _ in range(2000))
+        
+        matcher = PhraseMatcher(categories, strategy=strategy)
+        assert matcher.search(text) == naive_search(categories, text)
+    
+    def test_unknown_strategy(self):
+        """Test that an unknown strategy is rejected"""
+        with pytest.raises(ValueError):
+            PhraseMatcher({'a': ['x']}, strategy='regex')
+    
+    def test_compile_matcher_is_cached(self):
+        """Test that the same phrase lists compile only once"""
+        first = compile_matcher({'a': ['x', 'y']})
+        assert compile_matcher({'a': ['x', 'y']}) is first
+        assert compile_matcher({'a': ['x', 'z']}) is not first
@@ -0,0 +1,110 @@
+"""Tests for hop-by-hop redirect following and the hop cache"""
+
+from urllib.parse import quote
+
+import pytest
+import requests
+from urllib3.exceptions import ProtocolError
+from src.cache import ScanCache
+from src.redirects import REDIRECT_DRAIN_BYTES, _drain, follow_redirects
+from src.rules import RulePlan, config_rules
+from src.scanner import ScamIndicators, ScamScanner
+from src.scheduler import HostScheduler
+
+
+def follow(url, **kwargs):
+    """(final status, hops) of following url"""
+    with follow_redirects(HostScheduler(), requests.Session(), url, timeout=5, **kwargs) as (response, hops):
+        return response.status_code, hops
+
+
+class TestFollowRedirects:
+    """Test following redirects against the stub server"""
+    
+    def test_chain(self, stub_server):
+        """Test that every hop is recorded, ending with the final page"""
+        status, hops = follow(f'{stub_server.url}/hop/3')
+        assert status == 200
+        assert [hop.url for hop in hops] == [f'{stub_server.url}/hop/{n}' for n in (3, 2, 1, 0)]
+        assert [hop.status for hop in hops] == [302, 302, 302, 200]
+        assert all(hop.elapsed_ms > 0 and not hop.cached for hop in hops)
+    
+    def test_hop_cache(self, stub_server):
+        """Test that cached redirects are not requested again"""
+        cache = ScanCache(ttl=60)
+        follow(f'{stub_server.url}/hop/2', cache=cache)
+        assert stub_server.requests == 3
+        
+        status, hops = follow(f'{stub_server.url}/hop/2', cache=cache)
+        assert status == 200
+        assert [hop.cached for hop in hops] == [True, True, False]
+        assert stub_server.requests == 4
+    
+    def test_too_many_redirects(self, stub_server):
+        """Test that the hop limit fails the fetch"""
+        with pytest.raises(requests.TooManyRedirects):
+            follow(f'{stub_server.url}/hop/5', max_redirects=2)
+    
+    def test_drain(self):
+        """Test that a redirect body is read, bounded and undecoded, and read errors ignored"""
+        class Raw:
+            def __init__(self, error=None):
+                self.calls, self.error = [], error
+            
+            def read(self, amt=None, decode_content=None):
+                self.calls.append((amt, decode_content))
+                if self.error:
+                    raise self.error
+                return b''
+        
+        response = requests.Response()
+        response.raw = Raw()
+        _drain(response)
+        assert response.raw.calls == [(REDIRECT_DRAIN_BYTES, False)]
+        
+        response.raw = Raw(ProtocolError('Connection reset'))
+        _drain(response)
+        assert len(response.raw.calls) == 1
+
+
+class TestRedirectScoring:
+    """Test redirect chain analysis in scans"""
+    
+    def test_no_redirect(self, stub_server):
+        """Test that a URL normalized by requests is not reported as a redirect"""
+        results = ScamScanner(timeout=5).scan_url(f'{stub_server.url}')
+        assert 'Redirects to different URL' not in results['indicators']
+        assert 'redirect_chain' not in results['details']
+    
+    def test_long_chain(self, stub_server):
+        """Test per-hop details and the long chain indicator"""
+        results = ScamScanner(timeout=5).scan_url(f'{stub_server.url}/hop/4')
+        chain = results['details']['redirect_chain']
+        assert len(chain) == 5
+        assert chain[-1]['url'] == f'{stub_server.url}/hop/0'
+        assert 'No HTTPS encryption' in chain[0]['domain_indicators']
+        assert 'Redirects to different URL' in results['indicators']
+        assert 'Long redirect chain (4 hops)' in results['indicators']
+    
+    def test_suspicious_hop(self, stub_server):
+        """Test that a hop through a suspicious domain is flagged (served from the hop cache)"""
+        scanner = ScamScanner(timeout=5)
+        tracker = 'http://win-free-prize-now.xyz/r'
+        scanner.redirect_cache.set(tracker, {'status': 302, 'location': f'{stub_server.url}/page'})
+        
+        results = scanner.scan_url(f'{stub_server.url}/redirect?to={quote(tracker)}')
+        chain = results['details']['redirect_chain']
+        assert [hop['cached'] for hop in chain] == [False, True, False]
+        assert chain[1]['domain_score'] == 35
+        assert 'Redirects through suspicious domain: win-free-prize-now.xyz' in results['indicators']
+    
+    def test_plan_redirects(self):
+        """Test the redirect rules on their own, and the feature flag"""
+        plan = RulePlan(config_rules(ScamIndicators.phrase_lists()))
+        assert plan.redirects('https://a.example/', [('https://a.example/', 0)]) == (0, [])
+        assert plan.redirects('https://a.example/', [('https://a.example/', 0), ('https://a.example/x', 40)]) == (
+            5, ['Redirects to different URL'])
+        
+        rules = config_rules(ScamIndicators.phrase_lists())
+        rules['flags']['redirect_detection'] = False
+        assert RulePlan(rules).redirects('https://a.example/', [('https://a.example/', 0), ('https://b.xyz/', 40)]) == (0, [])
@@ -0,0 +1,103 @@
+"""Tests for the domain reputation index"""
+
+import pytest
+from click.testing import CliRunner
+from src.reputation import ReputationIndex, build_index, main, parse_list
+from src.scanner import ScamScanner
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Index with a few scam and good hosts"""
+    path = str(tmp_path / 'reputation.idx')
+    build_index(path, scam=['scam.example', 'WWW.Phish.Test.', 'both.example'],
+                good=['good.example', 'both.example'])
+    index = ReputationIndex(path)
+    yield index
+    index.close()
+
+
+class TestReputationIndex:
+    """Test building and querying the index"""
+    
+    def test_labels(self, index):
+        """Test exact lookups, normalization and scam winning over good"""
+        assert len(index) == 4
+        assert index.label('scam.example') == 'scam'
+        assert index.label('phish.test') == 'scam'
+        assert index.label('www.good.example') == 'good'
+        assert index.label('both.example') == 'scam'
+        assert index.label('other.example') is None
+    
+    def test_parent_domains(self, index):
+        """Test that subdomains inherit a listed scam parent but not a good one"""
+        assert index.lookup('login.secure.scam.example') == 'scam'
+        assert index.lookup('good.example') == 'good'
+        assert index.lookup('cdn.good.example') is None
+        assert index.lookup('cdn.both.example') == 'scam'
+        assert index.lookup('example') is None
+        assert index.lookup('notscam.example') is None
+    
+    def test_many_hosts(self, tmp_path):
+        """Test that every listed host is found and unlisted ones are not"""
+        path = str(tmp_path / 'big.idx')
+        scam = [f'scam{i}.example' for i in range(20000)]
+        good = [f'site{i}.example' for i in range(20000)]
+        build_index(path, scam=scam, good=good, prefix_bits=8)
+        index = ReputationIndex(path)
+        assert all(index.label(host) == 'scam' for host in scam)
+        assert all(index.label(host) == 'good' for host in good)
+        assert not any(index.label(f'other{i}.example') for i in range(20000))
+        index.close()
+    
+    def test_empty_and_invalid(self, tmp_path):
+        """Test an empty index and a file that is not an index"""
+        path = str(tmp_path / 'empty.idx')
+        build_index(path)
+        assert ReputationIndex(path).lookup('scam.example') is None
+    
+        (tmp_path / 'bad.idx').write_bytes(b'not an index')
+        with pytest.raises(ValueError):
+            ReputationIndex(str(tmp_path / 'bad.idx'))
+    
+    def test_parse_list(self):
+        """Test the accepted list formats"""
+        lines = ['# scam list', 'Scam.Example', '0.0.0.0 hosts.example  # comment',
+                 '*.wild.example', '', '127.0.0.1 localhost']
+        assert list(parse_list(lines)) == ['scam.example', 'hosts.example', 'wild.example']
+    
+    def test_cli(self, tmp_path):
+        """Test building an index from text lists"""
+        (tmp_path / 'scam.txt').write_text('scam.example\n')
+        (tmp_path / 'good.txt').write_text('good.example\n')
+        output = str(tmp_path / 'reputation.idx')
+        result = CliRunner().invoke(main, ['--scam', str(tmp_path / 'scam.txt'),
+                                           '--good', str(tmp_path / 'good.txt'), '-o', output])
+        assert result.exit_code == 0, result.output
+        assert ReputationIndex(output).lookup('scam.example') == 'scam'
+
+
+class TestScannerReputation:
+    """Test reputation in domain analysis"""
+    
+    def test_known_scam_domain(self, index):
+        """Test that a listed scam host scores HIGH without a fetch"""
+        results = ScamScanner(reputation=index).scan_url('https://app.scam.example/offer')
+        assert 'Known scam domain' in results['indicators']
+        assert results['risk_level'] == 'HIGH'
+        assert results['details']['stopped_after'] == 'url'
+    
+    def test_known_good_domain(self, index):
+        """Test that a listed good host is not scored on lexical features"""
+        scanner = ScamScanner(reputation=index)
+        score, indicators = scanner._analyze_domain('https://good.example')
+        assert (score, indicators) == (0, ['Known good domain'])
+    
+        # The scheme is still scored
+        score, indicators = scanner._analyze_domain('http://good.example')
+        assert score == scanner.rules.plan.weights['no_https']
+        assert indicators == ['Known good domain', 'No HTTPS encryption']
+    
+        # A subdomain is scored like any other host
+        score, indicators = scanner._analyze_domain('https://user-123-4-5.good.example')
+        assert 'Known good domain' not in indicators
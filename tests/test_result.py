@@ -0,0 +1,91 @@
+"""Tests for ScanResult and Indicator"""
+
+import copy
+import pickle
+
+from src.result import Code, Indicator, ScanResult
+from src.scanner import ScamScanner
+from src.store import ScanStore
+
+
+class TestIndicator:
+    """Test indicator codes and messages"""
+    
+    def test_message(self):
+        """Test that messages are formatted from the code's template"""
+        assert Indicator(Code.LONG_DOMAIN, 31).text == 'Unusually long domain name (31 chars)'
+        assert str(Indicator(Code.NO_HTTPS)) == 'No HTTPS encryption'
+        assert Indicator(Code.SCAM_KEYWORDS, 2, 'act now, risk free').text == \
+            'Found 2 scam keywords: act now, risk free'
+    
+    def test_compares_to_message(self):
+        """Test that an indicator equals its message and hashes like it"""
+        indicator = Indicator(Code.SUSPICIOUS_TLD, '.xyz')
+        assert indicator == 'Suspicious TLD: .xyz'
+        assert 'Suspicious TLD: .xyz' in [indicator]
+        assert indicator in {'Suspicious TLD: .xyz'}
+        assert indicator != Indicator(Code.SUSPICIOUS_TLD, '.top')
+    
+    def test_parse(self):
+        """Test that messages are read back into their code and values"""
+        for indicator in [Indicator(Code.LONG_REDIRECT_CHAIN, 4),
+                          Indicator(Code.SUSPICIOUS_REDIRECT, 'track.example.xyz'),
+                          Indicator(Code.SCAM_KEYWORDS, 5, 'a, b, c...'),
+                          Indicator(Code.FETCH_FAILED, 'Connection refused: (1, 2)'),
+                          Indicator(Code.MISSING_META)]:
+            parsed = Indicator.parse(indicator.text)
+            assert (parsed.code, parsed.params) == (indicator.code, indicator.params)
+        assert Indicator.parse('Something new').code == Code.TEXT
+    
+    def test_pickle(self):
+        """Test that indicators survive the trip to analysis worker processes"""
+        indicator = Indicator(Code.FEW_LINKS, 1)
+        restored = pickle.loads(pickle.dumps(indicator))
+        assert (restored.code, restored.params) == (Code.FEW_LINKS, (1,))
+
+
+class TestScanResult:
+    """Test result serialization and copies"""
+    
+    def test_to_dict(self):
+        """Test the dict shape of the JSON API, with nested indicators as messages"""
+        indicator = Indicator(Code.NO_HTTPS)
+        result = ScanResult('http://a.example', True, True, 10, 'LOW', [indicator],
+                            {'domain_analysis': {'score': 10, 'indicators': [indicator]}})
+        assert result.to_dict() == {
+            'url': 'http://a.example',
+            'valid_url': True,
+            'accessible': True,
+            'risk_score': 10,
+            'indicators': ['No HTTPS encryption'],
+            'details': {'domain_analysis': {'score': 10, 'indicators': ['No HTTPS encryption']}},
+            'risk_level': 'LOW',
+        }
+        assert ScanResult.from_dict(result.to_dict()).codes() == (Code.NO_HTTPS,)
+    
+    def test_unscored_result_has_no_level(self):
+        """Test that an invalid URL's result has no risk_level, as before"""
+        result = ScamScanner().scan('not-a-valid-url')
+        assert result.codes() == (Code.INVALID_URL,)
+        assert 'risk_level' not in result.to_dict()
+    
+    def test_deepcopy(self):
+        """Test that copies (cache, single-flight) do not share what callers change"""
+        result = ScanResult('https://a.example', indicators=[Indicator(Code.NO_HTTPS)],
+                            details={'tiers': ['url']})
+        copied = copy.deepcopy(result)
+        copied.url = 'https://b.example'
+        copied.details['cache'] = 'hit'
+        copied.indicators.append(Indicator(Code.REDIRECT))
+        assert result.url == 'https://a.example'
+        assert result.details == {'tiers': ['url']}
+        assert result.codes() == (Code.NO_HTTPS,)
+    
+    def test_stored_result_keeps_codes(self, stub_server, tmp_path):
+        """Test that a result read back from the store has the same indicators"""
+        url = f"{stub_server.url}/scam"
+        first = ScamScanner(timeout=5, store=ScanStore(str(tmp_path / 'scans.db'))).scan(url)
+        second = ScamScanner(timeout=5, store=ScanStore(str(tmp_path / 'scans.db'))).scan(url)
+        assert second.details['cache'] == 'store'
+        assert second.codes() == first.codes()
+        assert second.indicators == first.indicators
@@ -0,0 +1,142 @@
+"""Tests for the declarative rule engine"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from src.html_features import extract_features
+from src.rules import RuleEngine, RulePlan, config_rules, merge_rules
+from src.scanner import ScamIndicators, ScamScanner
+
+
+PAGES = sorted((Path(__file__).parent / 'pages').glob('*.html'))
+POPUP_PAGE = ('<html><body><form><input type="password"></form>'
+              '<script>ALERT("act now!")</script><p>Act now! Hurry!</p></body></html>')
+
+
+def default_rules():
+    return config_rules(ScamIndicators.phrase_lists())
+
+
+def write_rules(path, rules):
+    """Write a rules file and move its mtime forward so a reload sees it"""
+    path.write_text(json.dumps(rules), encoding='utf-8')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+class TestRulePlan:
+    """Test the RulePlan class"""
+    
+    def test_defaults_come_from_config(self):
+        """Test that weights, thresholds and limits default to src/config.py"""
+        rules = default_rules()
+        assert rules['weights']['ip_address'] == 20
+        assert rules['thresholds'] == {'minimal': 10, 'low': 25, 'medium': 50}
+        assert rules['limits']['domain_length'] == 20
+        assert rules['flags'] == {'redirect_detection': True, 'form_analysis': True,
+                                  'script_analysis': True}
+    
+    def test_indicator_order_kept(self):
+        """Test that rules evaluated cheapest first still report in order"""
+        plan = RulePlan(default_rules())
+        score, indicators = plan.content(extract_features(POPUP_PAGE), POPUP_PAGE)
+        assert indicators == [
+            'Found 1 scam keywords: act now',
+            'Contains popup/alert scripts',
+            'Missing meta description',
+            'Very few external links (0)',
+            'Contains password input fields',
+            'Form with suspicious or missing action',
+        ]
+        assert score == 5 + 15 + 5 + 5 + 15 + 10
+    
+    def test_overrides(self):
+        """Test weights, flags, limits and phrase lists from overrides"""
+        plan = RulePlan(merge_rules(default_rules(), {
+            'weights': {'missing_meta': 1},
+            'flags': {'script_analysis': False, 'form_analysis': False},
+            'limits': {'min_links': 0},
+            'phrases': {'scam_keywords': ['Hurry']},
+        }))
+        score, indicators = plan.content(extract_features(POPUP_PAGE), POPUP_PAGE)
+        assert indicators == ['Found 1 scam keywords: hurry', 'Missing meta description']
+        assert score == 6
+    
+    def test_thresholds(self):
+        """Test risk levels from overridden thresholds"""
+        plan = RulePlan(merge_rules(default_rules(), {'thresholds': {'medium': 30}}))
+        assert plan.risk_level(30) == 'HIGH'
+        assert plan.risk_level(29) == 'MEDIUM'
+        assert plan.risk_level(9) == 'MINIMAL'
+    
+    @pytest.mark.parametrize('overrides', [
+        {'weights': {'unknown': 1}},
+        {'scores': {}},
+        {'weights': {'redirect': 'high'}},
+        {'flags': {'form_analysis': 1}},
+        {'phrases': {'scam_keywords': 'act now'}},
+        [],
+    ])
+    def test_invalid_overrides(self, overrides):
+        """Test that malformed rules are rejected"""
+        with pytest.raises(ValueError):
+            merge_rules(default_rules(), overrides)
+    
+    def test_golden_pages_unchanged(self):
+        """Test that default rules give the same analysis through the scanner"""
+        scanner = ScamScanner()
+        plan = RulePlan(default_rules())
+        for page in PAGES:
+            html = page.read_text(encoding='utf-8')
+            assert scanner._analyze_content(html, 'https://example.com/') == \
+                plan.content(extract_features(html), html)
+
+
+class TestRuleEngine:
+    """Test rules file loading and hot reload"""
+    
+    def test_reloads_changed_file(self, tmp_path):
+        """Test that edits to the rules file replace the plan"""
+        path = tmp_path / 'rules.json'
+        write_rules(path, {'weights': {'no_https': 1}})
+        engine = RuleEngine(ScamIndicators.phrase_lists(), str(path), check_interval=0)
+        assert engine.plan.domain('http://example.com/') == (1, ['No HTTPS encryption'])
+    
+        write_rules(path, {'weights': {'no_https': 7}})
+        assert engine.plan.domain('http://example.com/') == (7, ['No HTTPS encryption'])
+        assert engine.stats()['version'] == 2
+    
+        path.unlink()
+        assert engine.plan.domain('http://example.com/') == (10, ['No HTTPS encryption'])
+    
+    def test_bad_file_keeps_plan(self, tmp_path):
+        """Test that a rules file that fails to load leaves the current plan"""
+        path = tmp_path / 'rules.json'
+        write_rules(path, {'weights': {'no_https': 1}})
+        engine = RuleEngine(ScamIndicators.phrase_lists(), str(path), check_interval=0)
+    
+        path.write_text('{"weights": {', encoding='utf-8')
+        write_rules(path, {'weights': {'no_htps': 3}})
+        assert engine.plan.domain('http://example.com/')[0] == 1
+        assert engine.stats()['reload_errors'] == 1
+        assert 'no_htps' in engine.stats()['last_error']
+    
+    def test_check_interval(self, tmp_path):
+        """Test that the file is not checked again within the interval"""
+        path = tmp_path / 'rules.json'
+        engine = RuleEngine(ScamIndicators.phrase_lists(), str(path), check_interval=3600)
+        write_rules(path, {'weights': {'no_https': 1}})
+        assert engine.plan.domain('http://example.com/')[0] == 10
+        assert engine.reload()
+        assert engine.plan.domain('http://example.com/')[0] == 1
+    
+    def test_scanner_rules_file(self, tmp_path, stub_server):
+        """Test that a scanner scores with its rules file"""
+        path = tmp_path / 'rules.json'
+        write_rules(path, {'weights': {'no_https': 40, 'ip_address': 0},
+                           'thresholds': {'medium': 45}})
+        results = ScamScanner(rules_file=str(path)).scan_url(f"{stub_server.url}/page")
+        assert results['details']['domain_analysis']['score'] == 40 + 5  # + digits in the host
+        assert results['risk_level'] == 'HIGH'
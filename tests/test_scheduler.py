@@ -0,0 +1,124 @@
+"""Tests for per-host fetch scheduling"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+from src.scanner import ScamScanner
+from src.scheduler import HostScheduler, host_key, retry_after
+
+
+def fetch_all(scheduler, urls):
+    """Fetch URLs on one thread each; return the status codes"""
+    session = requests.Session()
+    scheduler.mount(session)
+    statuses = []
+    
+    def fetch(url):
+        with scheduler.fetch(session, url, timeout=5) as response:
+            statuses.append(response.status_code)
+    
+    threads = [threading.Thread(target=fetch, args=(url,)) for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+class TestRetryAfter:
+    """Test Retry-After parsing"""
+    
+    def test_values(self):
+        """Test delay-seconds, HTTP dates and garbage"""
+        now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        later = (now + timedelta(seconds=90)).strftime('%a, %d %b %Y %H:%M:%S GMT')
+        assert retry_after('120') == 120.0
+        assert retry_after(later, now=now) == 90.0
+        assert retry_after('Thu, 01 Jan 2015 00:00:00 GMT', now=now) == 0.0
+        assert retry_after('soon') is None
+        assert retry_after(None) is None
+    
+    def test_host_key(self):
+        """Test that hosts are compared lowercased and without port"""
+        assert host_key('https://Ads.Example.com:8443/r?x=1') == 'ads.example.com'
+        assert host_key('not a url') == ''
+
+
+class TestHostScheduler:
+    """Test per-host caps, backoff and retries against the stub server"""
+    
+    def test_invalid_limits(self):
+        """Test that non-positive limits are rejected"""
+        with pytest.raises(ValueError):
+            HostScheduler(per_host=0)
+    
+    def test_per_host_cap(self, stub_server):
+        """Test that one host gets at most per_host requests at a time"""
+        scheduler = HostScheduler(per_host=2)
+        statuses = fetch_all(scheduler, [f'{stub_server.url}/page/{i}' for i in range(6)])
+        
+        assert statuses == [200] * 6
+        assert stub_server.max_active == 2
+        stats = scheduler.stats()
+        assert stats['requests'] == 6
+        assert stats['in_flight'] == 0 and stats['queued'] == 0
+        assert stats['busiest']['127.0.0.1']['avg_latency_ms'] > 0
+    
+    def test_hosts_are_independent(self, stub_server):
+        """Test that the cap applies per host, not globally"""
+        port = stub_server.server_address[1]
+        scheduler = HostScheduler(per_host=1)
+        fetch_all(scheduler, [f'http://127.0.0.1:{port}/a', f'http://localhost:{port}/b'])
+        assert stub_server.max_active == 2
+        assert scheduler.stats()['hosts'] == 2
+    
+    def test_retry_after(self, stub_server):
+        """Test that a 429 with Retry-After is retried and counted"""
+        stub_server.throttle = 2
+        scheduler = HostScheduler(per_host=1)
+        assert fetch_all(scheduler, [f'{stub_server.url}/throttle']) == [200]
+        host = scheduler.stats()['busiest']['127.0.0.1']
+        assert (host['requests'], host['throttled'], host['retries']) == (3, 2, 2)
+    
+    def test_exponential_backoff(self, stub_server):
+        """Test that a 503 without Retry-After is retried after doubling waits"""
+        stub_server.throttle = 2
+        scheduler = HostScheduler(backoff=0.1)
+        start = time.monotonic()
+        assert fetch_all(scheduler, [f'{stub_server.url}/unavailable']) == [200]
+        assert time.monotonic() - start >= 0.1 + 0.2
+    
+    def test_retries_exhausted(self, stub_server):
+        """Test that the last throttled answer is returned after max_retries"""
+        stub_server.throttle = 5
+        scheduler = HostScheduler(max_retries=1, backoff=0.01)
+        assert fetch_all(scheduler, [f'{stub_server.url}/throttle']) == [429]
+        assert stub_server.requests == 2
+    
+    def test_long_retry_after_backs_off_host(self, stub_server):
+        """Test that a Retry-After beyond max_backoff is not retried but delays the host"""
+        scheduler = HostScheduler(max_backoff=0.3)
+        assert fetch_all(scheduler, [f'{stub_server.url}/throttle-long']) == [429]
+        assert scheduler.stats()['busiest']['127.0.0.1']['backoff_remaining'] > 0
+        
+        start = time.monotonic()
+        assert fetch_all(scheduler, [f'{stub_server.url}/page']) == [200]
+        assert time.monotonic() - start >= 0.2
+    
+    def test_forgets_idle_hosts(self):
+        """Test that idle host state is bounded"""
+        scheduler = HostScheduler(max_hosts=2)
+        for key in ('a', 'b', 'c'):
+            scheduler._release(scheduler._acquire(key))
+        assert list(scheduler._hosts) == ['b', 'c']
+    
+    def test_scanner_retries(self, stub_server):
+        """Test that scans fetch through the scheduler"""
+        stub_server.throttle = 1
+        scanner = ScamScanner(timeout=5, scheduler=HostScheduler(backoff=0.01))
+        results = scanner.scan_url(f'{stub_server.url}/throttle')
+        assert results['details']['status_code'] == 200
+        assert scanner.scheduler.stats()['retries'] == 1
@@ -0,0 +1,137 @@
+"""Tests for in-flight request coalescing"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.scanner import ScamScanner
+from src.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+    """Test the thread-based SingleFlight class"""
+    
+    def test_concurrent_calls_collapse(self):
+        """Test that concurrent callers share one execution"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return {'value': 42}
+        
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(flight.do, 'key', work) for _ in range(5)]
+            while flight.stats()['collapsed'] < 4:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futures]
+        
+        assert len(calls) == 1
+        assert [r for r, _ in results] == [{'value': 42}] * 5
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert flight.stats() == {'in_flight': 0, 'executed': 1, 'collapsed': 4}
+    
+    def test_waiters_get_independent_copies(self):
+        """Test that waiting callers can mutate their results independently"""
+        flight = SingleFlight()
+        release = threading.Event()
+        
+        def work():
+            release.wait(5)
+            return {'details': {}}
+        
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, 'key', work) for _ in range(3)]
+            while flight.stats()['collapsed'] < 2:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result()[0] for f in futures]
+        
+        results[0]['details']['x'] = 1
+        assert results[1] == results[2] == {'details': {}}
+    
+    def test_exception_propagates_to_waiters(self):
+        """Test that a failing call raises in every caller and is not cached"""
+        flight = SingleFlight()
+        release = threading.Event()
+        
+        def work():
+            release.wait(5)
+            raise RuntimeError('boom')
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(flight.do, 'key', work) for _ in range(2)]
+            while flight.stats()['collapsed'] < 1:
+                time.sleep(0.001)
+            release.set()
+            for future in futures:
+                with pytest.raises(RuntimeError):
+                    future.result()
+        
+        assert flight.do('key', lambda: 'ok') == ('ok', False)
+    
+    def test_sequential_calls_not_collapsed(self):
+        """Test that calls after completion run again"""
+        flight = SingleFlight()
+        flight.do('key', lambda: 1)
+        flight.do('key', lambda: 2)
+        assert flight.stats()['executed'] == 2
+        assert flight.stats()['collapsed'] == 0
+
+
+class TestAsyncSingleFlight:
+    """Test the asyncio-based AsyncSingleFlight class"""
+    
+    def test_concurrent_coroutines_collapse(self):
+        """Test that concurrent coroutines share one execution"""
+        flight = AsyncSingleFlight()
+        calls = []
+        
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {'value': 1}
+        
+        async def main():
+            return await asyncio.gather(*(flight.do('key', work) for _ in range(4)))
+        
+        results = asyncio.run(main())
+        assert len(calls) == 1
+        assert [r for r, _ in results] == [{'value': 1}] * 4
+        assert flight.stats()['collapsed'] == 3
+
+
+class TestScannerCoalescing:
+    """Test coalescing around ScamScanner.scan_url"""
+    
+    def test_concurrent_scans_fetch_once(self, stub_server):
+        """Test that simultaneous scans of one URL do a single fetch"""
+        scanner = ScamScanner(timeout=5)
+        urls = [f"{stub_server.url}/slow/ad?utm_source={i}" for i in range(4)]
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(scanner.scan_url, urls))
+        
+        assert stub_server.requests == 1
+        assert [r['url'] for r in results] == urls
+        assert sum(1 for r in results if r['details'].get('coalesced')) == 3
+        assert scanner.inflight.stats()['collapsed'] == 3
+    
+    def test_forced_rescan_not_merged(self, stub_server):
+        """Test that a forced rescan does not join a normal scan of the same URL"""
+        scanner = ScamScanner(timeout=5)
+        url = f"{stub_server.url}/slow/ad"
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            normal = pool.submit(scanner.scan_url, url)
+            forced = pool.submit(scanner.scan_url, url, True)
+            results = [normal.result(), forced.result()]
+        
+        assert stub_server.requests == 2
+        assert not any(r['details'].get('coalesced') for r in results)
+        assert scanner.inflight.stats()['collapsed'] == 0
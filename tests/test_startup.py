@@ -0,0 +1,62 @@
+"""Import-time regression tests for the scanner CLI"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative `-X importtime` microseconds allowed for `import src.scanner`
+# (about 60 ms when measured; click is a third of it)
+IMPORT_BUDGET_US = 150_000
+
+# Dependencies a scan that never fetches a page must not import
+DEFERRED = ('requests', 'urllib3', 'bs4', 'lxml', 'colorama', 'multiprocessing', 'asyncio')
+
+
+def import_times(*args: str):
+    """Run python -X importtime with args; {module: cumulative microseconds}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return result, times
+
+
+def top_level(times):
+    """Top-level package names among imported modules"""
+    return {name.split('.')[0] for name in times}
+
+
+class TestStartup:
+    """Test that the CLI defers heavy imports until they are needed"""
+    
+    def test_import_budget(self):
+        """Test that importing the scanner stays within the startup budget"""
+        # Best of three: the first run may pay for cold page cache
+        best = min(import_times('-c', 'import src.scanner')[1]['src.scanner'] for _ in range(3))
+        assert best < IMPORT_BUDGET_US
+    
+    def test_import_defers_dependencies(self):
+        """Test that importing the scanner pulls in no deferred dependency"""
+        _, times = import_times('-c', 'import src.scanner')
+        assert 'src.scanner' in times
+        assert not top_level(times) & set(DEFERRED)
+    
+    @pytest.mark.parametrize('flags', [['--json'], []])
+    def test_cli_without_fetch(self, flags):
+        """Test that a scan that exits before fetching loads no fetch or parse dependency"""
+        result, times = import_times('-m', 'src.scanner', '--url', 'not-a-valid-url', *flags)
+        assert result.returncode == 0
+        assert 'Invalid URL format' in result.stdout
+        deferred = set(DEFERRED) - ({'colorama'} if not flags else set())
+        assert not top_level(times) & deferred
+        assert ('colorama' in top_level(times)) == (not flags)
@@ -0,0 +1,228 @@
+"""Tests for the running scan statistics"""
+
+import json
+from datetime import date
+
+import pytest
+from src.jsonio import available_backends, json_backend
+from src.stats import HyperLogLog, ScanStats, UniqueCounter
+
+
+def make_entry(url, risk_level='LOW', source='api', day='2026-03-10'):
+    """A scan log entry like api_server.log_scan writes"""
+    return {'timestamp': f'{day}T12:00:00', 'url': url,
+            'risk_level': risk_level, 'source': source}
+
+
+def append(log_file, *entries):
+    with open(log_file, 'a', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Path of a temporary scans.jsonl"""
+    return str(tmp_path / 'scans.jsonl')
+
+
+class TestHyperLogLog:
+    """Test the HyperLogLog estimator"""
+    
+    @pytest.mark.parametrize('n', [10, 1000, 50000])
+    def test_estimate_error(self, n):
+        """Test that estimates stay within a few standard errors"""
+        hll = HyperLogLog(precision=14)
+        for i in range(n):
+            hll.add(f'https://site{i}.example.com/')
+            hll.add(f'https://site{i}.example.com/')
+        assert abs(hll.count() - n) <= max(2, n * 0.03)
+    
+    def test_merge_and_round_trip(self):
+        """Test that merged and restored estimators agree"""
+        a, b = HyperLogLog(10), HyperLogLog(10)
+        for i in range(3000):
+            (a if i % 2 else b).add(str(i))
+        a.merge(b)
+        assert HyperLogLog.from_dict(a.to_dict()).count() == a.count()
+        assert abs(a.count() - 3000) < 3000 * 0.1
+    
+    def test_invalid_precision(self):
+        """Test that out-of-range precisions are rejected"""
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=3)
+        with pytest.raises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+
+class TestUniqueCounter:
+    """Test exact-then-estimated unique counting"""
+    
+    def test_exact_below_limit(self):
+        """Test that small sets are counted exactly"""
+        counter = UniqueCounter(exact_limit=100)
+        for i in range(250):
+            counter.add(str(i % 100))
+        assert counter.exact
+        assert counter.count() == 100
+    
+    def test_switches_to_estimate(self):
+        """Test that the counter switches to HyperLogLog past the limit"""
+        counter = UniqueCounter(exact_limit=100)
+        for i in range(5000):
+            counter.add(str(i))
+        assert not counter.exact
+        assert abs(counter.count() - 5000) < 5000 * 0.05
+        restored = UniqueCounter.from_dict(counter.to_dict(), exact_limit=100)
+        assert restored.count() == counter.count()
+
+
+class TestScanStats:
+    """Test the ScanStats aggregates"""
+    
+    def test_counts(self):
+        """Test totals by risk level and source"""
+        stats = ScanStats()
+        stats.add(make_entry('https://a.com/', 'HIGH', 'api'))
+        stats.add(make_entry('https://a.com/', 'HIGH', 'cli'))
+        stats.add({'url': 'https://b.com/'})
+    
+        summary = stats.summary()
+        assert summary['total_scans'] == 3
+        assert summary['risk_levels'] == {'HIGH': 2, 'UNKNOWN': 1}
+        assert summary['sources'] == {'api': 1, 'cli': 1, 'unknown': 1}
+        assert summary['unique_urls'] == 2
+        assert summary['unique_urls_exact']
+    
+    def test_sync_is_incremental(self, log_file):
+        """Test that sync only counts lines appended since the last offset"""
+        stats = ScanStats()
+        append(log_file, make_entry('https://a.com/'), make_entry('https://b.com/'))
+        assert stats.sync(log_file) == 2
+        assert stats.sync(log_file) == 0
+        append(log_file, make_entry('https://c.com/'))
+        assert stats.sync(log_file) == 1
+        assert stats.summary()['total_scans'] == 3
+    
+    def test_add_skips_counted_offsets(self, log_file):
+        """Test that an entry already counted by sync is not counted again"""
+        stats = ScanStats()
+        entry = make_entry('https://a.com/')
+        append(log_file, entry)
+        stats.sync(log_file)
+        stats.add(entry, offset=stats.offset)
+        assert stats.summary()['total_scans'] == 1
+    
+    def test_rebuilds_after_rotation(self, log_file):
+        """Test that a log that shrank is counted from the start"""
+        stats = ScanStats()
+        append(log_file, *[make_entry(f'https://{i}.com/') for i in range(5)])
+        stats.sync(log_file)
+        with open(log_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(make_entry('https://z.com/')) + '\n')
+        stats.sync(log_file)
+        assert stats.summary()['total_scans'] == 1
+    
+    def test_persistence_replays_from_offset(self, tmp_path, log_file):
+        """Test that reloaded stats only replay entries after the saved offset"""
+        path = str(tmp_path / 'stats.json')
+        stats = ScanStats(path, save_interval=0)
+        append(log_file, make_entry('https://a.com/'), make_entry('https://b.com/'))
+        stats.sync(log_file)
+        append(log_file, make_entry('https://c.com/', 'HIGH'))
+    
+        reloaded = ScanStats.load(path)
+        assert reloaded.summary()['total_scans'] == 2
+        assert reloaded.sync(log_file) == 1
+        assert reloaded.summary()['risk_levels'] == {'LOW': 2, 'HIGH': 1}
+        assert reloaded.summary()['unique_urls'] == 3
+    
+    def test_saves_on_interval(self, tmp_path):
+        """Test that added entries are saved once the save interval has passed"""
+        path = str(tmp_path / 'stats.json')
+        stats = ScanStats(path, save_interval=3600)
+        stats.add(make_entry('https://a.com/'))
+        assert ScanStats.load(path).summary()['total_scans'] == 0
+        stats._saved_at -= 3600
+        stats.add(make_entry('https://b.com/'))
+        assert ScanStats.load(path).summary()['total_scans'] == 2
+        stats.add(make_entry('https://c.com/'))
+        assert ScanStats.load(path).summary()['total_scans'] == 2
+    
+    def test_day_exact_limit(self, tmp_path):
+        """Test that per-day unique counts switch to an estimate at their own limit"""
+        path = str(tmp_path / 'stats.json')
+        stats = ScanStats(path, save_interval=0, day_exact_limit=10)
+        for i in range(50):
+            stats.add(make_entry(f'https://site{i}.com/'))
+        stats.save()
+    
+        assert stats.summary()['unique_urls_exact']
+        day = stats.window(1, today=date(2026, 3, 10))
+        assert not day['unique_urls_exact']
+        assert 45 <= day['unique_urls'] <= 55
+        with open(path, encoding='utf-8') as f:
+            assert 'hll' in json.load(f)['days']['2026-03-10']['unique']
+    
+    def test_read_only(self, tmp_path, log_file):
+        """Test that read-only stats catch up with the log without writing the file"""
+        path = tmp_path / 'stats.json'
+        stats = ScanStats(str(path), save_interval=0)
+        append(log_file, make_entry('https://a.com/'))
+        stats.sync(log_file)
+        saved = path.read_bytes()
+        append(log_file, make_entry('https://b.com/'))
+    
+        reader = ScanStats.load(str(path), read_only=True, save_interval=1)
+        assert reader.sync(log_file) == 1
+        assert reader.summary()['total_scans'] == 2
+        reader.save()
+        assert path.read_bytes() == saved
+    
+    def test_keeps_newest_days(self, tmp_path):
+        """Test that only the newest max_days daily rollups are saved and loaded"""
+        path = str(tmp_path / 'stats.json')
+        stats = ScanStats(path, save_interval=0, max_days=2)
+        for day in ('2026-03-08', '2026-03-10', '2026-03-09', '2026-03-07'):
+            stats.add(make_entry('https://a.com/', day=day))
+        stats.save()
+        assert sorted(stats.days) == ['2026-03-09', '2026-03-10']
+        assert stats.summary()['total_scans'] == 4
+    
+        with open(path, encoding='utf-8') as f:
+            assert sorted(json.load(f)['days']) == ['2026-03-09', '2026-03-10']
+        reloaded = ScanStats.load(path, max_days=1)
+        assert list(reloaded.days) == ['2026-03-10']
+        assert reloaded.summary()['total_scans'] == 4
+    
+    @pytest.mark.parametrize('backend', available_backends())
+    def test_round_trip_with_backend(self, tmp_path, backend):
+        """Test that stats saved with each JSON backend load back"""
+        path = str(tmp_path / 'stats.json')
+        stats = ScanStats(path, save_interval=0, serializer=json_backend(backend))
+        stats.add(make_entry('https://a.com/', 'HIGH'))
+        stats.save()
+        reloaded = ScanStats.load(path, serializer=json_backend(backend))
+        assert reloaded.summary() == stats.summary()
+        assert reloaded.window(1, today=date(2026, 3, 10))['total_scans'] == 1
+    
+    def test_load_unreadable_file(self, tmp_path):
+        """Test that a corrupt stats file starts empty stats"""
+        path = tmp_path / 'stats.json'
+        path.write_text('{not json')
+        assert ScanStats.load(str(path)).summary()['total_scans'] == 0
+    
+    def test_window(self):
+        """Test per-day rollups over a time window"""
+        stats = ScanStats()
+        stats.add(make_entry('https://a.com/', 'HIGH', day='2026-03-08'))
+        stats.add(make_entry('https://a.com/', 'LOW', day='2026-03-09'))
+        stats.add(make_entry('https://b.com/', 'LOW', day='2026-03-10'))
+        stats.add(make_entry('https://c.com/', 'HIGH', day='2026-03-01'))
+    
+        window = stats.window(3, today=date(2026, 3, 10))
+        assert window['total_scans'] == 3
+        assert window['risk_levels'] == {'HIGH': 1, 'LOW': 2}
+        assert window['unique_urls'] == 2
+        assert [day['date'] for day in window['daily']] == ['2026-03-08', '2026-03-09', '2026-03-10']
+        assert stats.window(1, today=date(2026, 3, 10))['total_scans'] == 1
@@ -0,0 +1,137 @@
+"""Tests for the persistent SQLite scan store"""
+
+import sqlite3
+import time
+
+import pytest
+from src.scanner import ScamScanner
+from src.store import ScanStore
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    """Path of a temporary store database"""
+    return str(tmp_path / 'scan_cache.sqlite3')
+
+
+class TestScanStore:
+    """Test the ScanStore class"""
+    
+    def test_put_and_get(self, store_path):
+        """Test that results and validators round-trip"""
+        store = ScanStore(store_path)
+        store.put('https://a.com/', {'risk_score': 3}, etag='"x"', content_hash='abc')
+        stored = store.get('https://a.com/')
+        
+        assert stored.result == {'risk_score': 3}
+        assert stored.etag == '"x"'
+        assert stored.last_modified is None
+        assert stored.content_hash == 'abc'
+        assert store.get('https://b.com/') is None
+    
+    def test_wal_mode(self, store_path):
+        """Test that the database runs in WAL mode"""
+        store = ScanStore(store_path)
+        mode = store._conn.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+    
+    def test_freshness(self, store_path):
+        """Test TTL-based freshness"""
+        store = ScanStore(store_path, ttl=10)
+        store.put('k', {}, fetched_at=100)
+        stored = store.get('k')
+        assert store.is_fresh(stored, now=109)
+        assert not store.is_fresh(stored, now=110)
+    
+    def test_survives_reopen(self, store_path):
+        """Test that entries persist across store instances"""
+        ScanStore(store_path).put('k', {'risk_level': 'LOW'})
+        assert ScanStore(store_path).get('k').result == {'risk_level': 'LOW'}
+    
+    def test_evicts_least_recently_used(self, store_path):
+        """Test that entries beyond max_entries are evicted, least recently used first"""
+        store = ScanStore(store_path, max_entries=2)
+        store.put('a', {}, fetched_at=100)
+        store.put('b', {}, fetched_at=101)
+        store.touch('a', used_at=102)
+        store.put('b', {'risk_score': 1}, fetched_at=103)
+        assert len(store) == 2
+        store.put('c', {}, fetched_at=104)
+        
+        assert store.get('a') is None
+        assert store.get('b').result == {'risk_score': 1}
+        assert store.get('c') is not None
+        assert len(store) == 2
+        assert store.stats()['evictions'] == 1
+        store.delete('c')
+        assert len(store) == len(ScanStore(store_path)) == 1
+    
+    def test_opens_store_without_used_at(self, store_path):
+        """Test that a store written before eviction gains the used_at column"""
+        conn = sqlite3.connect(store_path)
+        conn.execute('''CREATE TABLE scans (url_key TEXT PRIMARY KEY, result TEXT NOT NULL,
+                        fetched_at REAL NOT NULL, etag TEXT, last_modified TEXT, content_hash TEXT)''')
+        conn.execute("INSERT INTO scans VALUES ('old', '{}', 100, NULL, NULL, NULL)")
+        conn.commit()
+        conn.close()
+        
+        store = ScanStore(store_path, max_entries=1)
+        assert len(store) == 1
+        store.put('new', {}, fetched_at=200)
+        assert store.get('old') is None
+        assert store.get('new') is not None
+
+
+class TestScannerStore:
+    """Test the persistent store in front of ScamScanner fetches"""
+    
+    def test_restart_uses_stored_result(self, store_path, stub_server):
+        """Test that a new scanner answers from the store without fetching"""
+        url = f"{stub_server.url}/offer"
+        first = ScamScanner(timeout=5, store=ScanStore(store_path)).scan_url(url)
+        second = ScamScanner(timeout=5, store=ScanStore(store_path)).scan_url(url)
+        
+        assert stub_server.requests == 1
+        assert second['details']['cache'] == 'store'
+        assert second['risk_score'] == first['risk_score']
+    
+    def test_stale_entry_revalidated_with_etag(self, store_path, stub_server):
+        """Test that stale entries send If-None-Match and reuse the result on 304"""
+        url = f"{stub_server.url}/etag/offer"
+        store = ScanStore(store_path, ttl=60)
+        scanner = ScamScanner(timeout=5, store=store)
+        first = scanner.scan_url(url)
+        
+        store.put(url, first, etag='"stub-v1"', fetched_at=time.time() - 120)
+        result = scanner.scan_url(url)
+        
+        assert stub_server.not_modified == 1
+        assert result['details']['cache'] == 'revalidated'
+        assert result['risk_score'] == first['risk_score']
+        assert store.is_fresh(store.get(url))
+        assert store.revalidated == 1
+    
+    def test_unchanged_body_reuses_content_analysis(self, store_path, stub_server, monkeypatch):
+        """Test that a stale entry with the same content hash skips re-parsing"""
+        url = f"{stub_server.url}/offer"
+        store = ScanStore(store_path, ttl=0)
+        scanner = ScamScanner(timeout=5, store=store)
+        scanner.scan_url(url)
+        
+        def fail(*args):
+            raise AssertionError('content should not be re-analyzed')
+        monkeypatch.setattr(scanner, '_analyze_content', fail)
+        result = scanner.scan_url(url)
+        
+        assert stub_server.requests == 2
+        assert result['details']['cache'] == 'revalidated'
+    
+    def test_force_refresh_skips_store(self, store_path, stub_server):
+        """Test that force_refresh fetches unconditionally"""
+        url = f"{stub_server.url}/etag/offer"
+        scanner = ScamScanner(timeout=5, store=ScanStore(store_path))
+        scanner.scan_url(url)
+        scanner.scan_url(url, force_refresh=True)
+        
+        assert stub_server.requests == 2
+        assert stub_server.not_modified == 0
@@ -0,0 +1,88 @@
+"""Tests for the offline public suffix lookup"""
+
+import socket
+
+import pytest
+import tldextract
+from src import suffixes
+from src.rules import RulePlan, config_rules
+from src.scanner import ScamIndicators
+from src.suffixes import SuffixTrie, default_trie, load_trie, split_host
+
+
+HOSTS = [
+    'example.com', 'forums.news.cnn.com', 'forums.bbc.co.uk', 'www.example.com.au',
+    'win-free-prize-now.xyz', 'a.b.ck', 'www.ck', 'city.kawasaki.jp', 'foo.bar.kawasaki.jp',
+    'x.github.io', 'blogspot.com', 'xn--fiqs8s', 'www.xn--fiqs8s', 'xn--bcher-kva.de',
+    '192.168.1.1', '1.2.3.999', '1.2.3.4.com', 'localhost', 'a.b.c', 'example.com.',
+    'a..com', 'com', '.com', '', 'example。com',
+]
+
+
+class TestSplitHost:
+    """Test splitting hosts into domain and public suffix"""
+    
+    @pytest.mark.parametrize('host', HOSTS)
+    def test_matches_tldextract(self, host):
+        """Test that the split matches tldextract's on its bundled snapshot"""
+        extract = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+        expected = extract(host)
+        assert split_host(host) == (expected.domain, expected.suffix)
+    
+    def test_examples(self):
+        """Test multi-label suffixes, wildcard rules and IP addresses"""
+        assert split_host('login.example.co.uk') == ('example', 'co.uk')
+        assert split_host('a.b.ck') == ('a', 'b.ck')
+        assert split_host('www.ck') == ('www', 'ck')
+        assert split_host('10.0.0.1') == ('10.0.0.1', '')
+        assert split_host('intranet') == ('intranet', '')
+    
+    def test_offline(self, monkeypatch):
+        """Test that building the trie never opens a network connection"""
+        def no_network(*args, **kwargs):
+            raise AssertionError('network access')
+        monkeypatch.setattr(socket, 'create_connection', no_network)
+        monkeypatch.setattr(socket, 'getaddrinfo', no_network)
+        monkeypatch.setattr(suffixes, '_trie', None)
+        assert default_trie().split('shop.example.com.au') == ('example', 'com.au')
+    
+    def test_built_once(self):
+        """Test that the trie is shared and splits are memoized"""
+        assert default_trie() is default_trie()
+        split_host.cache_clear()
+        split_host('memo.example.com')
+        split_host('memo.example.com')
+        assert split_host.cache_info().hits == 1
+    
+    def test_load_trie(self, tmp_path):
+        """Test a trie built from a local list file, private section excluded"""
+        path = tmp_path / 'suffixes.dat'
+        path.write_text('// comment\ncom\nio\nco.uk\n*.ck\n!www.ck\n'
+                        '// ===BEGIN PRIVATE DOMAINS===\ngithub.io\n', encoding='utf-8')
+        trie = load_trie(str(path))
+        assert trie.rules == 5
+        assert trie.split('a.example.co.uk') == ('example', 'co.uk')
+        assert trie.split('x.github.io') == ('github', 'io')
+        assert trie.split('www.ck') == ('www', 'ck')
+    
+    def test_empty_trie(self):
+        """Test that with no rules the last label is the domain"""
+        assert SuffixTrie([]).split('example.com') == ('com', '')
+
+
+class TestDomainRules:
+    """Test domain scoring with the suffix trie"""
+    
+    def test_host_memo(self):
+        """Test that host features are memoized per plan and not shared"""
+        plan = RulePlan(config_rules(ScamIndicators.phrase_lists()))
+        first = plan.domain('http://win-free-prize-now.xyz/a')
+        first[1].append('mutated')
+        assert plan.domain('https://win-free-prize-now.xyz/b') == (
+            25, ['Suspicious TLD: .xyz', 'Multiple hyphens in domain (3)'])
+        assert plan._host.cache_info().hits == 1
+    
+    def test_uppercase_host(self):
+        """Test that hosts are lowercased before matching suspicious TLDs"""
+        plan = RulePlan(config_rules(ScamIndicators.phrase_lists()))
+        assert plan.domain('https://PRIZE.XYZ/') == plan.domain('https://prize.xyz/')
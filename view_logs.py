@@ -8,10 +8,46 @@ from datetime import datetime
 from collections import Counter
 import click
 
+from src import config
+from src.jsonio import json_backend
+from src.logstore import LogStore, tail
+from src.stats import ScanStats
+
 
 LOG_DIR = 'scan_logs'
 
 
+def open_log_store():
+    """Open the scan log index, importing any new scans.jsonl entries
+    
+    Returns None if there is no scan log yet.
+    """
+    log_file = os.path.join(LOG_DIR, 'scans.jsonl')
+    if not os.path.exists(log_file):
+        return None
+    
+    store = LogStore(os.path.join(LOG_DIR, config.LOG_INDEX_FILE), log_file=log_file)
+    store.sync()
+    return store
+
+
+def load_scan_stats():
+    """Running scan aggregates, caught up with any new scans.jsonl entries
+    
+    The stats file belongs to the API server: it is read, never written.
+    """
+    scan_stats = ScanStats.load(
+        os.path.join(LOG_DIR, config.STATS_FILE),
+        read_only=True,
+        exact_limit=config.STATS_EXACT_UNIQUE_LIMIT,
+        day_exact_limit=config.STATS_DAY_EXACT_UNIQUE_LIMIT,
+        max_days=config.STATS_MAX_DAYS,
+        serializer=json_backend(config.JSON_BACKEND)
+    )
+    scan_stats.sync(os.path.join(LOG_DIR, 'scans.jsonl'))
+    return scan_stats
+
+
 @click.group()
 def cli():
     """Scan log viewer and analyzer"""
@@ -32,21 +68,8 @@ def view(limit, risk_level, format):
         click.echo("No scan logs found. Run some scans first!")
         return
     
-    # Read logs
-    logs = []
-    with open(log_file, 'r') as f:
-        for line in f:
-            try:
-                log = json.loads(line)
-                if risk_level and log.get('risk_level') != risk_level:
-                    continue
-                logs.append(log)
-            except json.JSONDecodeError:
-                continue
-    
-    # Get most recent
-    logs = logs[-limit:]
-    logs.reverse()
+    # Most recent first, reading the log backwards
+    logs = tail(log_file, limit, risk_level=risk_level)
     
     if not logs:
         click.echo("No logs found matching criteria")
@@ -62,42 +85,31 @@ def view(limit, risk_level, format):
 
 
 @cli.command()
-def stats():
+@click.option('--days', '-d', type=int, default=None, help='Also show the last N days, day by day')
+def stats(days):
     """Show scanning statistics"""
-    log_file = os.path.join(LOG_DIR, 'scans.jsonl')
+    store = open_log_store()
     
-    if not os.path.exists(log_file):
+    if store is None:
         click.echo("No scan logs found")
         return
     
     # Collect stats
-    total = 0
-    risk_counts = Counter()
-    source_counts = Counter()
-    urls = set()
-    high_risk_urls = []
-    
-    with open(log_file, 'r') as f:
-        for line in f:
-            try:
-                log = json.loads(line)
-                total += 1
-                risk_counts[log.get('risk_level', 'UNKNOWN')] += 1
-                source_counts[log.get('source', 'unknown')] += 1
-                urls.add(log.get('url'))
-                
-                if log.get('risk_level') == 'HIGH':
-                    high_risk_urls.append(log.get('url'))
-                    
-            except json.JSONDecodeError:
-                continue
+    scan_stats = load_scan_stats()
+    summary = scan_stats.summary()
+    total = summary['total_scans']
+    risk_counts = Counter(summary['risk_levels'])
+    source_counts = Counter(summary['sources'])
+    high_risk_count = risk_counts.get('HIGH', 0)
+    high_risk_urls = [log.get('url') for log in store.query(limit=10, risk_level='HIGH', newest_first=False)]
     
     # Print stats
     click.echo("\n" + "=" * 70)
     click.echo("SCAN STATISTICS")
     click.echo("=" * 70)
     click.echo(f"\nTotal Scans: {total}")
-    click.echo(f"Unique URLs: {len(urls)}")
+    approx = '' if summary['unique_urls_exact'] else '~'
+    click.echo(f"Unique URLs: {approx}{summary['unique_urls']}")
     
     click.echo("\nRisk Level Distribution:")
     for risk in ['HIGH', 'MEDIUM', 'LOW', 'MINIMAL']:
@@ -111,11 +123,20 @@ def stats():
         click.echo(f"  {source}: {count}")
     
     if high_risk_urls:
-        click.echo(f"\n⚠️  HIGH RISK URLs ({len(high_risk_urls)}):")
-        for url in high_risk_urls[:10]:
+        click.echo(f"\n⚠️  HIGH RISK URLs ({high_risk_count}):")
+        for url in high_risk_urls:
             click.echo(f"  - {url}")
-        if len(high_risk_urls) > 10:
-            click.echo(f"  ... and {len(high_risk_urls) - 10} more")
+        if high_risk_count > 10:
+            click.echo(f"  ... and {high_risk_count - 10} more")
+    
+    if days:
+        window = scan_stats.window(days)
+        click.echo(f"\nLast {days} day(s): {window['total_scans']} scans, "
+                   f"{window['risk_levels'].get('HIGH', 0)} HIGH risk")
+        for day in window['daily']:
+            click.echo(f"  {day['date']}: {day['total_scans']:5d} scans, "
+                       f"{day['risk_levels'].get('HIGH', 0):4d} HIGH, "
+                       f"{day['unique_urls']:5d} unique URLs")
     
     click.echo("\n" + "=" * 70 + "\n")
 
@@ -124,21 +145,13 @@ def stats():
 @click.argument('url')
 def find(url):
     """Find scans for a specific URL"""
-    log_file = os.path.join(LOG_DIR, 'scans.jsonl')
+    store = open_log_store()
     
-    if not os.path.exists(log_file):
+    if store is None:
         click.echo("No scan logs found")
         return
     
-    found = []
-    with open(log_file, 'r') as f:
-        for line in f:
-            try:
-                log = json.loads(line)
-                if url in log.get('url', ''):
-                    found.append(log)
-            except json.JSONDecodeError:
-                continue
+    found = store.find(url)
     
     if not found:
         click.echo(f"No scans found for URL containing: {url}")
@@ -153,29 +166,22 @@ def find(url):
 @click.option('--output', '-o', default='scan_report.html', help='Output file')
 def report(output):
     """Generate HTML report of scan logs"""
-    log_file = os.path.join(LOG_DIR, 'scans.jsonl')
+    store = open_log_store()
     
-    if not os.path.exists(log_file):
+    if store is None:
         click.echo("No scan logs found")
         return
     
-    # Read all logs
-    logs = []
-    with open(log_file, 'r') as f:
-        for line in f:
-            try:
-                logs.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+    summary = store.summary()
     
     # Generate HTML report
-    html = generate_html_report(logs)
+    html = generate_html_report(store.recent(100), summary['total_scans'], summary['risk_levels'])
     
     with open(output, 'w') as f:
         f.write(html)
     
     click.echo(f"✅ Report generated: {output}")
-    click.echo(f"Total scans: {len(logs)}")
+    click.echo(f"Total scans: {summary['total_scans']}")
 
 
 def print_table(logs):
@@ -237,14 +243,14 @@ def print_detailed_log(log):
     click.echo()
 
 
-def generate_html_report(logs):
-    """Generate HTML report"""
-    # Calculate stats
-    total = len(logs)
-    risk_counts = Counter(log.get('risk_level') for log in logs)
-    
-    high_risk = [log for log in logs if log.get('risk_level') == 'HIGH']
-    
+def generate_html_report(recent_logs, total, risk_counts):
+    """Generate HTML report
+    
+    Args:
+        recent_logs: Logs to list, most recent first
+        total: Total number of scans
+        risk_counts: Number of scans per risk level
+    """
     html = f"""
 <!DOCTYPE html>
 <html>
@@ -306,7 +312,7 @@ def generate_html_report(logs):
             </tr>
 """
     
-    for log in reversed(logs[-100:]):  # Last 100 scans
+    for log in recent_logs:
         risk = log.get('risk_level', 'N/A')
         html += f"""
             <tr>